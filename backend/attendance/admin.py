@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance, StudentAttendance, Weekend
+from .models import Attendance, AttendanceDailyRollup, StudentAttendance, StudentAttendanceSummary, Weekend
 
 
 @admin.register(Attendance)
@@ -64,3 +64,30 @@ class WeekendAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
     ordering = ['-date', 'level']
     readonly_fields = ['created_at']
+
+
+@admin.register(AttendanceDailyRollup)
+class AttendanceDailyRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        'scope', 'date', 'classroom', 'level', 'campus', 'classrooms_marked',
+        'total_students', 'present_count', 'absent_count', 'late_count', 'leave_count'
+    ]
+    list_filter = ['scope', 'campus', 'level', 'date']
+    date_hierarchy = 'date'
+    ordering = ['-date', 'scope']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(StudentAttendanceSummary)
+class StudentAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        'student', 'academic_year', 'total_marked', 'present_count', 'absent_count',
+        'late_count', 'leave_count', 'current_absent_streak', 'last_marked_date'
+    ]
+    list_filter = ['academic_year', 'last_status']
+    search_fields = ['student__name', 'student__student_code']
+    ordering = ['-academic_year', '-current_absent_streak']
+    readonly_fields = ['updated_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('student')
@@ -0,0 +1,31 @@
+import re
+
+from django.core.management.base import BaseCommand
+
+from attendance.services import StudentAttendanceSummaryService
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill StudentAttendanceSummary rows (per-student yearly counters and absence streaks) "
+        "from StudentAttendance. By default, rebuilds every academic year for every student."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--academic-year", type=str, default=None, help="Academic year label, e.g. 2025-26")
+        parser.add_argument("--student", type=int, action="append", default=None, help="Student id (repeatable)")
+
+    def handle(self, *args, **options):
+        academic_year = options.get("academic_year")
+        if academic_year and not re.fullmatch(r"\d{4}-\d{2}", academic_year):
+            self.stderr.write(self.style.ERROR("Invalid --academic-year format. Use YYYY-YY, e.g. 2025-26"))
+            return
+
+        written = StudentAttendanceSummaryService.rebuild(
+            student_ids=options.get("student"),
+            academic_year=academic_year
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Attendance summaries backfilled. Academic year: {academic_year or 'all'}. Rows written: {written}."
+        ))
@@ -0,0 +1,99 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from attendance.models import Attendance, StudentAttendance
+from attendance.services import BulkAttendanceService
+from classes.models import ClassRoom
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query count and latency of the legacy per-student attendance write path "
+        "with BulkAttendanceService for one classroom. All writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classroom", type=int, default=None, help="Classroom id (default: largest classroom)")
+        parser.add_argument("--students", type=int, default=60, help="Students to mark (default: 60)")
+        parser.add_argument("--runs", type=int, default=5, help="Runs per path (default: 5)")
+
+    def handle(self, *args, **options):
+        classroom = self._get_classroom(options.get("classroom"))
+        if not classroom:
+            self.stderr.write(self.style.ERROR("No classroom with students found."))
+            return
+
+        student_ids = list(
+            Student.objects.filter(classroom=classroom).order_by("id").values_list("id", flat=True)[: options["students"]]
+        )
+        if len(student_ids) < options["students"]:
+            self.stdout.write(self.style.WARNING(
+                f"Classroom {classroom.id} only has {len(student_ids)} students, benchmarking with those."
+            ))
+
+        statuses = ["present", "present", "present", "absent", "late", "leave"]
+        payload = [
+            {"student_id": sid, "status": statuses[i % len(statuses)], "remarks": ""}
+            for i, sid in enumerate(student_ids)
+        ]
+        runs = max(options["runs"], 1)
+
+        self.stdout.write(f"Classroom: {classroom} (id={classroom.id}), students: {len(payload)}, runs: {runs}")
+        for label, writer in (("legacy", self._legacy_mark), ("bulk", self._bulk_mark)):
+            queries, timings = self._measure(classroom, payload, writer, runs)
+            self.stdout.write(
+                f"{label:>7}: queries={queries:<5} "
+                f"p50={statistics.median(timings):.1f}ms min={min(timings):.1f}ms max={max(timings):.1f}ms"
+            )
+
+    def _get_classroom(self, classroom_id):
+        if classroom_id:
+            return ClassRoom.objects.filter(id=classroom_id).first()
+        return (
+            ClassRoom.objects.annotate(student_total=Count("students"))
+            .filter(student_total__gt=0)
+            .order_by("-student_total")
+            .first()
+        )
+
+    def _measure(self, classroom, payload, writer, runs):
+        timings = []
+        queries = 0
+        for _ in range(runs):
+            with transaction.atomic():
+                attendance, _ = Attendance.objects.get_or_create(classroom=classroom, date=timezone.now().date())
+                # Second pass measures the steady state: re-submitting an already marked class
+                writer(attendance, payload)
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    writer(attendance, payload)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries = len(ctx.captured_queries)
+                transaction.set_rollback(True)
+        return queries, timings
+
+    def _legacy_mark(self, attendance, payload):
+        """The pre-BulkAttendanceService write path of mark_bulk_attendance"""
+        attendance.student_attendances.all().delete()
+        for student_data in payload:
+            try:
+                student = Student.objects.get(id=student_data["student_id"], classroom=attendance.classroom)
+                StudentAttendance.objects.create(
+                    attendance=attendance,
+                    student=student,
+                    status=student_data["status"],
+                    remarks=student_data["remarks"],
+                )
+            except Student.DoesNotExist:
+                continue
+        attendance.update_counts()
+
+    def _bulk_mark(self, attendance, payload):
+        BulkAttendanceService.mark(attendance, payload)
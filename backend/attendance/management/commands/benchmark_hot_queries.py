@@ -0,0 +1,150 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from attendance.models import Attendance, StudentAttendance
+from classes.models import ClassRoom
+from result.models import Result
+from students.models import Student
+from utils.synthetic_data import SyntheticDataGenerator
+
+
+# Indexes added for the hot queries below
+HOT_INDEXES = [
+    "att_date_live_idx",
+    "student_campus_class_live_idx",
+    "student_class_name_live_idx",
+    "result_coord_status_idx",
+    "result_teacher_created_idx",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the attendance, student and result hot queries with and without the indexes from "
+        "attendance 0008 / students 0007 / result 0004 and print EXPLAIN plans and timings. "
+        "The indexes are dropped inside a transaction that is rolled back. "
+        "Use --seed first to generate a synthetic dataset (50 campuses, 50k students, a year of attendance)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="Generate the synthetic dataset (see generate_synthetic_data) before measuring")
+        parser.add_argument("--campuses", type=int, default=50, help="Campuses to seed (default: 50)")
+        parser.add_argument("--students", type=int, default=50000, help="Students to seed (default: 50000)")
+        parser.add_argument("--days", type=int, default=365, help="Days of weekday attendance to seed (default: 365)")
+        parser.add_argument("--runs", type=int, default=5, help="Runs per query (default: 5)")
+        parser.add_argument("--no-plans", action="store_true", help="Only print timings")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self._seed(options["campuses"], options["students"], options["days"])
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        params = self._sample_params()
+        if params is None:
+            raise CommandError("No attendance data found. Run with --seed first.")
+        queries = self._hot_queries(params)
+        runs = max(options["runs"], 1)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Database: {connection.vendor}, runs per query: {runs}"))
+        with transaction.atomic():
+            # Plain DROP INDEX: the SQLite schema editor refuses to run inside atomic()
+            with connection.cursor() as cursor:
+                for name in HOT_INDEXES:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+            before = self._measure(queries, runs)
+            transaction.set_rollback(True)
+        after = self._measure(queries, runs)
+
+        for label, _ in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+            for phase, results in (("before", before), ("after", after)):
+                rows, timings, plan = results[label]
+                self.stdout.write(
+                    f"  {phase:>6}: rows={rows:<6} p50={statistics.median(timings):.2f}ms "
+                    f"min={min(timings):.2f}ms max={max(timings):.2f}ms"
+                )
+                if not options["no_plans"]:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"          {line}")
+
+    def _hot_queries(self, params):
+        start, end = params["end"] - timedelta(days=30), params["end"]
+        return [
+            ("Attendance(classroom, date) range, live rows", lambda: Attendance.objects.filter(
+                classroom_id=params["classroom"], is_deleted=False, date__range=(start, end),
+            ).order_by("date")),
+            ("Attendance on one day for a campus, live rows", lambda: Attendance.objects.filter(
+                date=params["end"], is_deleted=False, classroom__grade__level__campus_id=params["campus"],
+            )),
+            ("StudentAttendance(student, attendance__date) history", lambda: StudentAttendance.objects.filter(
+                student_id=params["student"], is_deleted=False, attendance__date__range=(start, end),
+            )),
+            ("Student(campus, is_deleted, classroom)", lambda: Student.objects.filter(
+                campus_id=params["campus"], classroom_id=params["classroom"],
+            )),
+            ("Student(classroom, is_deleted, name) roster", lambda: Student.objects.filter(
+                classroom_id=params["classroom"],
+            ).order_by("name")),
+            ("Result(coordinator, status) review queue", lambda: Result.objects.filter(
+                coordinator_id=params["coordinator"], status="submitted",
+            )),
+            ("Result(teacher, created_at) latest", lambda: Result.objects.filter(
+                teacher_id=params["teacher"],
+            ).order_by("-created_at")[:50]),
+        ]
+
+    def _measure(self, queries, runs):
+        analyze = connection.vendor == "postgresql"
+        results = {}
+        for label, build in queries:
+            timings = []
+            rows = 0
+            for _ in range(runs):
+                started = time.perf_counter()
+                rows = len(list(build()))
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = build().explain(analyze=True) if analyze else build().explain()
+            results[label] = (rows, timings, plan)
+        return results
+
+    def _sample_params(self):
+        """Ids the hot queries run against: the busiest classroom and its campus, student, teacher"""
+        classroom = (
+            ClassRoom.objects.annotate(student_total=Count("students"))
+            .filter(student_total__gt=0, id__in=Attendance.objects.values("classroom_id"))
+            .select_related("grade__level")
+            .order_by("-student_total")
+            .first()
+        )
+        if classroom is None:
+            return None
+        latest = Attendance.objects.filter(classroom=classroom).order_by("-date").values_list("date", flat=True).first()
+        result = Result.objects.filter(student__classroom=classroom).order_by("id").first()
+        return {
+            "classroom": classroom.id,
+            "campus": classroom.grade.level.campus_id,
+            "student": Student.objects.filter(classroom=classroom).order_by("id").values_list("id", flat=True).first(),
+            "end": latest,
+            "teacher": result.teacher_id if result else None,
+            "coordinator": result.coordinator_id if result else None,
+        }
+
+    def _seed(self, campus_count, student_count, days):
+        generator = SyntheticDataGenerator(
+            campuses=campus_count,
+            students_per_class=max(student_count // (campus_count * 20), 1),
+            days=days,
+            log=self.stdout.write,
+        )
+        if generator.exists():
+            self.stdout.write(self.style.WARNING("Synthetic dataset already present, not seeding again."))
+            return
+        generator.generate()
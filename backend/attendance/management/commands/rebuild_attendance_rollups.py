@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from attendance.services import AttendanceRollupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild AttendanceDailyRollup rows (classroom, level and campus totals) from Attendance "
+        "for a date range. By default, rebuilds the last 365 days."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=str, default=None, help="Start date in YYYY-MM-DD (default: 365 days ago)")
+        parser.add_argument("--end", type=str, default=None, help="End date in YYYY-MM-DD (default: today)")
+        parser.add_argument("--campus", type=int, default=None, help="Only rebuild rows for this campus id")
+
+    def handle(self, *args, **options):
+        try:
+            end_date = self._parse_date(options.get("end")) or timezone.now().date()
+            start_date = self._parse_date(options.get("start")) or (end_date - timedelta(days=365))
+        except ValueError:
+            self.stderr.write(self.style.ERROR("Invalid date format. Use YYYY-MM-DD"))
+            return
+
+        if start_date > end_date:
+            self.stderr.write(self.style.ERROR("--start must be on or before --end"))
+            return
+
+        written = AttendanceRollupService.rebuild(start_date, end_date, campus_id=options.get("campus"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Attendance rollups rebuilt. Start: {start_date}, End: {end_date}. "
+            f"Classroom rows: {written['classroom']}, Level rows: {written['level']}, Campus rows: {written['campus']}."
+        ))
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        return datetime.strptime(value, "%Y-%m-%d").date()
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_alter_weekend_date'),
+        ('campus', '0007_alter_campus_library_available_and_more'),
+        ('classes', '0006_alter_level_campus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('classroom', 'Classroom'), ('level', 'Level'), ('campus', 'Campus')], max_length=10)),
+                ('date', models.DateField()),
+                ('classrooms_marked', models.PositiveIntegerField(default=0)),
+                ('total_students', models.PositiveIntegerField(default=0)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('leave_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('campus', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='campus.campus')),
+                ('classroom', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='classes.classroom')),
+                ('level', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='classes.level')),
+            ],
+            options={
+                'verbose_name': 'Attendance Daily Rollup',
+                'verbose_name_plural': 'Attendance Daily Rollups',
+                'ordering': ['-date', 'scope'],
+                'indexes': [models.Index(fields=['scope', 'level', 'date'], name='attendance__scope_ba335b_idx'), models.Index(fields=['scope', 'campus', 'date'], name='attendance__scope_66f4d7_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('scope', 'classroom')), fields=('classroom', 'date'), name='unique_classroom_daily_rollup'), models.UniqueConstraint(condition=models.Q(('scope', 'level')), fields=('level', 'date'), name='unique_level_daily_rollup'), models.UniqueConstraint(condition=models.Q(('scope', 'campus')), fields=('campus', 'date'), name='unique_campus_daily_rollup')],
+            },
+        ),
+    ]
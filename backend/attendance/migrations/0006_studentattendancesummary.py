@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendancedailyrollup'),
+        ('students', '0005_alter_student_campus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(help_text='e.g. 2025-26', max_length=10)),
+                ('total_marked', models.PositiveIntegerField(default=0)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('late_count', models.PositiveIntegerField(default=0)),
+                ('leave_count', models.PositiveIntegerField(default=0)),
+                ('excused_count', models.PositiveIntegerField(default=0)),
+                ('current_absent_streak', models.PositiveIntegerField(default=0)),
+                ('last_marked_date', models.DateField(blank=True, null=True)),
+                ('last_status', models.CharField(blank=True, choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('leave', 'Leave'), ('excused', 'Excused')], max_length=10, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Student Attendance Summary',
+                'verbose_name_plural': 'Student Attendance Summaries',
+                'ordering': ['-academic_year', 'student'],
+                'indexes': [models.Index(fields=['academic_year', 'current_absent_streak'], name='attendance__academi_18f148_idx')],
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+    ]
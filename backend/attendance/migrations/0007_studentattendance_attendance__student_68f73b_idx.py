@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_studentattendancesummary'),
+        ('students', '0005_alter_student_campus'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentattendance',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='attendance__student_68f73b_idx'),
+        ),
+    ]
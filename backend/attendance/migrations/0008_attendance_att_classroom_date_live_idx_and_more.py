@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('attendance', '0007_studentattendance_attendance__student_68f73b_idx'),
+        ('classes', '0006_alter_level_campus'),
+        ('students', '0006_student_students_st_created_a5766e_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['date'], name='att_date_live_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+COUNT_FIELDS = ['total_students', 'present_count', 'absent_count', 'late_count', 'leave_count']
+BATCH_SIZE = 2000
+
+
+def backfill_rollups(apps, schema_editor):
+    """Rebuild every daily rollup row from the live Attendance records (as rebuild_attendance_rollups does)"""
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceDailyRollup = apps.get_model('attendance', 'AttendanceDailyRollup')
+
+    AttendanceDailyRollup.objects.all().delete()
+
+    classroom_rows = []
+    parents = {}
+    records = Attendance.objects.filter(is_deleted=False, replaced_by_holiday=False).order_by().values(
+        'classroom_id', 'date', 'classroom__grade__level_id', 'classroom__grade__level__campus_id', *COUNT_FIELDS
+    )
+    for record in records.iterator(chunk_size=BATCH_SIZE):
+        level_id = record['classroom__grade__level_id']
+        campus_id = record['classroom__grade__level__campus_id']
+        counts = {field: record[field] for field in COUNT_FIELDS}
+        classroom_rows.append(AttendanceDailyRollup(
+            scope='classroom', date=record['date'], classroom_id=record['classroom_id'],
+            level_id=level_id, campus_id=campus_id, classrooms_marked=1, **counts
+        ))
+        if len(classroom_rows) >= BATCH_SIZE:
+            AttendanceDailyRollup.objects.bulk_create(classroom_rows)
+            classroom_rows = []
+
+        keys = []
+        if level_id:
+            keys.append(('level', level_id, record['date'], {'level_id': level_id, 'campus_id': campus_id}))
+        if campus_id:
+            keys.append(('campus', campus_id, record['date'], {'campus_id': campus_id}))
+        for scope, scope_id, day, fields in keys:
+            row = parents.get((scope, scope_id, day))
+            if row is None:
+                row = parents[(scope, scope_id, day)] = AttendanceDailyRollup(scope=scope, date=day, **fields)
+            row.classrooms_marked += 1
+            for field, value in counts.items():
+                setattr(row, field, getattr(row, field) + value)
+
+    AttendanceDailyRollup.objects.bulk_create(classroom_rows)
+    AttendanceDailyRollup.objects.bulk_create(parents.values(), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0008_attendance_att_classroom_date_live_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,10 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db.models import Q, Count, Sum
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
 
 User = get_user_model()
@@ -90,6 +91,11 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ['classroom', 'date']
         ordering = ['-date', 'classroom']
+        indexes = [
+            # Live rows only: the per-day campus/level views. Classroom ranges use the
+            # (classroom, date) unique index.
+            models.Index(fields=['date'], condition=Q(is_deleted=False), name='att_date_live_idx'),
+        ]
         verbose_name = "Attendance"
         verbose_name_plural = "Attendances"
     
@@ -124,19 +130,43 @@ class Attendance(models.Model):
         if self.classroom and not self.classroom.grade:
             raise ValidationError("Classroom must have an associated grade")
     
-    def update_counts(self):
-        """Update attendance counts from student attendance records"""
-        student_attendances = self.student_attendances.all()
-        self.total_students = student_attendances.count()
-        self.present_count = student_attendances.filter(status='present').count()
-        self.absent_count = student_attendances.filter(status='absent').count()
-        self.late_count = student_attendances.filter(status='late').count()
-        self.leave_count = student_attendances.filter(status='leave').count()
+    def update_counts(self, counts=None):
+        """
+        Update attendance counts from student attendance records.
+        Pass precomputed ``counts`` (total/present/absent/late/leave) to skip the aggregate query.
+        """
+        if counts is None:
+            counts = self.student_attendances.aggregate(
+                total=Count('id'),
+                present=Count('id', filter=Q(status='present')),
+                absent=Count('id', filter=Q(status='absent')),
+                late=Count('id', filter=Q(status='late')),
+                leave=Count('id', filter=Q(status='leave')),
+            )
+        self.total_students = counts.get('total') or 0
+        self.present_count = counts.get('present') or 0
+        self.absent_count = counts.get('absent') or 0
+        self.late_count = counts.get('late') or 0
+        self.leave_count = counts.get('leave') or 0
         # Use update_fields to prevent infinite recursion
         super(Attendance, self).save(update_fields=[
             'total_students', 'present_count', 'absent_count', 
             'late_count', 'leave_count', 'updated_at'
         ])
+        self.refresh_rollups()
+    
+    def refresh_rollups(self):
+        """Bring the daily classroom/level/campus rollups for this record's day up to date"""
+        from .services import AttendanceRollupService
+        AttendanceRollupService.refresh_for_attendance(self)
+    
+    def refresh_student_summaries(self):
+        """Recompute the yearly summaries of every student marked on this record"""
+        from .services import StudentAttendanceSummaryService
+        StudentAttendanceSummaryService.rebuild(
+            student_ids=self.student_attendances.values_list('student_id', flat=True),
+            academic_year=StudentAttendanceSummary.academic_year_for(self.date)
+        )
     
     def add_edit_history(self, user, action, reason=None, changes=None):
         """Add entry to edit history"""
@@ -160,6 +190,8 @@ class Attendance(models.Model):
         self.deleted_by = user
         self.add_edit_history(user, 'deleted', reason)
         self.save()
+        self.refresh_rollups()
+        self.refresh_student_summaries()
     
     def restore(self, user, reason=None):
         """Restore soft deleted attendance record"""
@@ -168,6 +200,8 @@ class Attendance(models.Model):
         self.deleted_by = None
         self.add_edit_history(user, 'restored', reason)
         self.save()
+        self.refresh_rollups()
+        self.refresh_student_summaries()
     
     def save(self, *args, **kwargs):
         # Run validation
@@ -233,6 +267,10 @@ class StudentAttendance(models.Model):
     class Meta:
         unique_together = ['student', 'attendance']
         ordering = ['attendance__date', 'student__name']
+        indexes = [
+            # Per-student history with keyset pagination (?cursor=)
+            models.Index(fields=['student', 'created_at', 'id']),
+        ]
         verbose_name = "Student Attendance"
         verbose_name_plural = "Student Attendances"
     
@@ -360,3 +398,151 @@ class Weekend(models.Model):
     
     def __str__(self):
         return f"Weekend - {self.date} ({self.level.name})"
+
+
+class AttendanceDailyRollup(models.Model):
+    """
+    Per-day attendance totals at classroom, level and campus granularity.
+    Maintained by attendance.services.AttendanceRollupService whenever counts change,
+    so dashboards can read one row per scope per day instead of raw Attendance rows.
+    Level/campus rows stay behind with classrooms_marked=0 when their last
+    classroom row goes away; readers skip those.
+    """
+    SCOPE_CHOICES = [
+        ('classroom', 'Classroom'),
+        ('level', 'Level'),
+        ('campus', 'Campus'),
+    ]
+    
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    date = models.DateField()
+    classroom = models.ForeignKey(
+        'classes.ClassRoom',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    level = models.ForeignKey(
+        'classes.Level',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    campus = models.ForeignKey(
+        'campus.Campus',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups'
+    )
+    
+    # Number of classroom attendance records rolled into this row
+    classrooms_marked = models.PositiveIntegerField(default=0)
+    total_students = models.PositiveIntegerField(default=0)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    leave_count = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date', 'scope']
+        verbose_name = "Attendance Daily Rollup"
+        verbose_name_plural = "Attendance Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['classroom', 'date'],
+                condition=Q(scope='classroom'),
+                name='unique_classroom_daily_rollup'
+            ),
+            models.UniqueConstraint(
+                fields=['level', 'date'],
+                condition=Q(scope='level'),
+                name='unique_level_daily_rollup'
+            ),
+            models.UniqueConstraint(
+                fields=['campus', 'date'],
+                condition=Q(scope='campus'),
+                name='unique_campus_daily_rollup'
+            ),
+        ]
+        # Classroom lookups use the partial unique index above; these serve the roll-ups
+        indexes = [
+            models.Index(fields=['scope', 'level', 'date']),
+            models.Index(fields=['scope', 'campus', 'date']),
+        ]
+    
+    def __str__(self):
+        target = self.classroom or self.level or self.campus
+        return f"{self.get_scope_display()} rollup - {target} - {self.date}"
+    
+    @property
+    def attendance_percentage(self):
+        """Calculate attendance percentage"""
+        if self.total_students == 0:
+            return 0
+        return round((self.present_count / self.total_students) * 100, 2)
+
+
+class StudentAttendanceSummary(models.Model):
+    """
+    Running attendance counters for one student in one academic year.
+    Maintained by the bulk marking path (attendance.services) so profile and
+    absentee lookups read a single row instead of the full attendance history.
+    """
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    academic_year = models.CharField(max_length=10, help_text="e.g. 2025-26")
+    
+    total_marked = models.PositiveIntegerField(default=0)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    leave_count = models.PositiveIntegerField(default=0)
+    excused_count = models.PositiveIntegerField(default=0)
+    
+    # Consecutive absences up to and including last_marked_date
+    current_absent_streak = models.PositiveIntegerField(default=0)
+    last_marked_date = models.DateField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, choices=StudentAttendance.STATUS_CHOICES, null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['student', 'academic_year']
+        ordering = ['-academic_year', 'student']
+        verbose_name = "Student Attendance Summary"
+        verbose_name_plural = "Student Attendance Summaries"
+        indexes = [
+            models.Index(fields=['academic_year', 'current_absent_streak']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student} - {self.academic_year}"
+    
+    @property
+    def attendance_percentage(self):
+        """Calculate attendance percentage"""
+        if self.total_marked == 0:
+            return 0
+        return round((self.present_count / self.total_marked) * 100, 2)
+    
+    @staticmethod
+    def academic_year_for(day):
+        """Academic year label ('2025-26') that a date falls in"""
+        start_year = day.year if day.month >= settings.ACADEMIC_YEAR_START_MONTH else day.year - 1
+        return f"{start_year}-{str(start_year + 1)[-2:]}"
+    
+    @staticmethod
+    def academic_year_bounds(academic_year):
+        """First and last date of an academic year label"""
+        start_year = int(academic_year.split('-')[0])
+        start = date(start_year, settings.ACADEMIC_YEAR_START_MONTH, 1)
+        end = date(start_year + 1, settings.ACADEMIC_YEAR_START_MONTH, 1) - timedelta(days=1)
+        return start, end
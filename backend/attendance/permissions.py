@@ -1,10 +1,33 @@
 from rest_framework import permissions
 from django.contrib.auth import get_user_model
 from .models import Attendance
+from users.role_profile import RoleProfileResolver
 
 User = get_user_model()
 
 
+def _role_profile(request):
+    """The caller's role profile, resolved once per request"""
+    return getattr(request, 'role_profile', None) or RoleProfileResolver.for_user(request.user)
+
+
+def _teacher_owns_classroom(request, classroom):
+    role_profile = _role_profile(request)
+    return role_profile.exists and classroom.id in role_profile.classroom_ids
+
+
+def _coordinator_manages_classroom(request, classroom):
+    role_profile = _role_profile(request)
+    return (role_profile.exists and role_profile.is_active and
+            classroom.grade.level_id in role_profile.level_ids)
+
+
+def _principal_manages_classroom(request, classroom):
+    role_profile = _role_profile(request)
+    return (role_profile.exists and role_profile.is_active and
+            role_profile.campus_id is not None and classroom.id in role_profile.classroom_ids)
+
+
 class CanMarkAttendance(permissions.BasePermission):
     """
     Permission class for marking attendance
@@ -24,33 +47,15 @@ class CanMarkAttendance(permissions.BasePermission):
         
         # Check if user has teacher profile
         if request.user.is_teacher():
-            try:
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(email=request.user.email)
-                if teacher and teacher.assigned_classroom:
-                    return True
-            except:
-                pass
+            role_profile = _role_profile(request)
+            if role_profile.exists and role_profile.classroom_ids:
+                return True
         
-        # Check if user has coordinator profile
-        if request.user.is_coordinator():
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(email=request.user.email)
-                if coordinator and coordinator.is_currently_active:
-                    return True
-            except:
-                pass
-        
-        # Check if user has principal profile
-        if request.user.is_principal():
-            try:
-                from principals.models import Principal
-                principal = Principal.objects.get(email=request.user.email)
-                if principal and principal.is_currently_active:
-                    return True
-            except:
-                pass
+        # Check if user has coordinator or principal profile
+        if request.user.is_coordinator() or request.user.is_principal():
+            role_profile = _role_profile(request)
+            if role_profile.exists and role_profile.is_active:
+                return True
         
         return False
     
@@ -64,35 +69,18 @@ class CanMarkAttendance(permissions.BasePermission):
         
         # Check teacher permissions
         if request.user.is_teacher():
-            try:
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(email=request.user.email)
-                if teacher and teacher.assigned_classroom == obj.classroom:
-                    return True
-            except:
-                pass
+            if _teacher_owns_classroom(request, obj.classroom):
+                return True
         
         # Check coordinator permissions
         if request.user.is_coordinator():
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(email=request.user.email)
-                if (coordinator and coordinator.is_currently_active and 
-                    coordinator.level == obj.classroom.grade.level):
-                    return True
-            except:
-                pass
+            if _coordinator_manages_classroom(request, obj.classroom):
+                return True
         
         # Check principal permissions
         if request.user.is_principal():
-            try:
-                from principals.models import Principal
-                principal = Principal.objects.get(email=request.user.email)
-                if (principal and principal.is_currently_active and 
-                    principal.campus == obj.classroom.campus):
-                    return True
-            except:
-                pass
+            if _principal_manages_classroom(request, obj.classroom):
+                return True
         
         return False
 
@@ -131,55 +119,26 @@ class CanEditAttendance(permissions.BasePermission):
             if request.user.is_coordinator() or request.user.is_principal():
                 # Check scope permissions
                 if request.user.is_coordinator():
-                    try:
-                        from coordinator.models import Coordinator
-                        coordinator = Coordinator.objects.get(email=request.user.email)
-                        return (coordinator and coordinator.is_currently_active and 
-                               coordinator.level == obj.classroom.grade.level)
-                    except:
-                        pass
+                    return _coordinator_manages_classroom(request, obj.classroom)
                 elif request.user.is_principal():
-                    try:
-                        from principals.models import Principal
-                        principal = Principal.objects.get(email=request.user.email)
-                        return (principal and principal.is_currently_active and 
-                               principal.campus == obj.classroom.campus)
-                    except:
-                        pass
+                    return _principal_manages_classroom(request, obj.classroom)
             return False
         
         # For recent attendance, check if user can edit
         # Teacher can edit their own classroom's attendance
         if request.user.is_teacher():
-            try:
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(email=request.user.email)
-                if teacher and teacher.assigned_classroom == obj.classroom:
-                    return True
-            except:
-                pass
+            if _teacher_owns_classroom(request, obj.classroom):
+                return True
         
         # Coordinator can edit classrooms in their level
         if request.user.is_coordinator():
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(email=request.user.email)
-                if (coordinator and coordinator.is_currently_active and 
-                    coordinator.level == obj.classroom.grade.level):
-                    return True
-            except:
-                pass
+            if _coordinator_manages_classroom(request, obj.classroom):
+                return True
         
         # Principal can edit classrooms in their campus
         if request.user.is_principal():
-            try:
-                from principals.models import Principal
-                principal = Principal.objects.get(email=request.user.email)
-                if (principal and principal.is_currently_active and 
-                    principal.campus == obj.classroom.campus):
-                    return True
-            except:
-                pass
+            if _principal_manages_classroom(request, obj.classroom):
+                return True
         
         return False
 
@@ -213,35 +172,18 @@ class CanViewAttendance(permissions.BasePermission):
         
         # Teacher can view their own classroom's attendance
         if request.user.is_teacher():
-            try:
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(email=request.user.email)
-                if teacher and teacher.assigned_classroom == obj.classroom:
-                    return True
-            except:
-                pass
+            if _teacher_owns_classroom(request, obj.classroom):
+                return True
         
         # Coordinator can view classrooms in their level
         if request.user.is_coordinator():
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(email=request.user.email)
-                if (coordinator and coordinator.is_currently_active and 
-                    coordinator.level == obj.classroom.grade.level):
-                    return True
-            except:
-                pass
+            if _coordinator_manages_classroom(request, obj.classroom):
+                return True
         
         # Principal can view classrooms in their campus
         if request.user.is_principal():
-            try:
-                from principals.models import Principal
-                principal = Principal.objects.get(email=request.user.email)
-                if (principal and principal.is_currently_active and 
-                    principal.campus == obj.classroom.campus):
-                    return True
-            except:
-                pass
+            if _principal_manages_classroom(request, obj.classroom):
+                return True
         
         return False
 
@@ -275,25 +217,13 @@ class CanDeleteAttendance(permissions.BasePermission):
         
         # Coordinator can delete attendance in their level
         if request.user.is_coordinator():
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(email=request.user.email)
-                if (coordinator and coordinator.is_currently_active and 
-                    coordinator.level == obj.classroom.grade.level):
-                    return True
-            except:
-                pass
+            if _coordinator_manages_classroom(request, obj.classroom):
+                return True
         
         # Principal can delete attendance in their campus
         if request.user.is_principal():
-            try:
-                from principals.models import Principal
-                principal = Principal.objects.get(email=request.user.email)
-                if (principal and principal.is_currently_active and 
-                    principal.campus == obj.classroom.campus):
-                    return True
-            except:
-                pass
+            if _principal_manages_classroom(request, obj.classroom):
+                return True
         
         return False
 
@@ -1,15 +1,16 @@
 import graphene
 from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
 from graphene import relay
 from django.contrib.auth import get_user_model
-from .models import Attendance, StudentAttendance
+from .models import Attendance, AttendanceDailyRollup, StudentAttendance, StudentAttendanceSummary
+from .services import BulkAttendanceService
+from backend.loaders import BatchedConnectionField, get_loaders
 from students.models import Student
 from classes.models import ClassRoom
 from teachers.models import Teacher
 from coordinator.models import Coordinator
 from principals.models import Principal
-from django.db.models import Q
+from django.db.models import Q, Count, Sum, Max
 from datetime import datetime, timedelta
 # import graphql_jwt  # Commented out - not compatible with Django 5.0
 
@@ -27,6 +28,9 @@ class StudentAttendanceType(DjangoObjectType):
     student_photo = graphene.String()
     is_editable = graphene.Boolean()
     
+    # Keys primed per page by BatchedConnectionField
+    loader_keys = {'students': 'student_id', 'attendances': 'attendance_id'}
+    
     class Meta:
         model = StudentAttendance
         fields = "__all__"
@@ -37,30 +41,36 @@ class StudentAttendanceType(DjangoObjectType):
             'student__name': ['icontains'],
         }
     
+    def resolve_student(self, info):
+        return get_loaders(info).students.load(self.student_id)
+    
     def resolve_student_name(self, info):
-        return self.student.name
+        return get_loaders(info).students.load(self.student_id).name
     
     def resolve_student_code(self, info):
-        return self.student.student_code
+        return get_loaders(info).students.load(self.student_id).student_code
     
     def resolve_student_photo(self, info):
-        if self.student.photo:
-            return info.context.build_absolute_uri(self.student.photo.url)
+        student = get_loaders(info).students.load(self.student_id)
+        if student.photo:
+            return info.context.build_absolute_uri(student.photo.url)
         return None
     
     def resolve_is_editable(self, info):
-        return self.attendance.is_editable
+        return get_loaders(info).attendances.load(self.attendance_id).is_editable
 
 
 class AttendanceType(DjangoObjectType):
     """GraphQL type for Attendance"""
-    student_attendances = DjangoFilterConnectionField(StudentAttendanceType)
+    student_attendances = BatchedConnectionField(StudentAttendanceType)
     classroom_name = graphene.String()
     marked_by_name = graphene.String()
     attendance_percentage = graphene.Float()
     is_editable = graphene.Boolean()
     edit_history = graphene.List(graphene.JSONString)
     
+    loader_keys = {'classrooms': 'classroom_id', 'users': 'marked_by_id'}
+    
     class Meta:
         model = Attendance
         fields = "__all__"
@@ -72,12 +82,19 @@ class AttendanceType(DjangoObjectType):
             'is_deleted': ['exact'],
         }
     
+    def resolve_classroom(self, info):
+        return get_loaders(info).classrooms.load(self.classroom_id)
+    
+    def resolve_marked_by(self, info):
+        return get_loaders(info).users.load(self.marked_by_id)
+    
     def resolve_classroom_name(self, info):
-        return str(self.classroom)
+        return str(get_loaders(info).classrooms.load(self.classroom_id))
     
     def resolve_marked_by_name(self, info):
-        if self.marked_by:
-            return self.marked_by.get_full_name() or self.marked_by.username
+        marked_by = get_loaders(info).users.load(self.marked_by_id)
+        if marked_by:
+            return marked_by.get_full_name() or marked_by.username
         return None
     
     def resolve_attendance_percentage(self, info):
@@ -111,9 +128,9 @@ class Query(graphene.ObjectType):
     """Attendance GraphQL Queries"""
     
     # Attendance queries
-    all_attendances = DjangoFilterConnectionField(AttendanceType)
+    all_attendances = BatchedConnectionField(AttendanceType)
     attendance = relay.Node.Field(AttendanceType)
-    classroom_attendances = DjangoFilterConnectionField(
+    classroom_attendances = BatchedConnectionField(
         AttendanceType,
         classroom_id=graphene.Int(required=True),
         start_date=graphene.Date(),
@@ -121,9 +138,9 @@ class Query(graphene.ObjectType):
     )
     
     # Student attendance queries
-    all_student_attendances = DjangoFilterConnectionField(StudentAttendanceType)
+    all_student_attendances = BatchedConnectionField(StudentAttendanceType)
     student_attendance = relay.Node.Field(StudentAttendanceType)
-    student_attendances = DjangoFilterConnectionField(
+    student_attendances = BatchedConnectionField(
         StudentAttendanceType,
         student_id=graphene.Int(required=True),
         start_date=graphene.Date(),
@@ -263,29 +280,32 @@ class Query(graphene.ObjectType):
         if student_id:
             # Student statistics
             student = Student.objects.get(id=student_id)
-            attendances = StudentAttendance.objects.filter(
+            totals = StudentAttendance.objects.filter(
                 student=student,
                 attendance__date__range=[start_date, end_date],
                 is_deleted=False
+            ).aggregate(
+                total_days=Count('id'),
+                present_days=Count('id', filter=Q(status='present')),
+                absent_days=Count('id', filter=Q(status='absent')),
+                late_days=Count('id', filter=Q(status='late')),
+                leave_days=Count('id', filter=Q(status='leave')),
+                last_attendance_date=Max('attendance__date')
             )
             
-            total_days = attendances.count()
-            present_days = attendances.filter(status='present').count()
-            absent_days = attendances.filter(status='absent').count()
-            late_days = attendances.filter(status='late').count()
-            leave_days = attendances.filter(status='leave').count()
-            
-            # Calculate consecutive absent days
-            consecutive_absent = 0
-            for attendance in attendances.filter(status='absent').order_by('-attendance__date'):
-                if attendance.attendance.date == (datetime.now().date() - timedelta(days=consecutive_absent)):
-                    consecutive_absent += 1
-                else:
-                    break
+            total_days = totals['total_days']
+            present_days = totals['present_days']
+            absent_days = totals['absent_days']
+            late_days = totals['late_days']
+            leave_days = totals['leave_days']
+            last_attendance_date = totals['last_attendance_date']
             
-            # Get last attendance date
-            last_attendance = attendances.order_by('-attendance__date').first()
-            last_attendance_date = last_attendance.attendance.date if last_attendance else None
+            # Current absence streak is maintained on the yearly summary
+            summary = StudentAttendanceSummary.objects.filter(
+                student=student,
+                academic_year=StudentAttendanceSummary.academic_year_for(end_date)
+            ).first()
+            consecutive_absent = summary.current_absent_streak if summary else 0
             
             attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
             
@@ -304,17 +324,23 @@ class Query(graphene.ObjectType):
         elif classroom_id:
             # Classroom statistics
             classroom = ClassRoom.objects.get(id=classroom_id)
-            attendances = Attendance.objects.filter(
+            totals = AttendanceDailyRollup.objects.filter(
+                scope='classroom',
                 classroom=classroom,
-                date__range=[start_date, end_date],
-                is_deleted=False
+                date__range=[start_date, end_date]
+            ).aggregate(
+                total_days=Count('id'),
+                total_present=Sum('present_count'),
+                total_absent=Sum('absent_count'),
+                total_late=Sum('late_count'),
+                total_leave=Sum('leave_count')
             )
             
-            total_days = attendances.count()
-            total_present = sum(att.present_count for att in attendances)
-            total_absent = sum(att.absent_count for att in attendances)
-            total_late = sum(att.late_count for att in attendances)
-            total_leave = sum(att.leave_count for att in attendances)
+            total_days = totals['total_days']
+            total_present = totals['total_present'] or 0
+            total_absent = totals['total_absent'] or 0
+            total_late = totals['total_late'] or 0
+            total_leave = totals['total_leave'] or 0
             
             attendance_percentage = (total_present / (total_present + total_absent) * 100) if (total_present + total_absent) > 0 else 0
             
@@ -439,30 +465,16 @@ class MarkAttendance(graphene.Mutation):
                     attendance.updated_by = user
                     attendance.save()
                 
-                # Clear existing student attendance records
-                attendance.student_attendances.all().delete()
-                
-                # Create new student attendance records
+                # Validate all students against the classroom roster in one query
+                valid_student_ids = BulkAttendanceService.get_classroom_student_ids(classroom.id)
                 for student_data in input.student_attendance:
-                    try:
-                        student = Student.objects.get(id=student_data['student_id'])
-                        
-                        # Validate student belongs to this classroom
-                        if student.classroom != classroom:
-                            raise ValueError(f"Student {student.name} does not belong to this classroom")
-                        
-                        StudentAttendance.objects.create(
-                            attendance=attendance,
-                            student=student,
-                            status=student_data['status'],
-                            remarks=student_data.get('remarks', ''),
-                            created_by=user
-                        )
-                    except Student.DoesNotExist:
-                        raise ValueError(f"Student with ID {student_data['student_id']} not found")
+                    if int(student_data['student_id']) not in valid_student_ids:
+                        raise ValueError(f"Student with ID {student_data['student_id']} does not belong to this classroom")
                 
-                # Update attendance summary
-                attendance.update_counts()
+                # Replace student rows and update attendance summary in bulk
+                BulkAttendanceService.mark(
+                    attendance, input.student_attendance, user=user, valid_student_ids=valid_student_ids
+                )
             
             return MarkAttendance(
                 success=True,
@@ -531,21 +543,8 @@ class EditAttendance(graphene.Mutation):
                 'leave_count': attendance.leave_count
             }
             
-            # Clear existing student attendance records
-            attendance.student_attendances.all().delete()
-            
-            # Create new student attendance records
-            for student_data in input.student_attendance:
-                StudentAttendance.objects.create(
-                    attendance=attendance,
-                    student_id=student_data['student_id'],
-                    status=student_data['status'],
-                    remarks=student_data.get('remarks', ''),
-                    created_by=user
-                )
-            
-            # Update attendance summary
-            attendance.update_counts()
+            # Replace student rows and update attendance summary in bulk
+            BulkAttendanceService.mark(attendance, input.student_attendance, user=user)
             
             # Add edit history
             attendance.add_edit_history(
@@ -0,0 +1,594 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    Attendance, AttendanceDailyRollup, Holiday, StudentAttendance, StudentAttendanceSummary, Weekend
+)
+from .signals import suspend_count_updates
+from classes.models import ClassRoom, Grade, Level
+from students.models import Student
+from utils.response_cache import bump_version
+
+
+class BulkAttendanceService:
+    """Set-based marking of a whole classroom for one attendance record"""
+
+    COUNTED_STATUSES = ('present', 'absent', 'late', 'leave')
+    UPDATE_FIELDS = ['status', 'remarks', 'updated_by', 'updated_at']
+
+    @staticmethod
+    def get_classroom_student_ids(classroom_id):
+        """Ids of active students enrolled in the classroom (one query)"""
+        return set(
+            Student.objects.filter(classroom_id=classroom_id).values_list('id', flat=True)
+        )
+
+    @staticmethod
+    def build_rows(attendance, student_attendance_data, valid_student_ids, user=None):
+        """
+        Turn the request payload into unsaved StudentAttendance rows.
+        Entries without a student id or for students outside the classroom are dropped,
+        the last entry wins when a student appears twice.
+        """
+        rows = {}
+        for student_data in student_attendance_data:
+            try:
+                student_id = int(student_data.get('student_id'))
+            except (TypeError, ValueError):
+                continue
+
+            if student_id not in valid_student_ids:
+                continue
+
+            rows[student_id] = StudentAttendance(
+                attendance=attendance,
+                student_id=student_id,
+                status=student_data.get('status', 'present'),
+                remarks=student_data.get('remarks', ''),
+                created_by=user,
+                updated_by=user,
+            )
+        return list(rows.values())
+
+    @staticmethod
+    def count_statuses(rows):
+        """Attendance counters computed in memory from the rows being written"""
+        counts = {'total': len(rows)}
+        for key in BulkAttendanceService.COUNTED_STATUSES:
+            counts[key] = 0
+        for row in rows:
+            if row.status in counts:
+                counts[row.status] += 1
+        return counts
+
+    @staticmethod
+    def mark(attendance, student_attendance_data, user=None, valid_student_ids=None):
+        """
+        Replace the student rows of ``attendance`` with ``student_attendance_data``.
+
+        Membership is validated against a preloaded id set, students missing from the
+        payload are removed with one DELETE, new or changed rows are upserted on
+        (student, attendance), and the counters and per-student summaries are written
+        from memory, so the query count does not grow with class size. Returns the counts dict.
+        """
+        if valid_student_ids is None:
+            valid_student_ids = BulkAttendanceService.get_classroom_student_ids(attendance.classroom_id)
+
+        rows = BulkAttendanceService.build_rows(
+            attendance, student_attendance_data, valid_student_ids, user
+        )
+        counts = BulkAttendanceService.count_statuses(rows)
+
+        with transaction.atomic(), suspend_count_updates():
+            existing = {
+                student_id: (status, remarks)
+                for student_id, status, remarks in StudentAttendance.objects.filter(
+                    attendance=attendance
+                ).values_list('student_id', 'status', 'remarks')
+            }
+            submitted_ids = {row.student_id for row in rows}
+            changed_rows = [
+                row for row in rows
+                if existing.get(row.student_id) != (row.status, row.remarks)
+            ]
+
+            if set(existing) - submitted_ids:
+                StudentAttendance.objects.filter(attendance=attendance).exclude(
+                    student_id__in=submitted_ids
+                ).delete()
+
+            if changed_rows:
+                StudentAttendance.objects.bulk_create(
+                    changed_rows,
+                    update_conflicts=True,
+                    unique_fields=['student', 'attendance'],
+                    update_fields=BulkAttendanceService.UPDATE_FIELDS,
+                )
+
+            attendance.update_counts(counts)
+            StudentAttendanceSummaryService.apply_changes(
+                attendance.date,
+                previous={student_id: status for student_id, (status, _) in existing.items()},
+                current={row.student_id: row.status for row in rows},
+            )
+
+        return counts
+
+
+class AttendanceRollupService:
+    """Keeps AttendanceDailyRollup in step with Attendance and rebuilds it for date ranges"""
+
+    COUNT_FIELDS = ['total_students', 'present_count', 'absent_count', 'late_count', 'leave_count']
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _counts_from(source):
+        return {field: getattr(source, field) for field in AttendanceRollupService.COUNT_FIELDS}
+
+    @staticmethod
+    def refresh_for_attendance(attendance):
+        """
+        Bring the rollups for the classroom/day of one Attendance up to date.
+
+        The classroom row is locked and rewritten from the record's own counters. The
+        level and campus rows get the signed difference between the new and the old
+        classroom counts as F() increments, so two classrooms of one campus submitting
+        at once add up instead of overwriting each other's totals. The increments run
+        in their own short transaction after the marking transaction commits, so the
+        campus row is not locked for the rest of every roll-call.
+        """
+        placement = ClassRoom.objects.filter(id=attendance.classroom_id).values(
+            'grade__level_id', 'grade__level__campus_id'
+        ).first()
+        if not placement:
+            return
+        level_id = placement['grade__level_id']
+        campus_id = placement['grade__level__campus_id']
+        key = {'scope': 'classroom', 'classroom_id': attendance.classroom_id, 'date': attendance.date}
+
+        with transaction.atomic():
+            # Create the row if needed, then lock it: writers of the same classroom and day queue here
+            AttendanceDailyRollup.objects.bulk_create(
+                [AttendanceDailyRollup(level_id=level_id, campus_id=campus_id, **key)], ignore_conflicts=True
+            )
+            row = AttendanceDailyRollup.objects.select_for_update().get(**key)
+            previous = {'classrooms_marked': row.classrooms_marked, **AttendanceRollupService._counts_from(row)}
+            previous_parents = (row.level_id, row.campus_id)
+
+            if attendance.is_deleted or attendance.replaced_by_holiday:
+                current = dict.fromkeys(previous, 0)
+                row.delete()
+            else:
+                current = {'classrooms_marked': 1, **AttendanceRollupService._counts_from(attendance)}
+                for field, value in current.items():
+                    setattr(row, field, value)
+                row.level_id = level_id
+                row.campus_id = campus_id
+                row.save()
+
+            deltas = {}
+            for parents, sign, counts in ((previous_parents, -1, previous), ((level_id, campus_id), 1, current)):
+                for parent in AttendanceRollupService._parents(*parents):
+                    delta = deltas.setdefault(parent, dict.fromkeys(counts, 0))
+                    for field, value in counts.items():
+                        delta[field] += sign * value
+            deltas = {parent: delta for parent, delta in deltas.items() if any(delta.values())}
+            if deltas:
+                transaction.on_commit(
+                    lambda: AttendanceRollupService._apply_parent_deltas(attendance.date, deltas), robust=True
+                )
+
+    @staticmethod
+    def _parents(level_id, campus_id):
+        """(scope, level_id, campus_id) of the level and campus rows a classroom row rolls into"""
+        parents = []
+        if level_id:
+            parents.append(('level', level_id, campus_id))
+        if campus_id:
+            parents.append(('campus', None, campus_id))
+        return parents
+
+    @staticmethod
+    def _apply_parent_deltas(day, deltas):
+        """
+        Add signed count differences to level/campus rows. Rows that drop to zero
+        classrooms are kept (readers skip them), so a concurrent increment never
+        targets a row that was just deleted.
+        """
+        # Levels before campuses, in id order, so concurrent callers lock rows in the same order
+        ordered = sorted(deltas.items(), key=lambda item: (item[0][0] != 'level', item[0][1] or 0, item[0][2] or 0))
+        with transaction.atomic():
+            for (scope, level_id, campus_id), delta in ordered:
+                AttendanceDailyRollup.objects.bulk_create(
+                    [AttendanceDailyRollup(scope=scope, date=day, level_id=level_id, campus_id=campus_id)],
+                    ignore_conflicts=True,
+                )
+                lookup = {'level_id': level_id} if scope == 'level' else {'campus_id': campus_id}
+                AttendanceDailyRollup.objects.filter(scope=scope, date=day, **lookup).update(
+                    updated_at=timezone.now(),
+                    **{field: F(field) + value for field, value in delta.items() if value}
+                )
+        # update() sends no post_save, which is what bumps the cached attendance summaries
+        bump_version('attendance')
+
+    @staticmethod
+    def rebuild(start_date, end_date, campus_id=None):
+        """
+        Recompute every rollup row between start_date and end_date (inclusive),
+        optionally for a single campus. Returns the number of rows written per scope.
+        """
+        attendances = Attendance.objects.filter(
+            date__range=[start_date, end_date],
+            is_deleted=False,
+            replaced_by_holiday=False
+        )
+        stale = AttendanceDailyRollup.objects.filter(date__range=[start_date, end_date])
+        if campus_id:
+            attendances = attendances.filter(classroom__grade__level__campus_id=campus_id)
+            stale = stale.filter(campus_id=campus_id)
+
+        classroom_rows = []
+        level_rows = {}
+        campus_rows = {}
+        records = attendances.order_by().values(
+            'classroom_id', 'date', 'classroom__grade__level_id', 'classroom__grade__level__campus_id',
+            *AttendanceRollupService.COUNT_FIELDS
+        )
+        for record in records.iterator(chunk_size=2000):
+            level_id = record['classroom__grade__level_id']
+            record_campus_id = record['classroom__grade__level__campus_id']
+            counts = {field: record[field] for field in AttendanceRollupService.COUNT_FIELDS}
+
+            classroom_rows.append(AttendanceDailyRollup(
+                scope='classroom',
+                date=record['date'],
+                classroom_id=record['classroom_id'],
+                level_id=level_id,
+                campus_id=record_campus_id,
+                classrooms_marked=1,
+                **counts
+            ))
+
+            parents = [(level_rows, (level_id, record['date']), 'level', {'level_id': level_id, 'campus_id': record_campus_id})]
+            if record_campus_id:
+                parents.append((campus_rows, (record_campus_id, record['date']), 'campus', {'campus_id': record_campus_id}))
+            for bucket, key, scope, fields in parents:
+                row = bucket.get(key)
+                if row is None:
+                    row = bucket[key] = AttendanceDailyRollup(scope=scope, date=record['date'], **fields)
+                row.classrooms_marked += 1
+                for field, value in counts.items():
+                    setattr(row, field, getattr(row, field) + value)
+
+        with transaction.atomic():
+            stale.delete()
+            for rows in (classroom_rows, level_rows.values(), campus_rows.values()):
+                AttendanceDailyRollup.objects.bulk_create(rows, batch_size=AttendanceRollupService.BATCH_SIZE)
+
+        return {
+            'classroom': len(classroom_rows),
+            'level': len(level_rows),
+            'campus': len(campus_rows),
+        }
+
+
+class StudentAttendanceSummaryService:
+    """Maintains StudentAttendanceSummary rows for the marking paths and rebuilds them from history"""
+
+    STATUS_FIELDS = {
+        'present': 'present_count',
+        'absent': 'absent_count',
+        'late': 'late_count',
+        'leave': 'leave_count',
+        'excused': 'excused_count',
+    }
+    UPDATE_FIELDS = [
+        'total_marked', 'present_count', 'absent_count', 'late_count', 'leave_count',
+        'excused_count', 'current_absent_streak', 'last_marked_date', 'last_status', 'updated_at'
+    ]
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _adjust(summary, status, delta):
+        field = StudentAttendanceSummaryService.STATUS_FIELDS.get(status)
+        if field:
+            setattr(summary, field, max(getattr(summary, field) + delta, 0))
+        summary.total_marked = max(summary.total_marked + delta, 0)
+
+    @staticmethod
+    def apply_changes(day, previous, current):
+        """
+        Fold one classroom/day of status changes into the summaries.
+
+        ``previous`` and ``current`` map student id -> status before and after the write.
+        Counters move by deltas; the streak moves forward in place when ``day`` is the
+        student's newest marked day, and the few students whose streak cannot be derived
+        from the delta (back-dated or withdrawn marks) are recomputed from history.
+        """
+        changed = {
+            student_id for student_id in set(previous) | set(current)
+            if previous.get(student_id) != current.get(student_id)
+        }
+        if not changed:
+            return
+
+        academic_year = StudentAttendanceSummary.academic_year_for(day)
+        summaries = {
+            summary.student_id: summary
+            for summary in StudentAttendanceSummary.objects.filter(
+                student_id__in=changed, academic_year=academic_year
+            )
+        }
+
+        to_create = []
+        to_update = []
+        to_recompute = set()
+        for student_id in changed:
+            old_status = previous.get(student_id)
+            new_status = current.get(student_id)
+            summary = summaries.get(student_id)
+            if summary is None:
+                if old_status:
+                    # Counters were never built for this student, derive them from history
+                    to_recompute.add(student_id)
+                    continue
+                summary = StudentAttendanceSummary(student_id=student_id, academic_year=academic_year)
+                to_create.append(summary)
+            else:
+                to_update.append(summary)
+
+            if old_status:
+                StudentAttendanceSummaryService._adjust(summary, old_status, -1)
+            if new_status:
+                StudentAttendanceSummaryService._adjust(summary, new_status, 1)
+
+            latest = summary.last_marked_date
+            if new_status and (latest is None or day > latest):
+                summary.current_absent_streak = summary.current_absent_streak + 1 if new_status == 'absent' else 0
+                summary.last_marked_date = day
+                summary.last_status = new_status
+            elif new_status and day == latest and new_status != 'absent':
+                summary.current_absent_streak = 0
+                summary.last_status = new_status
+            else:
+                to_recompute.add(student_id)
+
+        StudentAttendanceSummary.objects.bulk_create(to_create)
+        StudentAttendanceSummary.objects.bulk_update(
+            [summary for summary in to_update if summary.student_id not in to_recompute],
+            StudentAttendanceSummaryService.UPDATE_FIELDS
+        )
+        if to_recompute:
+            StudentAttendanceSummaryService.rebuild(student_ids=to_recompute, academic_year=academic_year)
+
+    @staticmethod
+    def rebuild(student_ids=None, academic_year=None):
+        """
+        Recompute summaries from StudentAttendance, optionally limited to some students
+        and/or one academic year. Returns the number of summary rows written.
+        """
+        records = StudentAttendance.objects.filter(
+            is_deleted=False,
+            attendance__is_deleted=False,
+            attendance__replaced_by_holiday=False
+        )
+        stale = StudentAttendanceSummary.objects.all()
+        if student_ids is not None:
+            student_ids = list(student_ids)
+            records = records.filter(student_id__in=student_ids)
+            stale = stale.filter(student_id__in=student_ids)
+        if academic_year:
+            start_date, end_date = StudentAttendanceSummary.academic_year_bounds(academic_year)
+            records = records.filter(attendance__date__range=[start_date, end_date])
+            stale = stale.filter(academic_year=academic_year)
+
+        summaries = {}
+        records = records.order_by('student_id', 'attendance__date').values_list(
+            'student_id', 'attendance__date', 'status'
+        )
+        for student_id, day, status in records.iterator(chunk_size=5000):
+            year = StudentAttendanceSummary.academic_year_for(day)
+            summary = summaries.get((student_id, year))
+            if summary is None:
+                summary = summaries[(student_id, year)] = StudentAttendanceSummary(
+                    student_id=student_id, academic_year=year
+                )
+            StudentAttendanceSummaryService._adjust(summary, status, 1)
+            summary.current_absent_streak = summary.current_absent_streak + 1 if status == 'absent' else 0
+            summary.last_marked_date = day
+            summary.last_status = status
+
+        with transaction.atomic():
+            stale.delete()
+            StudentAttendanceSummary.objects.bulk_create(
+                summaries.values(), batch_size=StudentAttendanceSummaryService.BATCH_SIZE
+            )
+        return len(summaries)
+
+
+class ChronicAbsenteeReportService:
+    """
+    Ranks students of a level or campus by absence rate and longest absence streak.
+    Everything is computed in the database with window functions over StudentAttendance
+    joined to Attendance.date, skipping days recorded as Weekend or Holiday for the level.
+    """
+
+    CSV_HEADER = [
+        'rank', 'student_id', 'student_name', 'student_code', 'gr_no', 'classroom_id', 'classroom',
+        'school_days', 'absent_days', 'absence_rate', 'longest_streak', 'last_marked_date'
+    ]
+    CHUNK_SIZE = 1000
+
+    @staticmethod
+    def _sql(scope_field, recent_days, paginate):
+        tables = {
+            'student_attendance': StudentAttendance._meta.db_table,
+            'attendance': Attendance._meta.db_table,
+            'classroom': ClassRoom._meta.db_table,
+            'grade': Grade._meta.db_table,
+            'level': Level._meta.db_table,
+            'weekend': Weekend._meta.db_table,
+            'holiday': Holiday._meta.db_table,
+            'student': Student._meta.db_table,
+        }
+        scope_column = {'level': 'g.level_id', 'campus': 'l.campus_id'}[scope_field]
+        recent_filter = 'WHERE recent_seq <= %(recent_days)s' if recent_days else ''
+        page_clause = 'LIMIT %(limit)s OFFSET %(offset)s' if paginate else ''
+        return f"""
+            WITH school_day_marks AS (
+                SELECT sa.student_id,
+                       a.classroom_id,
+                       a.date,
+                       CASE WHEN sa.status = 'absent' THEN 1 ELSE 0 END AS is_absent,
+                       ROW_NUMBER() OVER (PARTITION BY sa.student_id ORDER BY a.date DESC) AS recent_seq
+                FROM {tables['student_attendance']} sa
+                JOIN {tables['attendance']} a ON a.id = sa.attendance_id
+                JOIN {tables['classroom']} c ON c.id = a.classroom_id
+                JOIN {tables['grade']} g ON g.id = c.grade_id
+                JOIN {tables['level']} l ON l.id = g.level_id
+                WHERE {scope_column} = %(scope_id)s
+                  AND a.date BETWEEN %(start_date)s AND %(end_date)s
+                  AND a.is_deleted = %(false)s
+                  AND a.replaced_by_holiday = %(false)s
+                  AND sa.is_deleted = %(false)s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {tables['weekend']} w WHERE w.level_id = g.level_id AND w.date = a.date
+                  )
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {tables['holiday']} h WHERE h.level_id = g.level_id AND h.date = a.date
+                  )
+            ),
+            marks AS (
+                SELECT student_id, classroom_id, date, is_absent,
+                       ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY date)
+                       - ROW_NUMBER() OVER (PARTITION BY student_id, is_absent ORDER BY date) AS run_group
+                FROM school_day_marks
+                {recent_filter}
+            ),
+            streaks AS (
+                SELECT student_id, MAX(run_length) AS longest_streak
+                FROM (
+                    SELECT student_id, COUNT(*) AS run_length
+                    FROM marks
+                    WHERE is_absent = 1
+                    GROUP BY student_id, run_group
+                ) runs
+                GROUP BY student_id
+            ),
+            totals AS (
+                SELECT student_id,
+                       COUNT(*) AS school_days,
+                       SUM(is_absent) AS absent_days,
+                       MAX(date) AS last_marked_date
+                FROM marks
+                GROUP BY student_id
+            ),
+            ranked AS (
+                SELECT t.student_id,
+                       t.school_days,
+                       t.absent_days,
+                       t.last_marked_date,
+                       COALESCE(st.longest_streak, 0) AS longest_streak,
+                       ROUND(100.0 * t.absent_days / t.school_days, 2) AS absence_rate,
+                       RANK() OVER (
+                           ORDER BY 1.0 * t.absent_days / t.school_days DESC, COALESCE(st.longest_streak, 0) DESC
+                       ) AS absence_rank
+                FROM totals t
+                LEFT JOIN streaks st ON st.student_id = t.student_id
+                WHERE t.absent_days >= %(min_absences)s
+                  AND 100.0 * t.absent_days / t.school_days >= %(min_rate)s
+            )
+            SELECT r.absence_rank,
+                   s.id,
+                   s.name,
+                   s.student_code,
+                   s.gr_no,
+                   s.classroom_id,
+                   r.school_days,
+                   r.absent_days,
+                   r.absence_rate,
+                   r.longest_streak,
+                   r.last_marked_date,
+                   COUNT(*) OVER () AS total_count
+            FROM ranked r
+            JOIN {tables['student']} s ON s.id = r.student_id
+            WHERE s.is_deleted = %(false)s
+            ORDER BY r.absence_rank, s.name, s.id
+            {page_clause}
+        """
+
+    @staticmethod
+    def _params(scope_id, start_date, end_date, recent_days, min_absences, min_rate, limit=None, offset=None):
+        return {
+            'scope_id': scope_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'recent_days': recent_days,
+            'min_absences': min_absences,
+            'min_rate': min_rate,
+            'limit': limit,
+            'offset': offset,
+            'false': False,
+        }
+
+    @staticmethod
+    def _classroom_labels(classroom_ids):
+        classrooms = ClassRoom.objects.filter(id__in=set(classroom_ids)).select_related('grade')
+        return {classroom.id: str(classroom) for classroom in classrooms}
+
+    @staticmethod
+    def _to_dict(row, classroom_labels):
+        return {
+            'rank': row[0],
+            'student_id': row[1],
+            'student_name': row[2],
+            'student_code': row[3],
+            'gr_no': row[4],
+            'classroom_id': row[5],
+            'classroom': classroom_labels.get(row[5]),
+            'school_days': row[6],
+            'absent_days': row[7],
+            'absence_rate': float(row[8]),
+            'longest_streak': row[9],
+            'last_marked_date': row[10],
+        }
+
+    @staticmethod
+    def page(scope_field, scope_id, start_date, end_date, page=1, page_size=50,
+             recent_days=None, min_absences=1, min_rate=0):
+        """One page of the ranking plus the total number of ranked students"""
+        sql = ChronicAbsenteeReportService._sql(scope_field, recent_days, paginate=True)
+        params = ChronicAbsenteeReportService._params(
+            scope_id, start_date, end_date, recent_days, min_absences, min_rate,
+            limit=page_size, offset=(page - 1) * page_size
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        classroom_labels = ChronicAbsenteeReportService._classroom_labels(row[5] for row in rows)
+        return {
+            'count': rows[0][11] if rows else 0,
+            'results': [ChronicAbsenteeReportService._to_dict(row, classroom_labels) for row in rows],
+        }
+
+    @staticmethod
+    def iter_csv_rows(scope_field, scope_id, start_date, end_date,
+                      recent_days=None, min_absences=1, min_rate=0):
+        """Yield the full ranking as CSV value lists, fetched in chunks from a server-side cursor"""
+        sql = ChronicAbsenteeReportService._sql(scope_field, recent_days, paginate=False)
+        params = ChronicAbsenteeReportService._params(
+            scope_id, start_date, end_date, recent_days, min_absences, min_rate
+        )
+        yield ChronicAbsenteeReportService.CSV_HEADER
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(ChronicAbsenteeReportService.CHUNK_SIZE)
+                if not rows:
+                    break
+                classroom_labels = ChronicAbsenteeReportService._classroom_labels(row[5] for row in rows)
+                for row in rows:
+                    data = ChronicAbsenteeReportService._to_dict(row, classroom_labels)
+                    yield [data[column] for column in ChronicAbsenteeReportService.CSV_HEADER]
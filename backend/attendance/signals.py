@@ -1,18 +1,66 @@
+import threading
+from contextlib import contextmanager
+
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import StudentAttendance, Attendance
+from .models import StudentAttendance, Attendance, AttendanceDailyRollup
+from utils.response_cache import bump_version
+
+_signal_state = threading.local()
+
+
+@contextmanager
+def suspend_count_updates():
+    """
+    Skip the per-row count refresh while a bulk writer maintains
+    the attendance counters itself (see attendance.services).
+    """
+    previous = getattr(_signal_state, 'suspended', False)
+    _signal_state.suspended = True
+    try:
+        yield
+    finally:
+        _signal_state.suspended = previous
+
+
+def count_updates_suspended():
+    return getattr(_signal_state, 'suspended', False)
+
+
+def refresh_student_summary(instance):
+    """Recompute the yearly summary of the student behind a single-row change"""
+    from .models import StudentAttendanceSummary
+    from .services import StudentAttendanceSummaryService
+    StudentAttendanceSummaryService.rebuild(
+        student_ids=[instance.student_id],
+        academic_year=StudentAttendanceSummary.academic_year_for(instance.attendance.date)
+    )
 
 
 @receiver(post_save, sender=StudentAttendance)
 def update_attendance_counts_on_save(sender, instance, **kwargs):
     """Update attendance counts when student attendance is saved"""
+    if count_updates_suspended():
+        return
     if instance.attendance:
         instance.attendance.update_counts()
+        refresh_student_summary(instance)
 
 
 @receiver(post_delete, sender=StudentAttendance)
 def update_attendance_counts_on_delete(sender, instance, **kwargs):
     """Update attendance counts when student attendance is deleted"""
+    if count_updates_suspended():
+        return
     if instance.attendance:
         instance.attendance.update_counts()
+        refresh_student_summary(instance)
+
 
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=AttendanceDailyRollup)
+@receiver(post_delete, sender=AttendanceDailyRollup)
+def bump_attendance_cache_version(sender, instance, **kwargs):
+    """Attendance counts and rollups feed the cached attendance summaries"""
+    bump_version('attendance')
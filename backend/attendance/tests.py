@@ -0,0 +1,121 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Attendance, AttendanceDailyRollup
+from .services import AttendanceRollupService, BulkAttendanceService
+from campus.models import Campus
+from classes.models import ClassRoom, Grade, Level
+from students.models import Student
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class MarkedClassroomsMixin:
+    DAY = date(2025, 3, 3)
+
+    def setUp(self):
+        cache.clear()
+        campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        self.level = Level.objects.create(name='Primary', shift='morning', campus=campus)
+        self.grade = Grade.objects.create(name='Grade-1', level=self.level)
+        self.admin = User.objects.create(
+            username='S-admin', email='admin@example.com', role='superadmin', is_superuser=True,
+        )
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(self.admin).access_token}'
+
+    def add_marked_classroom(self, section, students=3):
+        classroom = ClassRoom.objects.create(grade=self.grade, section=section, shift='morning')
+        students_rows = []
+        for number in range(students):
+            student = Student.objects.create(
+                name=f'Student {section}{number}', classroom=classroom, campus=self.level.campus,
+                current_grade='Grade-1', section=section, shift='morning', enrollment_year=2025,
+                gender='female', is_draft=False,
+            )
+            students_rows.append({'student_id': student.id, 'status': 'present' if number else 'absent'})
+        attendance = Attendance.objects.create(classroom=classroom, date=self.DAY, marked_by=self.admin)
+        BulkAttendanceService.mark(attendance, students_rows, user=self.admin)
+        return attendance, students_rows
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LevelAttendanceSummaryQueryTests(MarkedClassroomsMixin, TestCase):
+    """get_level_attendance_summary must not run more queries for more classrooms"""
+
+    def get_summary(self):
+        cache.clear()
+        response = self.client.get(
+            f'/api/attendance/level/{self.level.id}/summary/',
+            {'start_date': self.DAY.isoformat(), 'end_date': self.DAY.isoformat()},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_is_constant_in_classrooms(self):
+        self.add_marked_classroom('A')
+        with CaptureQueriesContext(connection) as one_classroom:
+            data = self.get_summary()
+        self.assertEqual(len(data['classrooms']), 1)
+
+        for section in 'BCDE':
+            self.add_marked_classroom(section)
+        with self.assertNumQueries(len(one_classroom)):
+            data = self.get_summary()
+        self.assertEqual(len(data['classrooms']), 5)
+        self.assertEqual(data['summary']['total_present'], 10)
+        self.assertEqual(data['summary']['total_absent'], 5)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AttendanceRollupTests(MarkedClassroomsMixin, TestCase):
+    """Level/campus rollups follow classroom changes through F() deltas applied on commit"""
+
+    def parent_counts(self, scope):
+        return AttendanceDailyRollup.objects.filter(scope=scope, date=self.DAY).values(
+            'classrooms_marked', 'total_students', 'present_count', 'absent_count',
+        ).get()
+
+    def test_parents_add_up_and_follow_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first, first_rows = self.add_marked_classroom('A')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_marked_classroom('B', students=4)
+        expected = {'classrooms_marked': 2, 'total_students': 7, 'present_count': 5, 'absent_count': 2}
+        self.assertEqual(self.parent_counts('level'), expected)
+        self.assertEqual(self.parent_counts('campus'), expected)
+
+        # Re-marking one classroom moves only its difference
+        for row in first_rows:
+            row['status'] = 'present'
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkAttendanceService.mark(first, first_rows, user=self.admin)
+        self.assertEqual(self.parent_counts('campus')['present_count'], 6)
+        self.assertEqual(self.parent_counts('campus')['absent_count'], 1)
+
+        # A removed record drops out of the parents
+        first.is_deleted = True
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceRollupService.refresh_for_attendance(first)
+        self.assertEqual(
+            self.parent_counts('level'),
+            {'classrooms_marked': 1, 'total_students': 4, 'present_count': 3, 'absent_count': 1},
+        )
+        self.assertFalse(AttendanceDailyRollup.objects.filter(scope='classroom', classroom=first.classroom).exists())
+
+        # The incremental rows match a full rebuild
+        incremental = sorted(AttendanceDailyRollup.objects.values_list(
+            'scope', 'classroom_id', 'level_id', 'campus_id', 'classrooms_marked', 'total_students', 'present_count',
+        ))
+        Attendance.objects.filter(pk=first.pk).update(is_deleted=True)
+        AttendanceRollupService.rebuild(self.DAY, self.DAY)
+        rebuilt = sorted(AttendanceDailyRollup.objects.values_list(
+            'scope', 'classroom_id', 'level_id', 'campus_id', 'classrooms_marked', 'total_students', 'present_count',
+        ))
+        self.assertEqual(incremental, rebuilt)
@@ -47,4 +47,7 @@ urlpatterns = [
     
     # Real-time metrics
     path('metrics/realtime/', views.get_realtime_attendance_metrics, name='realtime_metrics'),
+    
+    # Reports
+    path('reports/chronic-absentees/', views.get_chronic_absentee_report, name='chronic_absentee_report'),
 ]
@@ -3,23 +3,35 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db.models import Q, Count, Sum, Avg, Max, Case, When, Value, FloatField
+from django.db.models.functions import Cast
 from datetime import date, timedelta, datetime
+import csv
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-from .models import Attendance, StudentAttendance, Weekend
+from .models import Attendance, AttendanceDailyRollup, StudentAttendance, Weekend
 from .serializers import (
     AttendanceSerializer, 
     StudentAttendanceSerializer, 
     AttendanceMarkingSerializer,
     AttendanceSummarySerializer
 )
+from .services import BulkAttendanceService, ChronicAbsenteeReportService
 from students.models import Student
 from classes.models import ClassRoom
 from teachers.models import Teacher
+from users.role_profile import RoleProfileResolver
+from users.scopes import ClassroomScope
+from utils.pagination import KeysetPagination
+from utils.response_cache import cache_response
 
 
 @api_view(['POST'])
@@ -44,7 +56,7 @@ def mark_attendance(request):
         try:
             # Find teacher by employee code (username) since there's no direct relationship
             from teachers.models import Teacher
-            teacher = Teacher.objects.get(employee_code=request.user.username)
+            teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
         except Teacher.DoesNotExist:
             teacher = None
         
@@ -131,10 +143,6 @@ def mark_bulk_attendance(request):
                     'is_weekend': True
                 }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all students in this class
-        all_students = Student.objects.filter(classroom=classroom)
-        all_student_ids = list(all_students.values_list('id', flat=True))
-        
         with transaction.atomic():
             # Create or get attendance record
             attendance, created = Attendance.objects.get_or_create(
@@ -143,34 +151,8 @@ def mark_bulk_attendance(request):
                 defaults={'marked_by': request.user}
             )
             
-            # Clear existing student attendance records
-            attendance.student_attendances.all().delete()
-            
-            # Create student attendance records
-            for student_data in student_attendance_data:
-                student_id = student_data.get('student_id')
-                attendance_status = student_data.get('status', 'present')
-                remarks = student_data.get('remarks', '')
-                
-                if not student_id:
-                    continue
-                
-                # Verify student belongs to this classroom
-                try:
-                    student = Student.objects.get(id=student_id, classroom=classroom)
-                    StudentAttendance.objects.create(
-                        attendance=attendance,
-                        student=student,
-                        status=attendance_status,
-                        remarks=remarks,
-                        created_by=request.user,
-                        updated_by=request.user
-                    )
-                except Student.DoesNotExist:
-                    continue
-            
-            # Update attendance summary
-            attendance.update_counts()
+            # Upsert student rows and counters in a constant number of queries
+            BulkAttendanceService.mark(attendance, student_attendance_data, user=request.user)
             
         return Response({
             'message': 'Bulk attendance marked successfully',
@@ -256,6 +238,12 @@ def get_student_attendance(request, student_id):
             attendance__date__lte=end_date
         )
     
+    # Opt-in keyset pages (?cursor=); the full history otherwise
+    paginator = KeysetPagination()
+    if paginator.is_requested(request):
+        page = paginator.paginate_queryset(attendance_records, request)
+        return paginator.get_paginated_response(StudentAttendanceSerializer(page, many=True).data)
+    
     serializer = StudentAttendanceSerializer(attendance_records, many=True)
     return Response(serializer.data)
 
@@ -271,22 +259,11 @@ def get_class_students(request, classroom_id):
     # Check permissions - teacher can only see their assigned classes (supports multiple)
     user = request.user
     if user.is_teacher():
-        try:
-            # Find teacher by employee code (username)
-            from teachers.models import Teacher
-            teacher = Teacher.objects.get(employee_code=user.username)
-            # allow if legacy single matches OR included in M2M assigned_classrooms OR classroom.class_teacher is this teacher
-            allowed = False
-            if teacher.assigned_classroom == classroom:
-                allowed = True
-            elif teacher.assigned_classrooms.filter(id=classroom.id).exists():
-                allowed = True
-            elif getattr(classroom, 'class_teacher_id', None) == teacher.id:
-                allowed = True
-            if not allowed:
-                return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
-        except Teacher.DoesNotExist:
+        # allow if legacy single matches OR included in M2M assigned_classrooms OR classroom.class_teacher is this teacher
+        if not RoleProfileResolver.for_request(request).exists:
             return Response({'error': 'Teacher profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        if not ClassroomScope.can_access(user, classroom.id):
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
     
     students = Student.objects.filter(classroom=classroom, is_deleted=False).order_by('name')
     
@@ -307,6 +284,7 @@ def get_class_students(request, classroom_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_response('attendance', 'student', 'classroom')
 def get_attendance_summary(request, classroom_id):
     """
     Get attendance summary for a classroom
@@ -320,7 +298,8 @@ def get_attendance_summary(request, classroom_id):
     if not end_date:
         end_date = timezone.now().date()
     
-    attendance_records = Attendance.objects.filter(
+    attendance_records = AttendanceDailyRollup.objects.filter(
+        scope='classroom',
         classroom=classroom,
         date__range=[start_date, end_date]
     ).order_by('-date')
@@ -357,7 +336,7 @@ def get_teacher_classes(request):
         # Find teacher by employee code (username) since there's no direct relationship
         from teachers.models import Teacher
         try:
-            teacher = Teacher.objects.get(employee_code=user.username)
+            teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
         except Teacher.DoesNotExist:
             return Response({'error': 'Teacher profile not found'}, status=status.HTTP_404_NOT_FOUND)
         
@@ -407,35 +386,21 @@ def edit_attendance(request, attendance_id):
         
         # Check teacher permissions (7-day limit)
         elif user.is_teacher():
-            try:
-                # Find teacher by employee code (username) since there's no direct relationship
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(employee_code=user.username)
-                is_allowed = False
-                if teacher and teacher.assigned_classroom == attendance.classroom:
-                    is_allowed = True
-                elif teacher and teacher.assigned_classrooms.filter(id=attendance.classroom_id).exists():
-                    is_allowed = True
-                elif teacher and getattr(attendance.classroom, 'class_teacher_id', None) == teacher.id:
-                    is_allowed = True
-
-                if is_allowed:
-                    if attendance.is_editable:
-                        can_edit = True
-                        edit_reason = "Teacher edit within 7 days"
-                    else:
-                        return Response({
-                            'error': 'Cannot edit attendance older than 7 days'
-                        }, status=status.HTTP_403_FORBIDDEN)
-            except Teacher.DoesNotExist:
-                pass
+            if RoleProfileResolver.for_request(request).exists and ClassroomScope.can_access(user, attendance.classroom_id):
+                if attendance.is_editable:
+                    can_edit = True
+                    edit_reason = "Teacher edit within 7 days"
+                else:
+                    return Response({
+                        'error': 'Cannot edit attendance older than 7 days'
+                    }, status=status.HTTP_403_FORBIDDEN)
         
         # Check coordinator permissions (unlimited time for their level)
         elif user.is_coordinator():
             try:
                 # Find coordinator by username (employee_code) since there's no direct relationship
                 from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(employee_code=user.username)
+                coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
                 if (coordinator and coordinator.is_currently_active and 
                     coordinator.level == attendance.classroom.grade.level):
                     can_edit = True
@@ -448,7 +413,7 @@ def edit_attendance(request, attendance_id):
             try:
                 # Find principal by email since there's no direct relationship
                 from principals.models import Principal
-                principal = Principal.objects.get(email=user.email)
+                principal = RoleProfileResolver.for_request(request).get_instance(Principal)
                 if (principal and principal.is_currently_active and 
                     principal.campus == attendance.classroom.campus):
                     can_edit = True
@@ -471,33 +436,8 @@ def edit_attendance(request, attendance_id):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         with transaction.atomic():
-            # Clear existing student attendance records
-            attendance.student_attendances.all().delete()
-            
-            # Create new student attendance records
-            for student_data in student_attendance_data:
-                student_id = student_data.get('student_id')
-                attendance_status = student_data.get('status', 'present')
-                remarks = student_data.get('remarks', '')
-                
-                if not student_id:
-                    continue
-                
-                try:
-                    student = Student.objects.get(id=student_id, classroom=attendance.classroom)
-                    StudentAttendance.objects.create(
-                        student=student,
-                        attendance=attendance,
-                        status=attendance_status,
-                        remarks=remarks,
-                        created_by=user,
-                        updated_by=user
-                    )
-                except Student.DoesNotExist:
-                    continue
-            
-            # Update attendance counts
-            attendance.update_counts()
+            # Replace student rows and refresh counters in bulk
+            BulkAttendanceService.mark(attendance, student_attendance_data, user=user)
             
             # Add edit history
             attendance.add_edit_history(
@@ -537,55 +477,14 @@ def get_attendance_for_date(request, classroom_id, date):
         user = request.user
         
         # Check permissions (support multi-class teachers)
-        if user.is_teacher():
-            try:
-                # Find teacher by employee code (username) since there's no direct relationship
-                from teachers.models import Teacher
-                teacher = Teacher.objects.get(employee_code=user.username)
-                allowed = False
-                if teacher.assigned_classroom == classroom:
-                    allowed = True
-                elif teacher.assigned_classrooms.filter(id=classroom.id).exists():
-                    allowed = True
-                elif getattr(classroom, 'class_teacher_id', None) == teacher.id:
-                    allowed = True
-                if not allowed:
-                    return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
-            except Teacher.DoesNotExist:
-                return Response({'error': 'Teacher profile not found'}, status=status.HTTP_404_NOT_FOUND)
-        elif user.is_coordinator():
-            print(f"🔍 DEBUG: User is coordinator, checking permissions")
-            # Coordinator can access attendance for classrooms in their managed levels
-            try:
-                from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(employee_code=user.username)
-                print(f"   - coordinator: {coordinator.full_name}")
-                print(f"   - coordinator shift: {coordinator.shift}")
-                print(f"   - coordinator level: {coordinator.level}")
-                print(f"   - coordinator assigned_levels: {list(coordinator.assigned_levels.all())}")
-                
-                # Check if classroom is in coordinator's managed levels
-                allowed = False
-                if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                    print(f"   - checking 'both' shift with assigned_levels")
-                    # Check if classroom's level is in coordinator's assigned levels
-                    if classroom.grade.level in coordinator.assigned_levels.all():
-                        allowed = True
-                        print(f"   - ✅ Classroom level {classroom.grade.level} found in assigned_levels")
-                    else:
-                        print(f"   - ❌ Classroom level {classroom.grade.level} NOT found in assigned_levels")
-                elif coordinator.level and classroom.grade.level == coordinator.level:
-                    allowed = True
-                    print(f"   - ✅ Classroom level {classroom.grade.level} matches coordinator level")
-                else:
-                    print(f"   - ❌ No matching level found")
-                
-                print(f"   - allowed: {allowed}")
-                if not allowed:
-                    return Response({'error': 'Access denied - Classroom not in your managed levels'}, status=status.HTTP_403_FORBIDDEN)
-            except Coordinator.DoesNotExist:
-                print(f"   - ❌ Coordinator profile not found")
-                return Response({'error': 'Coordinator profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        if user.is_teacher() or user.is_coordinator():
+            # Teachers: their assigned classrooms; coordinators: classrooms in their managed levels
+            if not RoleProfileResolver.for_request(request).exists:
+                profile_name = 'Teacher' if user.is_teacher() else 'Coordinator'
+                return Response({'error': f'{profile_name} profile not found'}, status=status.HTTP_404_NOT_FOUND)
+            if not ClassroomScope.can_access(user, classroom.id):
+                error = 'Access denied' if user.is_teacher() else 'Access denied - Classroom not in your managed levels'
+                return Response({'error': error}, status=status.HTTP_403_FORBIDDEN)
         
         # Auto-create weekend entry for Sundays (no attendance records should be created)
         try:
@@ -602,25 +501,12 @@ def get_attendance_for_date(request, classroom_id, date):
 
         # Get attendance for the date
         try:
-            print(f"🔍 DEBUG: Looking for attendance data")
-            print(f"   - classroom: {classroom}")
-            print(f"   - date: {date}")
-            print(f"   - is_deleted: False")
-            
             attendance = Attendance.objects.get(
                 classroom=classroom,
                 date=date,
                 is_deleted=False
             )
             
-            print(f"🔍 DEBUG: Attendance found!")
-            print(f"   - attendance.id: {attendance.id}")
-            print(f"   - attendance.status: {attendance.status}")
-            print(f"   - attendance.total_students: {attendance.total_students}")
-            print(f"   - attendance.present_count: {attendance.present_count}")
-            print(f"   - attendance.absent_count: {attendance.absent_count}")
-            print(f"   - attendance.leave_count: {attendance.leave_count}")
-            
             # Get student attendance records
             student_attendances = attendance.student_attendances.all()
             
@@ -658,9 +544,7 @@ def get_attendance_for_date(request, classroom_id, date):
             return Response(attendance_data)
             
         except Attendance.DoesNotExist:
-            print(f"🔍 DEBUG: No attendance found for this date")
-            print(f"   - classroom: {classroom}")
-            print(f"   - date: {date}")
+            logger.debug("No attendance for classroom %s on %s", classroom.id, date)
             # Also tell client if the date is a weekend
             from datetime import datetime as _dt
             is_weekend = False
@@ -695,7 +579,7 @@ def get_coordinator_classes(request):
         # Find coordinator by username (employee_code) since there's no direct relationship
         from coordinator.models import Coordinator
         try:
-            coordinator = Coordinator.objects.get(employee_code=user.username)
+            coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
             if not coordinator or not coordinator.is_currently_active:
                 return Response({'error': 'Coordinator profile not found or inactive'}, status=status.HTTP_404_NOT_FOUND)
         except Coordinator.DoesNotExist:
@@ -741,6 +625,7 @@ def get_coordinator_classes(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_response('attendance', 'student', 'classroom')
 def get_level_attendance_summary(request, level_id):
     """
     Get attendance summary for all classes in a level
@@ -753,7 +638,7 @@ def get_level_attendance_summary(request, level_id):
             try:
                 # Find coordinator by username (employee_code) since there's no direct relationship
                 from coordinator.models import Coordinator
-                coordinator = Coordinator.objects.get(employee_code=user.username)
+                coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
                 if not coordinator or coordinator.level.id != level_id:
                     return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
             except Coordinator.DoesNotExist:
@@ -762,7 +647,7 @@ def get_level_attendance_summary(request, level_id):
             try:
                 # Find principal by email since there's no direct relationship
                 from principals.models import Principal
-                principal = Principal.objects.get(email=user.email)
+                principal = RoleProfileResolver.for_request(request).get_instance(Principal)
                 if not principal or not principal.is_currently_active:
                     return Response({'error': 'Principal profile not found'}, status=status.HTTP_404_NOT_FOUND)
             except Principal.DoesNotExist:
@@ -784,10 +669,35 @@ def get_level_attendance_summary(request, level_id):
         else:
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        # Get all classes in the level
+        # Get all classes in the level with their active student count
         classrooms = ClassRoom.objects.filter(
             grade__level_id=level_id
-        ).select_related('grade', 'grade__level__campus')
+        ).select_related('grade', 'grade__level__campus').annotate(
+            active_student_count=Count('students', filter=Q(students__is_deleted=False), distinct=True)
+        )
+        
+        # One grouped aggregate over the daily classroom rollups of the level
+        record_percentage = Case(
+            When(total_students=0, then=Value(0.0)),
+            default=Cast('present_count', FloatField()) * 100 / Cast('total_students', FloatField()),
+            output_field=FloatField()
+        )
+        attendance_stats = {
+            row['classroom_id']: row
+            for row in AttendanceDailyRollup.objects.filter(
+                scope='classroom',
+                level_id=level_id,
+                date__range=[start_date, end_date]
+            ).order_by().values('classroom_id').annotate(
+                records_count=Sum('classrooms_marked'),
+                total_present=Sum('present_count'),
+                total_absent=Sum('absent_count'),
+                total_late=Sum('late_count'),
+                total_leave=Sum('leave_count'),
+                average_percentage=Avg(record_percentage),
+                last_attendance=Max('date')
+            )
+        }
         
         summary_data = []
         total_students = 0
@@ -797,22 +707,15 @@ def get_level_attendance_summary(request, level_id):
         total_leave = 0
         
         for classroom in classrooms:
-            # Get attendance records for this classroom in date range
-            attendances = Attendance.objects.filter(
-                classroom=classroom,
-                date__range=[start_date, end_date]
-            )
-            
-            classroom_total_students = classroom.students.count()
-            classroom_present = sum(att.present_count for att in attendances)
-            classroom_absent = sum(att.absent_count for att in attendances)
-            classroom_late = sum(att.late_count for att in attendances)
-            classroom_leave = sum(att.leave_count for att in attendances)
-            classroom_records = attendances.count()
-            
-            avg_percentage = 0
-            if classroom_records > 0:
-                avg_percentage = sum(att.attendance_percentage for att in attendances) / classroom_records
+            stats = attendance_stats.get(classroom.id, {})
+            classroom_total_students = classroom.active_student_count
+            classroom_present = stats.get('total_present') or 0
+            classroom_absent = stats.get('total_absent') or 0
+            classroom_late = stats.get('total_late') or 0
+            classroom_leave = stats.get('total_leave') or 0
+            classroom_records = stats.get('records_count') or 0
+            avg_percentage = stats.get('average_percentage') or 0
+            last_attendance = stats.get('last_attendance')
             
             summary_data.append({
                 'classroom': {
@@ -831,7 +734,7 @@ def get_level_attendance_summary(request, level_id):
                 'total_late': classroom_late,
                 'total_leave': classroom_leave,
                 'average_percentage': round(avg_percentage, 2),
-                'last_attendance': attendances.order_by('-date').first().date.isoformat() if attendances.exists() else None
+                'last_attendance': last_attendance.isoformat() if last_attendance else None
             })
             
             total_students += classroom_total_students
@@ -842,7 +745,7 @@ def get_level_attendance_summary(request, level_id):
         
         # Calculate overall statistics
         overall_percentage = 0
-        if total_students > 0:
+        if total_students > 0 and (total_present + total_absent) > 0:
             overall_percentage = round((total_present / (total_present + total_absent)) * 100, 2)
         
         return Response({
@@ -879,7 +782,7 @@ def submit_attendance(request, attendance_id):
             return Response({'error': 'Can only submit draft attendance'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Verify user is teacher of this class
-        teacher = Teacher.objects.get(employee_code=request.user.username)
+        teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
         if teacher.assigned_classroom != attendance.classroom:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -920,7 +823,7 @@ def review_attendance(request, attendance_id):
         
         # Verify coordinator has access
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         if coordinator.level != attendance.classroom.grade.level:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -958,7 +861,7 @@ def finalize_attendance(request, attendance_id):
             return Response({'error': 'Can only finalize draft, submitted, or under_review attendance'}, status=status.HTTP_400_BAD_REQUEST)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         if coordinator.level != attendance.classroom.grade.level:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -999,7 +902,7 @@ def coordinator_approve_attendance(request, attendance_id):
         
         # Verify coordinator has access
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         if coordinator.level != attendance.classroom.grade.level:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -1043,7 +946,7 @@ def reopen_attendance(request, attendance_id):
             return Response({'error': 'Can only reopen final attendance'}, status=status.HTTP_400_BAD_REQUEST)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         if coordinator.level != attendance.classroom.grade.level:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -1093,7 +996,7 @@ def grant_backfill_permission(request):
         deadline = datetime.strptime(deadline_str, '%Y-%m-%dT%H:%M:%S')
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         if coordinator.level != classroom.grade.level:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
@@ -1161,7 +1064,7 @@ def create_holiday(request):
             return Response({'error': 'Date and reason required'}, status=status.HTTP_400_BAD_REQUEST)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(employee_code=request.user.username)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
         
         from .models import Holiday, AuditLog
@@ -1200,6 +1103,8 @@ def create_holiday(request):
                     existing_attendance.replaced_at = timezone.now()
                     existing_attendance.archived_data = archived_data
                     existing_attendance.save()
+                    existing_attendance.refresh_rollups()
+                    existing_attendance.refresh_student_summaries()
                     
                 except Attendance.DoesNotExist:
                     # No existing attendance, continue
@@ -1273,20 +1178,33 @@ def get_realtime_attendance_metrics(request):
         }
         
         # Get classrooms based on role
-        if user.is_teacher():
-            teacher = Teacher.objects.get(employee_code=user.username)
-            classrooms = [teacher.assigned_classroom] if teacher.assigned_classroom else []
-        elif user.is_coordinator():
-            from coordinator.models import Coordinator
-            coordinator = Coordinator.objects.get(employee_code=user.username)
-            classrooms = ClassRoom.objects.filter(grade__level=coordinator.level)
-        elif user.is_principal():
-            from principals.models import Principal
-            principal = Principal.objects.get(email=user.email)
-            classrooms = ClassRoom.objects.filter(grade__level__campus=principal.campus)
+        rollup = None
+        if user.is_teacher() or user.is_coordinator() or user.is_principal():
+            classrooms = ClassroomScope.filter_queryset(ClassRoom.objects.all(), user, field='id')
+            if user.is_coordinator():
+                from coordinator.models import Coordinator
+                coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
+                rollup = AttendanceDailyRollup.objects.filter(
+                    scope='level', level=coordinator.level, date=today, classrooms_marked__gt=0
+                ).first()
+            elif user.is_principal():
+                rollup = AttendanceDailyRollup.objects.filter(
+                    scope='campus', campus_id=RoleProfileResolver.for_request(request).campus_id, date=today, classrooms_marked__gt=0
+                ).first()
         else:
             classrooms = []
         
+        # Today's totals for the whole level/campus straight from the daily rollup
+        metrics['summary'] = {
+            'classrooms_marked': rollup.classrooms_marked,
+            'total_students': rollup.total_students,
+            'present_count': rollup.present_count,
+            'absent_count': rollup.absent_count,
+            'late_count': rollup.late_count,
+            'leave_count': rollup.leave_count,
+            'percentage': rollup.attendance_percentage
+        } if rollup else None
+        
         for classroom in classrooms:
             attendance = Attendance.objects.filter(
                 classroom=classroom,
@@ -1342,3 +1260,94 @@ def get_attendance_list(request):
         
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_chronic_absentee_report(request):
+    """
+    Rank students of a level or campus by absence rate and longest absence streak.
+    Query params: level_id or campus_id, start_date, end_date, last_days (only each student's
+    last N school days), min_absences, min_rate, page, page_size, export=csv
+    """
+    try:
+        user = request.user
+        level_id = request.GET.get('level_id')
+        campus_id = request.GET.get('campus_id')
+        
+        if not level_id and not campus_id:
+            return Response({'error': 'level_id or campus_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        scope_field, scope_id = ('level', int(level_id)) if level_id else ('campus', int(campus_id))
+        
+        # Check permissions
+        if user.is_coordinator() or user.is_principal():
+            role_profile = RoleProfileResolver.for_request(request)
+            if not role_profile.exists:
+                return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+            if scope_field == 'level':
+                allowed = scope_id in role_profile.level_ids
+            else:
+                allowed = user.is_principal() and scope_id == role_profile.campus_id
+            if not allowed:
+                return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        elif not user.is_superuser:
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        # Get date range
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else timezone.now().date()
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else end_date - timedelta(days=30)
+        
+        last_days = int(request.GET.get('last_days') or 0) or None
+        options = {
+            'recent_days': last_days,
+            'min_absences': int(request.GET.get('min_absences', 1)),
+            'min_rate': float(request.GET.get('min_rate', 0)),
+        }
+        
+        if request.GET.get('export') == 'csv':
+            pseudo_buffer = _EchoBuffer()
+            writer = csv.writer(pseudo_buffer)
+            rows = ChronicAbsenteeReportService.iter_csv_rows(scope_field, scope_id, start_date, end_date, **options)
+            response = StreamingHttpResponse(
+                (writer.writerow(row) for row in rows),
+                content_type='text/csv'
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="chronic_absentees_{scope_field}_{scope_id}_{start_date}_{end_date}.csv"'
+            )
+            return response
+        
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', 50)), 1), 500)
+        report = ChronicAbsenteeReportService.page(
+            scope_field, scope_id, start_date, end_date, page=page, page_size=page_size, **options
+        )
+        
+        return Response({
+            'scope': scope_field,
+            'scope_id': scope_id,
+            'date_range': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat()
+            },
+            'last_days': last_days,
+            'page': page,
+            'page_size': page_size,
+            'count': report['count'],
+            'results': report['results']
+        })
+        
+    except ValueError as e:
+        return Response({'error': f'Invalid parameter: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the value, so csv.writer can feed a streaming response"""
+    
+    def write(self, value):
+        return value
@@ -0,0 +1,302 @@
+"""
+Static cost and depth limits for /graphql/.
+
+Every operation is scored before execution: each field costs 1 per parent
+row, and the fields below a list are multiplied by its expected size - the
+`first`/`last` argument of a connection (capped at GRAPHQL_MAX_PAGE_SIZE)
+or GRAPHQL_LIST_SIZE_ESTIMATE for plain lists. Operations above
+GRAPHQL_MAX_COST or GRAPHQL_MAX_DEPTH are rejected, and each client (user,
+or IP for anonymous callers) spends its cost from a budget of
+GRAPHQL_COST_BUDGET per GRAPHQL_COST_WINDOW seconds.
+
+Cost, depth and execution time of every request are logged to the
+'backend.graphql_cost' logger. The view also serves persisted queries and
+parsed documents from backend.graphql_documents.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, validate_schema
+from graphql.language import (
+    FieldNode, FragmentDefinitionNode, FragmentSpreadNode, InlineFragmentNode, IntValueNode, VariableNode,
+)
+from graphql.type import GraphQLInterfaceType, GraphQLList, GraphQLObjectType, get_named_type, get_nullable_type
+
+from .graphql_documents import DocumentCache, PersistedQueryError, PersistedQueryStore, document_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _is_connection(graphql_type):
+    return isinstance(graphql_type, GraphQLObjectType) and {'edges', 'pageInfo'} <= set(graphql_type.fields)
+
+
+class QueryCostAnalyzer:
+    """Compute (cost, depth) of an operation from the document alone"""
+
+    def __init__(self, schema, fragments, variables=None):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.max_page_size = _setting('GRAPHQL_MAX_PAGE_SIZE', 100)
+        self.list_size = _setting('GRAPHQL_LIST_SIZE_ESTIMATE', 50)
+
+    def analyze(self, operation):
+        root_type = self.schema.get_root_type(operation.operation)
+        if root_type is None:
+            return 0, 0
+        return self._selection_set_cost(operation.selection_set, root_type, 0, frozenset())
+
+    def _selection_set_cost(self, selection_set, parent_type, depth, fragments_seen):
+        cost = 0
+        max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_cost, field_depth = self._field_cost(selection, parent_type, depth, fragments_seen)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    self.schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition else parent_type
+                )
+                field_cost, field_depth = self._selection_set_cost(
+                    selection.selection_set, fragment_type, depth, fragments_seen
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in fragments_seen:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                field_cost, field_depth = self._selection_set_cost(
+                    fragment.selection_set, fragment_type, depth, fragments_seen | {name}
+                )
+            else:
+                continue
+            cost += field_cost
+            max_depth = max(max_depth, field_depth)
+        return cost, max_depth
+
+    def _field_cost(self, node, parent_type, depth, fragments_seen):
+        name = node.name.value
+        if name.startswith('__') or not isinstance(parent_type, (GraphQLObjectType, GraphQLInterfaceType)):
+            return 0, depth
+        field = parent_type.fields.get(name)
+        if field is None:
+            # Unknown fields are reported by the standard rules
+            return 0, depth
+
+        field_type = get_named_type(field.type)
+        if not node.selection_set:
+            return 1, depth + 1
+        child_cost, child_depth = self._selection_set_cost(
+            node.selection_set, field_type, depth + 1, fragments_seen
+        )
+        return 1 + self._multiplier(node, field, parent_type) * child_cost, child_depth
+
+    def _multiplier(self, node, field, parent_type):
+        field_type = get_named_type(field.type)
+        if _is_connection(field_type):
+            return self._page_size(node)
+        if isinstance(get_nullable_type(field.type), GraphQLList):
+            # edges of a connection are already counted by the connection's page size
+            return 1 if _is_connection(parent_type) else self.list_size
+        return 1
+
+    def _page_size(self, node):
+        size = None
+        for argument in node.arguments:
+            if argument.name.value not in ('first', 'last'):
+                continue
+            value = argument.value
+            if isinstance(value, IntValueNode):
+                size = int(value.value)
+            elif isinstance(value, VariableNode):
+                size = self.variables.get(value.name.value)
+        if not isinstance(size, int) or size <= 0:
+            return self.max_page_size
+        return min(size, self.max_page_size)
+
+
+def check_query_cost(request, entry, schema, variables, operation_name):
+    """
+    Score the operation about to run and return the errors rejecting it.
+    Scores are memoized on the cached document per first/last variables;
+    the result is stored on request.graphql_cost for logging.
+    """
+    operation = get_operation_ast(entry.document, operation_name)
+    if operation is None:
+        # execute() reports the missing/ambiguous operation
+        return []
+
+    def compute():
+        fragments = {
+            definition.name.value: definition
+            for definition in entry.document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        return QueryCostAnalyzer(schema, fragments, variables).analyze(operation)
+
+    page_variables = tuple(sorted(
+        (name, value) for name, value in (variables or {}).items() if isinstance(value, int)
+    ))
+    cost, depth = entry.cost((operation_name, page_variables), compute)
+    request.graphql_cost = {'cost': cost, 'depth': depth}
+
+    max_depth = _setting('GRAPHQL_MAX_DEPTH', 10)
+    max_cost = _setting('GRAPHQL_MAX_COST', 10000)
+    if depth > max_depth:
+        message = f"Query depth {depth} exceeds the maximum of {max_depth}."
+    elif cost > max_cost:
+        message = (
+            f"Query cost {cost} exceeds the maximum of {max_cost}. "
+            "Request fewer fields or smaller pages (first/last)."
+        )
+    elif not _spend_budget(request, cost):
+        message = (
+            f"Query cost budget of {_setting('GRAPHQL_COST_BUDGET', 200000)} per "
+            f"{_setting('GRAPHQL_COST_WINDOW', 60)} seconds exceeded. Try again later."
+        )
+    else:
+        return []
+    return [GraphQLError(message, operation)]
+
+
+def _client_id(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    return 'ip:' + (forwarded_for.split(',')[0].strip() if forwarded_for else request.META.get('REMOTE_ADDR', ''))
+
+
+def _spend_budget(request, cost):
+    """Charge cost to the client's budget for the current window; False if it would overdraw"""
+    budget = _setting('GRAPHQL_COST_BUDGET', 200000)
+    window = _setting('GRAPHQL_COST_WINDOW', 60)
+    key = f'graphql_cost:{_client_id(request)}:{int(time.time() // window)}'
+    cache.add(key, 0, window)
+    try:
+        spent = cache.incr(key, cost)
+    except ValueError:
+        return True
+    if spent > budget:
+        cache.decr(key, cost)
+        return False
+    return True
+
+
+class CostLimitedGraphQLView(GraphQLView):
+    """
+    GraphQLView with persisted queries, the document cache, the query cost
+    check and per-request cost/time logging.
+    """
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        request.graphql_cost = None
+        started = time.perf_counter()
+        result = self._execute_cached(request, data, query, variables, operation_name, show_graphiql)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if result is not None and (query or request.graphql_cost):
+            cost = request.graphql_cost or {}
+            slow = elapsed_ms >= _setting('GRAPHQL_SLOW_QUERY_MS', 1000)
+            logger.log(
+                logging.WARNING if result.errors or slow else logging.INFO,
+                "graphql operation=%s client=%s cost=%s depth=%s duration_ms=%.1f errors=%d",
+                operation_name or '-', _client_id(request), cost.get('cost'), cost.get('depth'),
+                elapsed_ms, len(result.errors or []),
+            )
+        return result
+
+    def _execute_cached(self, request, data, query, variables, operation_name, show_graphiql):
+        """GraphQLView.execute_graphql_request with parse/validate served from DocumentCache"""
+        try:
+            query_hash = PersistedQueryStore.requested_hash(request, data)
+            if query_hash and query:
+                PersistedQueryStore.verify(query, query_hash)
+        except PersistedQueryError as e:
+            return ExecutionResult(data=None, errors=[e.as_graphql_error()])
+        if not query and not query_hash:
+            # GraphiQL page or "Must provide query string."
+            return super().execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+        schema = self.schema.graphql_schema
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        try:
+            entry = DocumentCache.get_or_validate(
+                schema,
+                query_hash or document_hash(query),
+                lambda: query or PersistedQueryStore.lookup(query_hash),
+            )
+        except PersistedQueryError as e:
+            return ExecutionResult(data=None, errors=[e.as_graphql_error()])
+        if entry.document is None:
+            return ExecutionResult(errors=entry.errors)
+
+        operation_ast = get_operation_ast(entry.document, operation_name)
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseNotAllowed(
+                ["POST"],
+                f"Can only perform a {operation_ast.operation.value} operation from a POST request.",
+            ))
+
+        if entry.errors:
+            return ExecutionResult(data=None, errors=entry.errors)
+        cost_errors = check_query_cost(request, entry, schema, variables, operation_name)
+        if cost_errors:
+            return ExecutionResult(data=None, errors=cost_errors)
+        if query_hash and query:
+            # Only documents that validated and passed the cost check are shared
+            PersistedQueryStore.save(query, query_hash)
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, entry.document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return execute(schema, entry.document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
@@ -0,0 +1,198 @@
+"""
+Parsed/validated GraphQL documents and persisted queries.
+
+DocumentCache keeps an in-process LRU of parsed documents together with
+their validation errors, keyed by the sha256 of the query text, so hot
+queries skip parse() and validate() entirely. PersistedQueryStore maps
+the same hashes to query text in the shared cache, following the
+automatic persisted query protocol:
+
+    1. the client sends {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": h}}}
+    2. unknown hash -> error PersistedQueryNotFound
+    3. the client retries with the query text and the hash; the server
+       checks the hash and, once the document has validated, stores the
+       text for everyone else
+
+Anyone can register a document, so stored texts are capped at
+GRAPHQL_PERSISTED_QUERY_MAX_BYTES and expire GRAPHQL_PERSISTED_QUERY_TIMEOUT
+seconds after their last lookup; an expired hash is simply registered again.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError, parse, specified_rules, validate
+
+
+STATS_KEY_PREFIX = 'graphql_documents:stats'
+
+
+def document_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def _record(outcome):
+    key = f'{STATS_KEY_PREFIX}:{outcome}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+class CachedDocument:
+    """A parsed document (None if it did not parse) and its validation errors"""
+
+    # Cost memo entries kept per document (one per distinct first/last variables)
+    MAX_COSTS = 32
+
+    def __init__(self, document, errors):
+        self.document = document
+        self.errors = errors
+        self._costs = {}
+
+    def cost(self, key, compute):
+        if key not in self._costs:
+            if len(self._costs) >= self.MAX_COSTS:
+                self._costs.clear()
+            self._costs[key] = compute()
+        return self._costs[key]
+
+
+class DocumentCache:
+    """In-process LRU of CachedDocument by query hash"""
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def max_size(cls):
+        return getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 256)
+
+    @classmethod
+    def get(cls, query_hash):
+        with cls._lock:
+            entry = cls._entries.get(query_hash)
+            if entry is not None:
+                cls._entries.move_to_end(query_hash)
+        return entry
+
+    @classmethod
+    def get_or_validate(cls, schema, query_hash, load_query):
+        """
+        Return the CachedDocument for query_hash. On a miss the text from
+        load_query() is parsed and validated; a hit never needs the text.
+        """
+        entry = cls.get(query_hash)
+        if entry is not None:
+            _record('hits')
+            return entry
+
+        query = load_query()
+        _record('misses')
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            entry = CachedDocument(None, [e])
+        else:
+            errors = validate(schema, document, specified_rules)
+            entry = CachedDocument(document, errors)
+
+        with cls._lock:
+            cls._entries[query_hash] = entry
+            cls._entries.move_to_end(query_hash)
+            while len(cls._entries) > cls.max_size():
+                cls._entries.popitem(last=False)
+        return entry
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def stats(cls):
+        """Hit/miss counters across workers, entries of this worker"""
+        counters = cache.get_many([f'{STATS_KEY_PREFIX}:hits', f'{STATS_KEY_PREFIX}:misses'])
+        hits = counters.get(f'{STATS_KEY_PREFIX}:hits', 0)
+        misses = counters.get(f'{STATS_KEY_PREFIX}:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 2) if total else 0.0,
+            'persisted_not_found': cache.get(f'{STATS_KEY_PREFIX}:persisted_not_found', 0),
+            'entries': len(cls._entries),
+            'max_size': cls.max_size(),
+        }
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+    def as_graphql_error(self):
+        return GraphQLError(str(self), extensions={'code': self.code})
+
+
+class PersistedQueryStore:
+    """Query text by sha256 hash, shared by all workers through the cache"""
+
+    KEY_PREFIX = 'graphql_persisted'
+
+    @staticmethod
+    def requested_hash(request, data):
+        """The sha256Hash of an APQ request (POST body or GET ?extensions=), or None"""
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if not extensions:
+            return None
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                return None
+        persisted = extensions.get('persistedQuery') if isinstance(extensions, dict) else None
+        if not isinstance(persisted, dict):
+            return None
+        if persisted.get('version', 1) != 1:
+            raise PersistedQueryError('Unsupported persisted query version.', 'PERSISTED_QUERY_NOT_SUPPORTED')
+        return persisted.get('sha256Hash')
+
+    @staticmethod
+    def verify(query, query_hash):
+        """Check that query_hash is the sha256 of query (the caller saves it once it validates)"""
+        if document_hash(query) != query_hash:
+            raise PersistedQueryError('provided sha does not match query', 'INVALID_SHA256_HASH')
+
+    @staticmethod
+    def lookup(query_hash):
+        key = PersistedQueryStore._key(query_hash)
+        query = cache.get(key)
+        if query is None:
+            _record('persisted_not_found')
+            raise PersistedQueryError('PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND')
+        # Documents in use stay; only the cold ones expire
+        cache.touch(key, PersistedQueryStore._timeout())
+        return query
+
+    @staticmethod
+    def save(query, query_hash=None):
+        """Store query and return its hash; documents above the size cap are not stored (None)"""
+        if len(query.encode('utf-8')) > getattr(settings, 'GRAPHQL_PERSISTED_QUERY_MAX_BYTES', 20000):
+            _record('persisted_too_large')
+            return None
+        query_hash = query_hash or document_hash(query)
+        cache.set(PersistedQueryStore._key(query_hash), query, PersistedQueryStore._timeout())
+        return query_hash
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'GRAPHQL_PERSISTED_QUERY_TIMEOUT', 86400)
+
+    @staticmethod
+    def _key(query_hash):
+        return f'{PersistedQueryStore.KEY_PREFIX}:{query_hash}'
@@ -0,0 +1,226 @@
+"""
+Per-request SQL and latency instrumentation.
+
+InstrumentationMiddleware wraps every database query of a request
+(connection.execute_wrapper) to count queries and add up their time, then
+records per view (the URL route, so ids do not multiply the series):
+request count, total/DB/Python time, query count and response size.
+
+- Each response gets a Server-Timing header (db, app, total) that browser
+  dev tools show next to the request.
+- The totals are kept in process and served in the Prometheus text format
+  at /metrics (bearer METRICS_TOKEN). Every worker keeps its own numbers.
+- The same SQL text running INSTRUMENTATION_N_PLUS_ONE_THRESHOLD times or
+  more in one request is logged to 'backend.instrumentation' as a possible
+  N+1 and counted per view.
+
+Only counters and one dict lookup per query are added, so it stays on in
+production; INSTRUMENTATION_ENABLED turns it off.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class QueryRecorder:
+    """execute_wrapper counting the queries of one request, their time and repeats per SQL text"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.templates = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # Parameters are passed separately, so the SQL text is already the template
+            self.templates[sql] += 1
+
+    def repeated(self, threshold):
+        return [(sql, count) for sql, count in self.templates.most_common() if count >= threshold]
+
+
+class ViewStats:
+    __slots__ = ('requests', 'duration', 'db_duration', 'queries', 'response_bytes', 'n_plus_one', 'buckets')
+
+    def __init__(self):
+        self.requests = Counter()  # by status code
+        self.duration = 0.0
+        self.db_duration = 0.0
+        self.queries = 0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    """In-process totals per (method, view), rendered in the Prometheus text format"""
+
+    _views = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, method, view, status, duration, db_duration, queries, response_bytes, n_plus_one):
+        with cls._lock:
+            stats = cls._views.get((method, view))
+            if stats is None:
+                stats = cls._views[(method, view)] = ViewStats()
+            stats.requests[status] += 1
+            stats.duration += duration
+            stats.db_duration += db_duration
+            stats.queries += queries
+            stats.response_bytes += response_bytes
+            stats.n_plus_one += n_plus_one
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[i] += 1
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._views.clear()
+
+    @classmethod
+    def render(cls):
+        with cls._lock:
+            views = sorted(cls._views.items())
+            lines = []
+
+            def metric(name, kind, help_text, samples):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(samples)
+
+            metric('sis_http_requests_total', 'counter', 'Requests by view and status code.', [
+                f'sis_http_requests_total{{{_labels(method=method, view=view, status=status)}}} {count}'
+                for (method, view), stats in views
+                for status, count in sorted(stats.requests.items())
+            ])
+            duration_samples = []
+            for (method, view), stats in views:
+                total = sum(stats.requests.values())
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    duration_samples.append(
+                        f'sis_http_request_duration_seconds_bucket{{{_labels(method=method, view=view, le=bound)}}} {count}'
+                    )
+                duration_samples.append(
+                    f'sis_http_request_duration_seconds_bucket{{{_labels(method=method, view=view, le="+Inf")}}} {total}'
+                )
+                duration_samples.append(
+                    f'sis_http_request_duration_seconds_sum{{{_labels(method=method, view=view)}}} {stats.duration:.6f}'
+                )
+                duration_samples.append(
+                    f'sis_http_request_duration_seconds_count{{{_labels(method=method, view=view)}}} {total}'
+                )
+            metric('sis_http_request_duration_seconds', 'histogram', 'Total request time.', duration_samples)
+
+            for name, attr, help_text in (
+                ('sis_http_request_db_seconds_total', 'db_duration', 'Time spent in SQL queries.'),
+                ('sis_http_request_queries_total', 'queries', 'SQL queries run.'),
+                ('sis_http_response_bytes_total', 'response_bytes', 'Response body bytes.'),
+                ('sis_http_request_n_plus_one_total', 'n_plus_one', 'Requests that repeated one SQL text above the N+1 threshold.'),
+            ):
+                metric(name, 'counter', help_text, [
+                    f'{name}{{{_labels(method=method, view=view)}}} {_number(getattr(stats, attr))}'
+                    for (method, view), stats in views
+                ])
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return f'{value:.6f}' if isinstance(value, float) else str(value)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or match.view_name or 'unmatched'
+
+
+def _response_size(response):
+    if response.streaming:
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+class InstrumentationMiddleware:
+    """Record query count, DB/Python time and response size of every request; see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _setting('INSTRUMENTATION_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view = _view_name(request)
+        if view == 'metrics/':
+            return response
+
+        repeated = recorder.repeated(_setting('INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 10))
+        if repeated:
+            sql, count = repeated[0]
+            logger.warning(
+                "Possible N+1 on %s %s: %d queries, the same SQL ran %d times: %s",
+                request.method, view, recorder.count, count, sql[:300],
+            )
+
+        MetricsRegistry.record(
+            request.method, view, response.status_code, duration, recorder.duration,
+            recorder.count, _response_size(response), 1 if repeated else 0,
+        )
+        if _setting('INSTRUMENTATION_SERVER_TIMING', True):
+            app_ms = max(duration - recorder.duration, 0) * 1000
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'app;dur={app_ms:.1f}, total;dur={duration * 1000:.1f}'
+            )
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; needs Authorization: Bearer <METRICS_TOKEN>"""
+    token = _setting('METRICS_TOKEN', '')
+    if not token:
+        return HttpResponseNotFound()
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not constant_time_compare(header, f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(MetricsRegistry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,171 @@
+"""
+Per-request batch loaders for the GraphQL schema.
+
+GraphQLView executes synchronously, so resolvers cannot return futures the
+way an asyncio DataLoader expects. Instead, whoever resolves a list of
+objects primes the loaders with the keys its rows will ask for (see
+prime_loaders and BatchedConnectionField), and the first load() fetches all
+primed keys in one query. Each type declares what it loads in `loader_keys`:
+
+    class AttendanceType(DjangoObjectType):
+        loader_keys = {'classrooms': 'classroom_id', 'users': 'marked_by_id'}
+
+        def resolve_classroom_name(self, info):
+            return str(get_loaders(info).classrooms.load(self.classroom_id))
+
+Loaders live on the request, so nothing is shared between requests.
+"""
+from collections import defaultdict
+
+from graphene_django import DjangoConnectionField
+from graphene_django.filter import DjangoFilterConnectionField
+
+
+class BatchLoader:
+    """Load values by key, fetching every primed key in a single batch"""
+
+    def __init__(self, batch_load_fn):
+        # batch_load_fn(keys) -> {key: value}; missing keys resolve to None
+        self.batch_load_fn = batch_load_fn
+        self._cache = {}
+        self._pending = set()
+
+    def prime(self, keys):
+        self._pending.update(key for key in keys if key is not None and key not in self._cache)
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key not in self._cache:
+            self._dispatch({key})
+        return self._cache[key]
+
+    def load_many(self, keys):
+        keys = [key for key in keys if key is not None]
+        missing = {key for key in keys if key not in self._cache}
+        if missing:
+            self._dispatch(missing)
+        return [self._cache[key] for key in keys]
+
+    def clear(self, key=None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self, keys):
+        keys = keys | self._pending
+        self._pending = set()
+        values = self.batch_load_fn(list(keys))
+        for key in keys:
+            self._cache[key] = values.get(key)
+
+
+# --- Batch functions ---
+
+def _load_students_by_classroom(classroom_ids):
+    from students.models import Student
+
+    students = defaultdict(list)
+    for student in Student.objects.filter(classroom_id__in=classroom_ids, is_deleted=False):
+        students[student.classroom_id].append(student)
+    return {classroom_id: students[classroom_id] for classroom_id in classroom_ids}
+
+
+def _load_students(student_ids):
+    from students.models import Student
+
+    # Attendance rows keep pointing at soft deleted students
+    return Student.objects.with_deleted().in_bulk(student_ids)
+
+
+def _load_users(user_ids):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.in_bulk(user_ids)
+
+
+def _load_classrooms(classroom_ids):
+    from classes.models import ClassRoom
+
+    # ClassRoom.__str__ reads the grade
+    return ClassRoom.objects.select_related('grade').in_bulk(classroom_ids)
+
+
+def _load_teachers(teacher_ids):
+    from teachers.models import Teacher
+
+    return Teacher.objects.in_bulk(teacher_ids)
+
+
+def _load_attendances(attendance_ids):
+    from attendance.models import Attendance
+
+    return Attendance.objects.in_bulk(attendance_ids)
+
+
+class RequestLoaders:
+    """The loaders of one request"""
+
+    BATCH_FUNCTIONS = {
+        'students_by_classroom': _load_students_by_classroom,
+        'students': _load_students,
+        'users': _load_users,
+        'classrooms': _load_classrooms,
+        'teachers': _load_teachers,
+        'attendances': _load_attendances,
+    }
+
+    def __init__(self):
+        self._loaders = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self.BATCH_FUNCTIONS:
+            raise AttributeError(name)
+        loader = self._loaders.get(name)
+        if loader is None:
+            loader = self._loaders[name] = BatchLoader(self.BATCH_FUNCTIONS[name])
+        return loader
+
+
+def get_loaders(info):
+    context = info.context
+    loaders = getattr(context, '_graphql_loaders', None)
+    if loaders is None:
+        loaders = RequestLoaders()
+        context._graphql_loaders = loaders
+    return loaders
+
+
+def prime_loaders(info, object_type, instances):
+    """Register the keys `instances` of object_type will load, so they are fetched together"""
+    loader_keys = getattr(object_type, 'loader_keys', None)
+    if not loader_keys:
+        return
+    loaders = get_loaders(info)
+    for name, attr in loader_keys.items():
+        getattr(loaders, name).prime(getattr(instance, attr) for instance in instances)
+
+
+class BatchedConnectionMixin:
+    """Prime the node type's loaders with the rows of the resolved page"""
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, root, info, **args):
+        result = super().connection_resolver(
+            resolver, connection, default_manager, queryset_resolver,
+            max_limit, enforce_first_or_last, root, info, **args
+        )
+        edges = getattr(result, 'edges', None)
+        if edges:
+            prime_loaders(info, connection._meta.node, [edge.node for edge in edges])
+        return result
+
+
+class BatchedConnectionField(BatchedConnectionMixin, DjangoFilterConnectionField):
+    pass
+
+
+class BatchedListConnectionField(BatchedConnectionMixin, DjangoConnectionField):
+    """Paginated replacement for graphene.List(SomeType) on types without filter_fields"""
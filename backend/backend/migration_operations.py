@@ -0,0 +1,25 @@
+"""
+Migration operations for large, write-heavy tables.
+
+AddIndexConcurrently builds the index with CREATE INDEX CONCURRENTLY, so
+inserts and updates keep running while it is built (a plain AddIndex
+blocks writes to the table for the whole build). Migrations using it must
+set atomic = False. Only PostgreSQL has concurrent builds; other databases
+(e.g. an SQLite test run) get an ordinary CREATE INDEX.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently as PostgresAddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrently(PostgresAddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -68,6 +68,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -210,10 +211,21 @@ CACHES = {
         'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # Treat an unreachable Redis as a cache miss instead of failing the request
+            'IGNORE_EXCEPTIONS': True,
         }
     }
 }
 
+# Seconds a resolved Teacher/Coordinator/Principal profile stays cached per user
+ROLE_PROFILE_CACHE_TIMEOUT = int(os.getenv('ROLE_PROFILE_CACHE_TIMEOUT', '900'))
+
+# Seconds cached dashboard responses live at most (see utils.response_cache); writes invalidate them earlier
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Seconds /api/students/stats/ results stay cached per role scope
+STUDENT_STATS_CACHE_TIMEOUT = int(os.getenv('STUDENT_STATS_CACHE_TIMEOUT', '60'))
+
 # CORS/CSRF settings for frontend dev
 CORS_ALLOW_ALL_ORIGINS = os.getenv('CORS_ALLOW_ALL_ORIGINS', 'True').lower() == 'true'
 
@@ -234,14 +246,75 @@ CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
 
 
 
+# Academic year boundary used for per-student attendance summaries (4 = April)
+ACADEMIC_YEAR_START_MONTH = int(os.getenv('ACADEMIC_YEAR_START_MONTH', '4'))
+
 # GraphQL Configuration
 GRAPHENE = {
     'SCHEMA': 'backend.schema.schema',
+    'RELAY_CONNECTION_MAX_LIMIT': int(os.getenv('GRAPHQL_MAX_PAGE_SIZE', '100')),
     # 'MIDDLEWARE': [
     #     'graphql_jwt.middleware.JSONWebTokenMiddleware',
     # ],
 }
 
+# GraphQL query limits (see backend/graphql_cost.py)
+GRAPHQL_MAX_PAGE_SIZE = GRAPHENE['RELAY_CONNECTION_MAX_LIMIT']
+GRAPHQL_LIST_SIZE_ESTIMATE = 50  # Expected rows of a plain (unpaginated) list field
+GRAPHQL_MAX_DEPTH = int(os.getenv('GRAPHQL_MAX_DEPTH', '10'))
+GRAPHQL_MAX_COST = int(os.getenv('GRAPHQL_MAX_COST', '10000'))
+GRAPHQL_COST_BUDGET = int(os.getenv('GRAPHQL_COST_BUDGET', '200000'))  # Per client per window
+GRAPHQL_COST_WINDOW = 60  # seconds
+GRAPHQL_SLOW_QUERY_MS = 1000
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', '256'))  # Parsed documents per worker
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = int(os.getenv('GRAPHQL_PERSISTED_QUERY_TIMEOUT', '86400'))  # seconds after last use
+GRAPHQL_PERSISTED_QUERY_MAX_BYTES = int(os.getenv('GRAPHQL_PERSISTED_QUERY_MAX_BYTES', '20000'))  # Larger texts run but are not stored
+
+# Per-request query/latency instrumentation (see backend/instrumentation.py)
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+INSTRUMENTATION_SERVER_TIMING = os.getenv('INSTRUMENTATION_SERVER_TIMING', 'True').lower() == 'true'
+INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = int(os.getenv('INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', '10'))  # Same SQL per request
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # /metrics is disabled while empty
+
+# Logging (see backend/structured_logging.py): records are written from a background thread
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json or text
+# Keep 1 in N DEBUG/INFO records per message of these per-save loggers
+LOG_SAMPLING = {
+    'students.models': 100,
+    'students.signals': 100,
+    'teachers.models': 100,
+    'teachers.signals': 100,
+    'coordinator.signals': 100,
+    'principals.signals': 100,
+    'classes.signals': 100,
+    'utils.id_generator': 100,
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sampling': {'()': 'backend.structured_logging.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'formatters': {
+        'json': {'()': 'backend.structured_logging.JsonFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'queue': {
+            # A factory, not 'class': Python 3.12+ configures QueueHandler classes itself
+            '()': 'backend.structured_logging.QueueStreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 
 
 # Superuser credentials (use environment variables in production)
@@ -259,6 +332,20 @@ EMAIL_HOST_PASSWORD = 'ztyrojmkeuozvrjw'
 DEFAULT_FROM_EMAIL = 'no-reply.ait@iak.ngo'
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://sms.idaraalkhair.sbs')
 EMAIL_USE_SSL = False
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '20'))
+
+# Generated ID numbers (see services/sequences.py): numbers each worker reserves at once.
+# 1 keeps student numbers gap-free at the cost of a database round trip per student.
+ID_SEQUENCE_BLOCK_SIZE = int(os.getenv('ID_SEQUENCE_BLOCK_SIZE', '20'))
+
+# E-mail outbox (see services/email_outbox.py)
+# 'thread': delivered by a background thread of each web process
+# 'command': delivered by `manage.py send_queued_email --loop`
+EMAIL_OUTBOX_WORKER = os.getenv('EMAIL_OUTBOX_WORKER', 'thread')
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_SECONDS', '30'))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
 
 # Security hardening for production (kept env-driven via DEBUG)
 if not DEBUG:
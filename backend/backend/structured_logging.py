@@ -0,0 +1,121 @@
+"""
+Structured, non-blocking logging (wired up by LOGGING in settings).
+
+- QueueStreamHandler puts records on an in-memory queue and returns; a
+  QueueListener thread formats and writes them. A save() that logs never
+  waits on stdout/stderr. When the queue is full, records are dropped and
+  counted instead of blocking.
+- JsonFormatter writes one JSON object per line: time, level, logger,
+  message, the `extra` fields of the call and the formatted exception.
+- SamplingFilter keeps 1 in N DEBUG/INFO records of noisy loggers
+  (LOG_SAMPLING). It samples per message template, so call sites must use
+  %-style arguments: logger.info("Assigned %s", name), not f-strings.
+  Warnings and errors are never sampled.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N DEBUG/INFO records per (logger, message template) for loggers listed in rates"""
+
+    def __init__(self, rates=None):
+        super().__init__()
+        # {'students.models': 100} also covers 'students.models.*'
+        self.rates = dict(rates or {})
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        every = self._rate(record.name)
+        if every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            seen = self._seen.get(key, 0)
+            self._seen[key] = seen + 1
+        if seen % every:
+            return False
+        if seen:
+            record.sampled = f'1/{every}'
+        return True
+
+    def _rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """Hand records to a background thread that writes them to a stream"""
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # The queue stays in process, so the record does not need to be made picklable;
+        # only the message is fixed now in case its arguments change later.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Flush the queue and stop the listener thread (safe to call more than once)"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,40 @@
+import copy
+import io
+import json
+import logging
+import logging.config
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from .structured_logging import QueueStreamHandler
+
+
+class LoggingConfigTests(SimpleTestCase):
+    """settings.LOGGING loads with dictConfig and writes JSON lines from the listener thread"""
+
+    def setUp(self):
+        # dictConfig stops the handlers it replaces, so later tests need a fresh set
+        self.addCleanup(logging.config.dictConfig, settings.LOGGING)
+
+    def test_settings_logging_configures(self):
+        logging.config.dictConfig(settings.LOGGING)
+        handler = logging.getLogger().handlers[0]
+        self.assertIsInstance(handler, QueueStreamHandler)
+        self.assertIs(logging.getLogger('django').handlers[0], handler)
+
+    def test_records_are_written_as_json(self):
+        config = copy.deepcopy(settings.LOGGING)
+        stream = io.StringIO()
+        config['handlers']['queue'].update(stream=stream, formatter='json')
+        config['root']['level'] = 'INFO'
+        logging.config.dictConfig(config)
+        handler = logging.getLogger().handlers[0]
+
+        logging.getLogger('services.tests').warning("Sent %d emails", 3, extra={'batch': 7})
+        handler.stop()
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(
+            (entry['level'], entry['logger'], entry['message'], entry['batch']),
+            ('WARNING', 'services.tests', 'Sent 3 emails', 7),
+        )
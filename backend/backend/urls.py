@@ -19,7 +19,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from graphene_django.views import GraphQLView
+from backend.graphql_cost import CostLimitedGraphQLView
+from backend.instrumentation import metrics_view
 from django.views.decorators.csrf import csrf_exempt
 
 urlpatterns = [
@@ -37,7 +38,9 @@ urlpatterns = [
     path("api/transfers/", include("transfers.urls")),
     path("api/behaviour/", include("behaviour.urls")),
     # GraphQL endpoint (enable GraphiQL only in DEBUG)
-    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=settings.DEBUG))),
+    path("graphql/", csrf_exempt(CostLimitedGraphQLView.as_view(graphiql=settings.DEBUG))),
+    # Prometheus scrape endpoint (bearer METRICS_TOKEN)
+    path("metrics/", metrics_view, name="metrics"),
     # Removed services.urls - not needed for utility apps
 ]
 
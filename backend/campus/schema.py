@@ -1,17 +1,19 @@
 import graphene
 from graphene_django import DjangoObjectType
+from backend.loaders import BatchedListConnectionField
 from .models import Campus
 
 class CampusType(DjangoObjectType):
     class Meta:
         model = Campus
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_campuses = graphene.List(CampusType)
+    all_campuses = BatchedListConnectionField(CampusType)
     
-    def resolve_all_campuses(self, info):
-        return Campus.objects.all()
+    def resolve_all_campuses(self, info, **kwargs):
+        return Campus.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
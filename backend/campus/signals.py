@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.db.models import Q
 from django.dispatch import receiver
 from .models import Campus
+from utils.response_cache import bump_version
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Campus)
@@ -36,7 +40,7 @@ def reassign_related_records_on_campus_restore(sender, instance, created, **kwar
     if students_count > 0:
         students_to_reassign.update(campus=instance)
         reassigned_count += students_count
-        print(f"✅ Reassigned {students_count} students to campus {campus_code}")
+        logger.info("Reassigned %d students to campus %s", students_count, campus_code)
     
     # 🔹 Reassign Levels with matching campus_code in code
     # Level codes format: C06-L1-M (campus_code-level-shift)
@@ -50,7 +54,7 @@ def reassign_related_records_on_campus_restore(sender, instance, created, **kwar
     if levels_count > 0:
         levels_to_reassign.update(campus=instance)
         reassigned_count += levels_count
-        print(f"✅ Reassigned {levels_count} levels to campus {campus_code}")
+        logger.info("Reassigned %d levels to campus %s", levels_count, campus_code)
     
     # 🔹 Reassign Grades (through their Level)
     from classes.models import Grade
@@ -79,7 +83,7 @@ def reassign_related_records_on_campus_restore(sender, instance, created, **kwar
     if teachers_count > 0:
         teachers_to_reassign.update(current_campus=instance)
         reassigned_count += teachers_count
-        print(f"✅ Reassigned {teachers_count} teachers to campus {campus_code}")
+        logger.info("Reassigned %d teachers to campus %s", teachers_count, campus_code)
     
     # 🔹 Reassign Transfer Requests (if from_campus or to_campus matches)
     from transfers.models import TransferRequest
@@ -107,4 +111,10 @@ def reassign_related_records_on_campus_restore(sender, instance, created, **kwar
         pass  # Can add logic here if needed
     
     if reassigned_count > 0:
-        print(f"🎉 Total reassigned {reassigned_count} records to campus {campus_code}")
+        logger.info("Reassigned %d records in total to campus %s", reassigned_count, campus_code)
+
+
+@receiver(post_save, sender=Campus)
+@receiver(post_delete, sender=Campus)
+def bump_campus_cache_version(sender, instance, **kwargs):
+    bump_version('campus')
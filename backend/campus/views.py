@@ -1,6 +1,7 @@
 from rest_framework import viewsets, decorators, response, permissions
 from .models import Campus
 from .serializers import CampusSerializer
+from utils.response_cache import cache_response
 
 class CampusViewSet(viewsets.ModelViewSet):
     queryset = Campus.objects.all()
@@ -9,6 +10,7 @@ class CampusViewSet(viewsets.ModelViewSet):
 
     # ✅ Custom endpoint: campus summary
     @decorators.action(detail=True, methods=["get"])
+    @cache_response('campus')
     def summary(self, request, pk=None):
         campus = self.get_object()
         data = {
@@ -1,7 +1,7 @@
 import graphene
 from graphene_django import DjangoObjectType
 from .models import ClassRoom, Grade, Level
-from students.models import Student
+from backend.loaders import BatchedListConnectionField, get_loaders
 
 class StudentBasicType(graphene.ObjectType):
     """Basic student information for classroom"""
@@ -15,13 +15,20 @@ class StudentBasicType(graphene.ObjectType):
 class ClassRoomType(DjangoObjectType):
     students = graphene.List(StudentBasicType)
     
+    loader_keys = {
+        'students_by_classroom': 'id',
+        'teachers': 'class_teacher_id',
+        'users': 'assigned_by_id',
+    }
+    
     class Meta:
         model = ClassRoom
         fields = "__all__"
+        use_connection = True
     
     def resolve_students(self, info):
         """Get all students in this classroom"""
-        students = Student.objects.filter(classroom=self, is_deleted=False)
+        students = get_loaders(info).students_by_classroom.load(self.id)
         return [
             {
                 'id': s.id,
@@ -33,30 +40,38 @@ class ClassRoomType(DjangoObjectType):
             }
             for s in students
         ]
+    
+    def resolve_class_teacher(self, info):
+        return get_loaders(info).teachers.load(self.class_teacher_id)
+    
+    def resolve_assigned_by(self, info):
+        return get_loaders(info).users.load(self.assigned_by_id)
 
 class GradeType(DjangoObjectType):
     class Meta:
         model = Grade
         fields = "__all__"
+        use_connection = True
 
 class LevelType(DjangoObjectType):
     class Meta:
         model = Level
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_classrooms = graphene.List(ClassRoomType)
-    all_grades = graphene.List(GradeType)
-    all_levels = graphene.List(LevelType)
+    all_classrooms = BatchedListConnectionField(ClassRoomType)
+    all_grades = BatchedListConnectionField(GradeType)
+    all_levels = BatchedListConnectionField(LevelType)
     
-    def resolve_all_classrooms(self, info):
-        return ClassRoom.objects.all()
+    def resolve_all_classrooms(self, info, **kwargs):
+        return ClassRoom.objects.order_by('id')
     
-    def resolve_all_grades(self, info):
-        return Grade.objects.all()
+    def resolve_all_grades(self, info, **kwargs):
+        return Grade.objects.order_by('id')
     
-    def resolve_all_levels(self, info):
-        return Level.objects.all()
+    def resolve_all_levels(self, info, **kwargs):
+        return Level.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
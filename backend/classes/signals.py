@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from classes.models import ClassRoom
+from classes.models import ClassRoom, Level
 from coordinator.models import Coordinator
+from users.role_profile import RoleProfileResolver
+from utils.response_cache import bump_version
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=ClassRoom)
 def update_teacher_coordinator_on_classroom_change(sender, instance, **kwargs):
@@ -23,6 +28,16 @@ def update_teacher_coordinator_on_classroom_change(sender, instance, **kwargs):
                 # Add coordinator (not replace) - use ManyToMany
                 if coordinator not in teacher.assigned_coordinators.all():
                     teacher.assigned_coordinators.add(coordinator)
-                    print(f"Added coordinator {coordinator.full_name} for level {instance.grade.level.name}")
+                    logger.info("Added coordinator %s to teacher %s for level %s", coordinator.id, teacher.id, instance.grade.level_id)
             else:
-                print(f"No coordinator found for {instance.grade.level.name}")
\ No newline at end of file
+                logger.warning("No active coordinator for level %s", instance.grade.level_id)
+
+
+@receiver(post_save, sender=ClassRoom)
+@receiver(post_delete, sender=ClassRoom)
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+def invalidate_role_profiles_on_scope_change(sender, instance, **kwargs):
+    """Classroom/level changes alter the visible scope of many users, so drop all cached role profiles"""
+    RoleProfileResolver.bump_scope_version()
+    bump_version('classroom')
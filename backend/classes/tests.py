@@ -0,0 +1,75 @@
+from datetime import date
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import ClassRoom, Grade, Level
+from backend.schema import schema
+from campus.models import Campus
+from students.models import Student
+from teachers.models import Teacher
+from users.models import User
+
+
+ALL_CLASSROOMS = """
+{
+  allClassrooms(first: 100) {
+    edges {
+      node {
+        id
+        section
+        classTeacher { fullName }
+        students { name }
+      }
+    }
+  }
+}
+"""
+
+
+class AllClassroomsQueryCountTests(TestCase):
+    """allClassrooms runs one query per loader, whatever the number of classrooms on the page"""
+
+    def setUp(self):
+        campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        level = Level.objects.create(name='Primary', shift='morning', campus=campus)
+        self.grade = Grade.objects.create(name='Grade-1', level=level)
+        self.request = RequestFactory().get('/graphql/')
+        self.request.user = User.objects.create(
+            username='S-admin', email='admin@example.com', role='superadmin', is_superuser=True,
+        )
+
+    def add_classroom(self, section, students=3):
+        classroom = ClassRoom.objects.create(grade=self.grade, section=section, shift='morning')
+        teacher = Teacher.objects.bulk_create([Teacher(
+            full_name=f'Teacher {section}', dob=date(1990, 1, 1), gender='female', contact_number='03000000000',
+            email=f'teacher.{section.lower()}@example.com', cnic=f'42101-000000{ord(section)}',
+            employee_code=f'C01-M-25-T-{ord(section):04d}', current_campus=self.grade.level.campus,
+        )])[0]
+        ClassRoom.objects.filter(pk=classroom.pk).update(class_teacher=teacher)
+        for number in range(students):
+            Student.objects.create(
+                name=f'Student {section}{number}', classroom=classroom, campus=self.grade.level.campus,
+                current_grade='Grade-1', section=section, shift='morning', enrollment_year=2025,
+                gender='male', is_draft=False,
+            )
+
+    def execute(self):
+        result = schema.execute(ALL_CLASSROOMS, context_value=self.request)
+        self.assertIsNone(result.errors)
+        return result.data['allClassrooms']['edges']
+
+    def test_query_count_is_constant_in_classrooms(self):
+        self.add_classroom('A')
+        with CaptureQueriesContext(connection) as one_classroom:
+            edges = self.execute()
+        self.assertEqual(len(edges), 1)
+
+        for section in 'BCDE':
+            self.add_classroom(section)
+        with self.assertNumQueries(len(one_classroom)):
+            edges = self.execute()
+        self.assertEqual(len(edges), 5)
+        self.assertTrue(all(len(edge['node']['students']) == 3 for edge in edges))
+        self.assertTrue(all(edge['node']['classTeacher'] for edge in edges))
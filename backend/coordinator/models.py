@@ -1,6 +1,9 @@
 from django.db import models
 from campus.models import Campus
 from classes.models import Level
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Choices
 GENDER_CHOICES = [
@@ -86,8 +89,8 @@ class Coordinator(models.Model):
                 self.employee_code = IDGenerator.generate_unique_employee_code(
                     self.campus, 'morning', year, 'coordinator'
                 )
-            except Exception as e:
-                print(f"Error generating employee code: {str(e)}")
+            except Exception:
+                logger.exception("Generating employee code failed for coordinator %r", self.full_name)
         
         super().save(*args, **kwargs)
     
@@ -1,17 +1,19 @@
 import graphene
 from graphene_django import DjangoObjectType
+from backend.loaders import BatchedListConnectionField
 from .models import Coordinator
 
 class CoordinatorType(DjangoObjectType):
     class Meta:
         model = Coordinator
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_coordinators = graphene.List(CoordinatorType)
+    all_coordinators = BatchedListConnectionField(CoordinatorType)
     
-    def resolve_all_coordinators(self, info):
-        return Coordinator.objects.all()
+    def resolve_all_coordinators(self, info, **kwargs):
+        return Coordinator.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
\ No newline at end of file
@@ -1,9 +1,15 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from coordinator.models import Coordinator
 from teachers.models import Teacher
 from classes.models import Grade
 from services.user_creation_service import UserCreationService
+from users.role_profile import RoleProfileResolver
+from users.scopes import ClassroomScope
+from utils.response_cache import bump_version
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Coordinator)
 def create_coordinator_user(sender, instance, created, **kwargs):
@@ -17,22 +23,22 @@ def create_coordinator_user(sender, instance, created, **kwargs):
                     hasattr(instance, 'assigned_levels') and instance.assigned_levels.exists()
                 )
                 if not has_levels:
-                    print("Deferring user creation until levels are attached (both shift)")
+                    logger.info("Deferring user creation for coordinator %s until levels are attached", instance.id)
                     return
             
             # Check if user already exists
             from users.models import User
             if User.objects.filter(email=instance.email).exists():
-                print(f"User already exists for coordinator {instance.full_name}")
+                logger.info("User already exists for coordinator %s", instance.id)
                 return
             
             user, message = UserCreationService.create_user_from_entity(instance, 'coordinator')
             if not user:
-                print(f"Failed to create user for coordinator {instance.id}: {message}")
+                logger.error("Failed to create user for coordinator %s: %s", instance.id, message)
             else:
-                print(f"✅ Created user for coordinator: {instance.full_name} ({instance.employee_code})")
-        except Exception as e:
-            print(f"Error creating user for coordinator {instance.id}: {str(e)}")
+                logger.info("Created user for coordinator %s (%s)", instance.id, instance.employee_code)
+        except Exception:
+            logger.exception("Error creating user for coordinator %s", instance.id)
 
 def _auto_assign_for_coordinator(instance):
     """Shared logic to auto-assign teachers based on coordinator's managed levels."""
@@ -43,14 +49,13 @@ def _auto_assign_for_coordinator(instance):
     elif instance.level:
         managed_levels = [instance.level]
 
-    level_name = ", ".join([lvl.name for lvl in managed_levels]) if managed_levels else "No Level"
-    campus_name = instance.campus.campus_name if instance.campus else "No Campus"
-    print(f"Coordinator sync: {instance.full_name} for {level_name} in {campus_name}")
+    level_ids = [lvl.id for lvl in managed_levels]
+    logger.info("Coordinator sync: %s for levels %s in campus %s", instance.id, level_ids, instance.campus_id)
 
     try:
         # Check if any level is assigned
         if not managed_levels:
-            print(f"No level assigned to coordinator {instance.full_name}")
+            logger.warning("No level assigned to coordinator %s", instance.id)
             return
             
         # Get grades for these levels
@@ -58,7 +63,7 @@ def _auto_assign_for_coordinator(instance):
         grade_names = [g.name for g in grades]
         
         if not grade_names:
-            print(f"No grades found for level list: {level_name}")
+            logger.warning("No grades found for levels %s of coordinator %s", level_ids, instance.id)
             return
         
         # Find teachers for this campus who teach grades in these levels
@@ -95,15 +100,15 @@ def _auto_assign_for_coordinator(instance):
                     if instance not in teacher.assigned_coordinators.all():
                         teacher.assigned_coordinators.add(instance)
                         assigned_count += 1
-                        print(f"Added coordinator {instance.full_name} to {teacher.full_name}")
+                        logger.info("Added coordinator %s to teacher %s", instance.id, teacher.id)
                     
-            except Exception as e:
-                print(f"Error assigning teacher {teacher.full_name}: {str(e)}")
+            except Exception:
+                logger.exception("Error assigning teacher %s to coordinator %s", teacher.id, instance.id)
         
-        print(f"Auto-assigned {assigned_count} teachers to coordinator {instance.full_name}")
+        logger.info("Auto-assigned %d teachers to coordinator %s", assigned_count, instance.id)
         
-    except Exception as e:
-        print(f"Error auto-assigning teachers to coordinator {instance.full_name}: {str(e)}")
+    except Exception:
+        logger.exception("Error auto-assigning teachers to coordinator %s", instance.id)
 
 
 @receiver(post_save, sender=Coordinator)
@@ -115,9 +120,22 @@ def auto_assign_teachers_to_new_coordinator(sender, instance, created, **kwargs)
         _auto_assign_for_coordinator(instance)
 
 
+@receiver(post_save, sender=Coordinator)
+def invalidate_coordinator_role_profile(sender, instance, **kwargs):
+    """Drop the cached role profile so the next request sees the new level(s)"""
+    ClassroomScope.invalidate_coordinator(instance)
+    RoleProfileResolver.invalidate_for_profile(instance)
+
+
 @receiver(m2m_changed, sender=Coordinator.assigned_levels.through)
 def on_assigned_levels_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
     """Re-run auto assignment when assigned levels change for a coordinator."""
+    if action in {"post_add", "post_remove", "post_clear"}:
+        if reverse:
+            RoleProfileResolver.bump_scope_version()
+        else:
+            ClassroomScope.invalidate_coordinator(instance)
+            RoleProfileResolver.invalidate_for_profile(instance)
     if action in {"post_add", "post_remove", "post_clear"} and instance.is_currently_active:
         # If the coordinator doesn't yet have a user/employee code because we deferred on create,
         # attempt to create the user now that levels are available
@@ -125,10 +143,16 @@ def on_assigned_levels_changed(sender, instance, action, reverse, model, pk_set,
             if not getattr(instance, 'employee_code', None):
                 user, message = UserCreationService.create_user_from_entity(instance, 'coordinator')
                 if not user:
-                    print(f"Failed to create user after levels set for coordinator {instance.id}: {message}")
+                    logger.error("Failed to create user after levels set for coordinator %s: %s", instance.id, message)
                 else:
-                    print(f"✅ Created user after levels set for coordinator: {instance.full_name} ({instance.employee_code})")
-        except Exception as e:
-            print(f"Error creating user after levels set for coordinator {instance.id}: {str(e)}")
+                    logger.info("Created user after levels set for coordinator %s (%s)", instance.id, instance.employee_code)
+        except Exception:
+            logger.exception("Error creating user after levels set for coordinator %s", instance.id)
 
-        _auto_assign_for_coordinator(instance)
\ No newline at end of file
+        _auto_assign_for_coordinator(instance)
+
+
+@receiver(post_save, sender=Coordinator)
+@receiver(post_delete, sender=Coordinator)
+def bump_coordinator_cache_version(sender, instance, **kwargs):
+    bump_version('coordinator')
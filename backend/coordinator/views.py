@@ -7,6 +7,8 @@ from .filters import CoordinatorFilter
 from teachers.models import Teacher
 from students.models import Student
 from classes.models import ClassRoom
+from users.scopes import ClassroomScope
+from utils.response_cache import cache_response
 from django.db.models import Count, Q
 import logging
 
@@ -118,28 +120,13 @@ class CoordinatorViewSet(viewsets.ModelViewSet):
         
         # If no teachers via ManyToMany, get through classroom assignments
         if not teachers.exists():
-            managed_levels = []
-            if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                managed_levels = list(coordinator.assigned_levels.all())
-            elif coordinator.level:
-                managed_levels = [coordinator.level]
-            
-            if managed_levels:
-                # Get classrooms under this coordinator's levels
-                classrooms = ClassRoom.objects.filter(
-                    grade__level__in=managed_levels
-                ).select_related('class_teacher')
-                
-                # Get teachers from those classrooms
-                teacher_ids = set()
-                for classroom in classrooms:
-                    if classroom.class_teacher:
-                        teacher_ids.add(classroom.class_teacher.id)
-                
+            classroom_ids = ClassroomScope.coordinator_classroom_ids(coordinator)
+            if classroom_ids:
+                # Class teachers of the classrooms under this coordinator's levels
                 teachers = Teacher.objects.filter(
-                    id__in=teacher_ids,
+                    classroom_set__id__in=classroom_ids,
                     is_currently_active=True
-                ).select_related('current_campus').prefetch_related('assigned_coordinators')
+                ).distinct().select_related('current_campus').prefetch_related('assigned_coordinators')
         
         # Serialize teacher data
         teachers_data = []
@@ -172,6 +159,7 @@ class CoordinatorViewSet(viewsets.ModelViewSet):
         })
 
     @decorators.action(detail=True, methods=["get"])
+    @cache_response('coordinator', 'teacher', 'student', 'classroom', 'campus')
     def dashboard_stats(self, request, pk=None):
         """Get dashboard statistics for coordinator"""
         coordinator = self.get_object()
@@ -182,46 +170,23 @@ class CoordinatorViewSet(viewsets.ModelViewSet):
             is_currently_active=True
         ).count()
         
+        # Classrooms under this coordinator's level(s), cached until assignments change
+        classroom_ids = ClassroomScope.coordinator_classroom_ids(coordinator)
+        
         # If no teachers assigned via ManyToMany, try to get teachers through level/classroom relationship
-        if teachers_count == 0:
-            # Get teachers through classroom assignments
-            managed_levels = []
-            if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                managed_levels = list(coordinator.assigned_levels.all())
-            elif coordinator.level:
-                managed_levels = [coordinator.level]
-            
-            if managed_levels:
-                # Get classrooms under this coordinator's levels
-                classrooms = ClassRoom.objects.filter(
-                    grade__level__in=managed_levels
-                ).select_related('class_teacher')
-                
-                # Get teachers from those classrooms
-                teacher_ids = set()
-                for classroom in classrooms:
-                    if classroom.class_teacher:
-                        teacher_ids.add(classroom.class_teacher.id)
-                
-                teachers_count = len(teacher_ids)
+        if teachers_count == 0 and classroom_ids:
+            # Count distinct class teachers of those classrooms
+            teachers_count = ClassRoom.objects.filter(
+                id__in=classroom_ids,
+                class_teacher__isnull=False
+            ).values('class_teacher_id').distinct().count()
         
         # Get students count from coordinator's managed classrooms
         students_count = 0
         if coordinator.campus:
-            # Get students from classrooms under this coordinator's levels
-            managed_levels = []
-            if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                managed_levels = list(coordinator.assigned_levels.all())
-            elif coordinator.level:
-                managed_levels = [coordinator.level]
-            
-            if managed_levels:
-                classrooms = ClassRoom.objects.filter(
-                    grade__level__in=managed_levels
-                ).values_list('id', flat=True)
-                
+            if classroom_ids or ClassroomScope.managed_level_ids(coordinator):
                 students_count = Student.objects.filter(
-                    classroom__in=classrooms,
+                    classroom_id__in=classroom_ids,
                     is_deleted=False
                 ).count()
             else:
@@ -233,18 +198,11 @@ class CoordinatorViewSet(viewsets.ModelViewSet):
         
         # Get classes count for this coordinator's level and campus
         classes_count = 0
-        if coordinator.campus:
-            managed_levels = []
-            if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                managed_levels = list(coordinator.assigned_levels.all())
-            elif coordinator.level:
-                managed_levels = [coordinator.level]
-            
-            if managed_levels:
-                classes_count = ClassRoom.objects.filter(
-                    grade__level__in=managed_levels,
-                    grade__level__campus=coordinator.campus
-                ).count()
+        if coordinator.campus and classroom_ids:
+            classes_count = ClassRoom.objects.filter(
+                id__in=classroom_ids,
+                grade__level__campus=coordinator.campus
+            ).count()
         
         # Get pending requests (if any)
         pending_requests = 0  # This would need to be implemented based on your request system
@@ -256,27 +214,11 @@ class CoordinatorViewSet(viewsets.ModelViewSet):
         )
         
         # If no teachers via ManyToMany, get through classroom assignments
-        if not teachers.exists():
-            managed_levels = []
-            if coordinator.shift == 'both' and coordinator.assigned_levels.exists():
-                managed_levels = list(coordinator.assigned_levels.all())
-            elif coordinator.level:
-                managed_levels = [coordinator.level]
-            
-            if managed_levels:
-                classrooms = ClassRoom.objects.filter(
-                    grade__level__in=managed_levels
-                ).select_related('class_teacher')
-                
-                teacher_ids = set()
-                for classroom in classrooms:
-                    if classroom.class_teacher:
-                        teacher_ids.add(classroom.class_teacher.id)
-                
-                teachers = Teacher.objects.filter(
-                    id__in=teacher_ids,
-                    is_currently_active=True
-                )
+        if not teachers.exists() and classroom_ids:
+            teachers = Teacher.objects.filter(
+                classroom_set__id__in=classroom_ids,
+                is_currently_active=True
+            ).distinct()
         
         subject_distribution = {}
         for teacher in teachers:
@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from campus.models import Campus
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -80,8 +83,8 @@ class Principal(models.Model):
                 self.employee_code = IDGenerator.generate_unique_employee_code(
                     self.campus, self.shift, year, 'principal'
                 )
-            except Exception as e:
-                print(f"Error generating employee code: {str(e)}")
+            except Exception:
+                logger.exception("Generating employee code failed for principal %r", self.full_name)
         
         super().save(*args, **kwargs)
     
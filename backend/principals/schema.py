@@ -1,17 +1,19 @@
 import graphene
 from graphene_django import DjangoObjectType
+from backend.loaders import BatchedListConnectionField
 from .models import Principal
 
 class PrincipalType(DjangoObjectType):
     class Meta:
         model = Principal
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_principals = graphene.List(PrincipalType)
+    all_principals = BatchedListConnectionField(PrincipalType)
     
-    def resolve_all_principals(self, info):
-        return Principal.objects.all()
+    def resolve_all_principals(self, info, **kwargs):
+        return Principal.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
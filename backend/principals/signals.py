@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Principal
 from services.user_creation_service import UserCreationService
+from users.role_profile import RoleProfileResolver
+from utils.response_cache import bump_version
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Principal)
 def create_principal_user(sender, instance, created, **kwargs):
@@ -11,13 +16,25 @@ def create_principal_user(sender, instance, created, **kwargs):
             # Check if user already exists
             from users.models import User
             if User.objects.filter(email=instance.email).exists():
-                print(f"User already exists for principal {instance.full_name}")
+                logger.info("User already exists for principal %s", instance.id)
                 return
             
             user, message = UserCreationService.create_user_from_entity(instance, 'principal')
             if not user:
-                print(f"Failed to create user for principal {instance.id}: {message}")
+                logger.error("Failed to create user for principal %s: %s", instance.id, message)
             else:
-                print(f"Success: Created user for principal: {instance.full_name} ({instance.employee_code})")
-        except Exception as e:
-            print(f"Error creating user for principal {instance.id}: {str(e)}")
\ No newline at end of file
+                logger.info("Created user for principal %s (%s)", instance.id, instance.employee_code)
+        except Exception:
+            logger.exception("Error creating user for principal %s", instance.id)
+
+
+@receiver(post_save, sender=Principal)
+def invalidate_principal_role_profile(sender, instance, **kwargs):
+    """Drop the cached role profile so the next request sees the new campus"""
+    RoleProfileResolver.invalidate_for_profile(instance)
+
+
+@receiver(post_save, sender=Principal)
+@receiver(post_delete, sender=Principal)
+def bump_principal_cache_version(sender, instance, **kwargs):
+    bump_version('principal')
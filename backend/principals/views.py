@@ -8,6 +8,10 @@ from django.contrib.auth import get_user_model
 from users.permissions import IsSuperAdmin
 from .models import Principal
 from .serializers import PrincipalSerializer
+from utils.response_cache import cache_response
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -77,8 +81,8 @@ class PrincipalViewSet(viewsets.ModelViewSet):
                 # Link user to principal
                 principal.user = user
                 principal.save()
-        except Exception as e:
-            print(f"Error creating user for principal: {str(e)}")
+        except Exception:
+            logger.exception("Error creating user for principal %s", principal.id)
     
     def perform_update(self, serializer):
         """Update principal and sync user account if needed"""
@@ -112,6 +116,7 @@ class PrincipalViewSet(viewsets.ModelViewSet):
             principal.user.save()
     
     @decorators.action(detail=False, methods=['get'])
+    @cache_response('principal')
     def stats(self, request):
         """Get principal statistics"""
         total = self.get_queryset().count()
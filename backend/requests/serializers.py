@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import RequestComplaint, RequestComment, RequestStatusHistory
+from users.role_profile import RoleProfileResolver
 
 class RequestCommentSerializer(serializers.ModelSerializer):
     """Serializer for request comments"""
@@ -88,7 +89,7 @@ class RequestComplaintCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         try:
             from teachers.models import Teacher
-            teacher = Teacher.objects.get(email=user.email)
+            teacher = RoleProfileResolver.for_user(user).get_instance(Teacher)
         except Teacher.DoesNotExist:
             raise serializers.ValidationError("Teacher profile not found")
         
@@ -15,6 +15,7 @@ from .serializers import (
     RequestCommentCreateSerializer,
     RequestCommentSerializer
 )
+from users.role_profile import RoleProfileResolver
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -53,7 +54,7 @@ def get_my_requests(request):
         
         # Get teacher's requests
         from teachers.models import Teacher
-        teacher = Teacher.objects.get(email=user.email)
+        teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
         requests = RequestComplaint.objects.filter(teacher=teacher)
         
         serializer = RequestComplaintListSerializer(requests, many=True)
@@ -72,12 +73,12 @@ def get_request_detail(request, request_id):
         # Check permissions
         if user.is_teacher():
             from teachers.models import Teacher
-            teacher = Teacher.objects.get(email=user.email)
+            teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
             if request_obj.teacher != teacher:
                 return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         elif user.is_coordinator():
             from coordinator.models import Coordinator
-            coordinator = Coordinator.objects.get(email=user.email)
+            coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
             if request_obj.coordinator != coordinator:
                 return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         elif not user.is_superuser:
@@ -98,7 +99,7 @@ def get_coordinator_requests(request):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(email=user.email)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         requests = RequestComplaint.objects.filter(coordinator=coordinator)
         
         # Get filter parameters
@@ -128,7 +129,7 @@ def update_request_status(request, request_id):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(email=user.email)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         request_obj = get_object_or_404(RequestComplaint, id=request_id, coordinator=coordinator)
         
         serializer = RequestComplaintUpdateSerializer(request_obj, data=request.data, partial=True)
@@ -151,12 +152,12 @@ def add_comment(request, request_id):
         # Check permissions
         if user.is_teacher():
             from teachers.models import Teacher
-            teacher = Teacher.objects.get(email=user.email)
+            teacher = RoleProfileResolver.for_request(request).get_instance(Teacher)
             if request_obj.teacher != teacher:
                 return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         elif user.is_coordinator():
             from coordinator.models import Coordinator
-            coordinator = Coordinator.objects.get(email=user.email)
+            coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
             if request_obj.coordinator != coordinator:
                 return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         elif not user.is_superuser:
@@ -187,7 +188,7 @@ def get_coordinator_dashboard_stats(request):
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
         from coordinator.models import Coordinator
-        coordinator = Coordinator.objects.get(email=user.email)
+        coordinator = RoleProfileResolver.for_request(request).get_instance(Coordinator)
         
         requests = RequestComplaint.objects.filter(coordinator=coordinator)
         
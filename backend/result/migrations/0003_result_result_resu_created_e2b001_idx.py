@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coordinator', '0003_coordinator_assigned_levels'),
+        ('result', '0002_initial'),
+        ('students', '0005_alter_student_campus'),
+        ('teachers', '0014_alter_teacher_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['created_at', 'id'], name='result_resu_created_e2b001_idx'),
+        ),
+    ]
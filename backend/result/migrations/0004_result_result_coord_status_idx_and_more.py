@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('coordinator', '0003_coordinator_assigned_levels'),
+        ('result', '0003_result_result_resu_created_e2b001_idx'),
+        ('students', '0006_student_students_st_created_a5766e_idx'),
+        ('teachers', '0014_alter_teacher_user'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['coordinator', 'status'], name='result_coord_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['teacher', 'created_at'], name='result_teacher_created_idx'),
+        ),
+    ]
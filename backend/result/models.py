@@ -46,13 +46,21 @@ class Result(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Fields set by apply_totals()
+    TOTAL_FIELDS = ['total_marks', 'obtained_marks', 'percentage', 'grade', 'result_status']
+    
     def calculate_totals(self):
         """Calculate total marks, obtained marks, percentage, grade, and result status"""
+        self.apply_totals(self.subject_marks.all())
+        self.save(update_fields=self.TOTAL_FIELDS)
+    
+    def apply_totals(self, subject_marks):
+        """Set the TOTAL_FIELDS from evaluated subject marks in memory, without saving"""
         total_marks = 0
         obtained_marks = 0
         all_subjects_pass = True
         
-        for subject_mark in self.subject_marks.all():
+        for subject_mark in subject_marks:
             total_marks += subject_mark.get_total_marks()
             obtained_marks += subject_mark.get_obtained_marks()
             if not subject_mark.is_pass:
@@ -78,8 +86,6 @@ class Result(models.Model):
         
         # Result status: Pass if all subjects pass AND percentage >= 50
         self.result_status = 'pass' if (all_subjects_pass and self.percentage >= 50) else 'fail'
-        
-        self.save(update_fields=['total_marks', 'obtained_marks', 'percentage', 'grade', 'result_status'])
     
     def __str__(self):
         return f"{self.student.name} - {self.get_exam_type_display()} ({self.status})"
@@ -87,6 +93,13 @@ class Result(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['student', 'exam_type', 'academic_year', 'semester']
+        indexes = [
+            # Keyset pagination (?cursor=) walks (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            # Coordinator review queues and teacher result lists
+            models.Index(fields=['coordinator', 'status'], name='result_coord_status_idx'),
+            models.Index(fields=['teacher', 'created_at'], name='result_teacher_created_idx'),
+        ]
 
 class SubjectMark(models.Model):
     SUBJECT_CHOICES = [
@@ -113,28 +126,35 @@ class SubjectMark(models.Model):
     
     is_pass = models.BooleanField(default=False)
     
+    PRACTICAL_SUBJECTS = ['urdu', 'english']
+    # exam_type -> (theory pass mark, practical pass mark); anything else counts as final_term
+    PASS_MARKS = {
+        'mid_term': (33, 7),
+        'final_term': (40, 8),
+    }
+    
     def save(self, *args, **kwargs):
+        self.evaluate(self.result.exam_type)
+        super().save(*args, **kwargs)
+    
+    def evaluate(self, exam_type):
+        """
+        Set has_practical/practical_total and is_pass for the exam type in memory.
+        save() calls it; bulk paths call it themselves before bulk_create().
+        """
         # Auto-determine if subject has practical
-        if self.subject_name in ['urdu', 'english']:
+        if self.subject_name in self.PRACTICAL_SUBJECTS:
             self.has_practical = True
             if not self.practical_total:
                 self.practical_total = 20
         
         # Calculate pass/fail based on exam type
-        if self.result.exam_type == 'mid_term':
-            theory_pass = self.obtained_marks >= 33
-            practical_pass = True
-            if self.has_practical and self.practical_obtained:
-                practical_pass = self.practical_obtained >= 7
-            self.is_pass = theory_pass and practical_pass
-        else:  # final_term
-            theory_pass = self.obtained_marks >= 40
-            practical_pass = True
-            if self.has_practical and self.practical_obtained:
-                practical_pass = self.practical_obtained >= 8
-            self.is_pass = theory_pass and practical_pass
-        
-        super().save(*args, **kwargs)
+        theory_min, practical_min = self.PASS_MARKS.get(exam_type, self.PASS_MARKS['final_term'])
+        theory_pass = self.obtained_marks >= theory_min
+        practical_pass = True
+        if self.has_practical and self.practical_obtained:
+            practical_pass = self.practical_obtained >= practical_min
+        self.is_pass = theory_pass and practical_pass
     
     def get_total_marks(self):
         """Get total marks including practical if applicable"""
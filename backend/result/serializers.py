@@ -1,11 +1,18 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Result, SubjectMark
+from .services import ResultIngestionService
 from students.serializers import StudentSerializer
 from teachers.serializers import TeacherSerializer
 from coordinator.serializers import CoordinatorSerializer
+from classes.models import ClassRoom
 from students.models import Student
 from teachers.models import Teacher
 from coordinator.models import Coordinator
+from users.role_profile import RoleProfileResolver
+import logging
+
+logger = logging.getLogger(__name__)
 
 class SubjectMarkSerializer(serializers.ModelSerializer):
     class Meta:
@@ -51,33 +58,26 @@ class ResultCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         try:
             from teachers.models import Teacher
-            teacher = Teacher.objects.get(email=user.email)
+            teacher = RoleProfileResolver.for_user(user).get_instance(Teacher)
         except Teacher.DoesNotExist:
             raise serializers.ValidationError("Teacher profile not found")
         
         # Get teacher's assigned coordinator
-        if not teacher.assigned_coordinators.exists():
-            raise serializers.ValidationError("No coordinator assigned to this teacher")
-        
         coordinator = teacher.assigned_coordinators.first()
+        if coordinator is None:
+            raise serializers.ValidationError("No coordinator assigned to this teacher")
         
-        validated_data['teacher'] = teacher
-        validated_data['coordinator'] = coordinator
-        
-        result = Result.objects.create(**validated_data)
-        
-        # Create subject marks
-        for subject_data in subject_marks_data:
-            SubjectMark.objects.create(result=result, **subject_data)
-        
-        # Calculate totals
-        result.calculate_totals()
-        
-        # Auto-submit to coordinator (change status from draft to submitted)
-        result.status = 'submitted'
-        result.save()
-        
-        return result
+        validated_data.pop('teacher', None)
+        validated_data.pop('coordinator', None)
+        validated_data['subject_marks'] = subject_marks_data
+        
+        # Totals are computed in memory and the result is auto-submitted to the
+        # coordinator, so it is inserted once. The views check the mid-term rule.
+        service = ResultIngestionService(teacher, coordinator, status='submitted', require_mid_term=False)
+        plan = service.plan([(validated_data['student'].id, validated_data)])
+        if plan['errors']:
+            raise serializers.ValidationError([message for _, message in plan['errors']])
+        return service.execute(plan)[0]
 
 class ResultUpdateSerializer(serializers.ModelSerializer):
     subject_marks = SubjectMarkSerializer(many=True)
@@ -92,26 +92,42 @@ class ResultUpdateSerializer(serializers.ModelSerializer):
         
         subject_marks_data = validated_data.get('subject_marks', [])
         
-        # Update subject marks
+        # Update subject marks in memory, then write them in one statement each
+        subject_marks = {mark.subject_name: mark for mark in instance.subject_marks.all()}
+        created, changed, errors = [], [], []
         for subject_data in subject_marks_data:
-            subject_mark, created = SubjectMark.objects.get_or_create(
-                result=instance,
-                subject_name=subject_data['subject_name'],
-                defaults=subject_data
-            )
-            if not created:
+            subject_mark = subject_marks.get(subject_data['subject_name'])
+            if subject_mark is None:
+                subject_mark = SubjectMark(result=instance, **subject_data)
+                subject_marks[subject_mark.subject_name] = subject_mark
+                created.append(subject_mark)
+            else:
                 for attr, value in subject_data.items():
                     setattr(subject_mark, attr, value)
-                subject_mark.save()
+                changed.append(subject_mark)
+            subject_mark.evaluate(instance.exam_type)
+            errors.extend(
+                f"{subject_mark.get_subject_name_display()}: {error}"
+                for error in ResultIngestionService.mark_errors(subject_mark)
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
         
         # Increment edit count if not draft
         if instance.status != 'draft':
             instance.edit_count += 1
         
-        instance.save()
-        
         # Recalculate totals
-        instance.calculate_totals()
+        instance.apply_totals(subject_marks.values())
+        
+        with transaction.atomic():
+            SubjectMark.objects.bulk_create(created)
+            if changed:
+                SubjectMark.objects.bulk_update(changed, [
+                    'total_marks', 'obtained_marks', 'has_practical', 'practical_total',
+                    'practical_obtained', 'is_pass',
+                ])
+            instance.save()
         
         return instance
 
@@ -131,7 +147,10 @@ class ResultSubmitSerializer(serializers.ModelSerializer):
         failed_subjects = instance.subject_marks.filter(is_pass=False)
         if failed_subjects.exists():
             failed_names = [sm.get_subject_name_display() for sm in failed_subjects]
-            print(f"⚠️ Student failed in: {', '.join(failed_names)} - but allowing forwarding for record keeping")
+            logger.info(
+                "Forwarding result %s of student %s with failed subjects: %s",
+                instance.id, instance.student_id, ', '.join(failed_names),
+            )
         
         # Set status based on what's being requested
         new_status = validated_data.get('status', 'submitted')
@@ -159,3 +178,20 @@ class ResultApprovalSerializer(serializers.ModelSerializer):
         instance.save()
         
         return instance
+
+class ClassResultUploadSerializer(serializers.Serializer):
+    """A class mark sheet: JSON `rows` or a CSV `file` (see result.services.MarkSheetService)"""
+    MAX_ROWS = 500
+    
+    classroom = serializers.PrimaryKeyRelatedField(queryset=ClassRoom.objects.all())
+    exam_type = serializers.ChoiceField(choices=Result.EXAM_TYPE_CHOICES)
+    academic_year = serializers.CharField(max_length=10, default=Result._meta.get_field('academic_year').default)
+    semester = serializers.CharField(max_length=20, default=Result._meta.get_field('semester').default)
+    rows = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_ROWS)
+    file = serializers.FileField(required=False)
+    dry_run = serializers.BooleanField(default=False)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('rows')) == bool(attrs.get('file')):
+            raise serializers.ValidationError("Send either rows (JSON) or a CSV file")
+        return attrs
@@ -0,0 +1,272 @@
+import csv
+import io
+
+from django.db import transaction
+
+from .models import Result, SubjectMark
+
+
+class ResultIngestionService:
+    """
+    Create the results of many students (a class's term marks) without a query per subject.
+
+    - Subject marks are validated and evaluated (pass/fail) in memory, and each
+      Result's totals, percentage, grade and status are computed before it is written.
+    - Existing results and approved mid-terms of all the students are read in one
+      query each.
+    - Results are inserted with one bulk_create, their subject marks with another,
+      so every Result is written exactly once.
+
+    plan() only reads, so its result doubles as the validation report.
+    """
+
+    def __init__(self, teacher, coordinator, status='submitted', require_mid_term=True, chunk_size=500):
+        self.teacher = teacher
+        self.coordinator = coordinator
+        self.status = status
+        # Final-term results need an approved mid-term of the student
+        self.require_mid_term = require_mid_term
+        self.chunk_size = chunk_size
+
+    def plan(self, entries):
+        """
+        Validate entries ([(key, data)] where data has student, exam_type, optional
+        academic_year/semester and subject_marks as a list of dicts) and build the results.
+
+        Returns {'create': [(key, result, subject_marks)], 'errors': [(key, message)]}
+        with unsaved, fully computed Result and SubjectMark instances.
+        """
+        plan = {'create': [], 'errors': []}
+        built = []
+        for key, data in entries:
+            data = dict(data)
+            marks_data = data.pop('subject_marks', None) or []
+            result = Result(
+                teacher=self.teacher, coordinator=self.coordinator, status=self.status, **data
+            )
+            built.append((key, result, marks_data))
+
+        existing = self._existing_results([result for _, result, _ in built])
+        approved_mid_terms = self._approved_mid_terms([result for _, result, _ in built])
+        seen = {}
+        for key, result, marks_data in built:
+            identity = self._identity(result)
+            if identity in existing:
+                plan['errors'].append((key, (
+                    f"A {result.get_exam_type_display()} result for {result.academic_year} "
+                    f"{result.semester} already exists for this student"
+                )))
+                continue
+            if identity in seen:
+                plan['errors'].append((key, f"Duplicate of row {seen[identity]} in this upload"))
+                continue
+            if (self.require_mid_term and result.exam_type == 'final_term'
+                    and result.student_id not in approved_mid_terms):
+                plan['errors'].append((key, "Mid-term result must be approved before creating final-term result"))
+                continue
+
+            subject_marks, errors = self.build_subject_marks(result, marks_data)
+            if errors:
+                plan['errors'].extend((key, error) for error in errors)
+                continue
+            result.apply_totals(subject_marks)
+            seen[identity] = key
+            plan['create'].append((key, result, subject_marks))
+        return plan
+
+    def execute(self, plan):
+        """Insert the planned results and their subject marks; returns the created results"""
+        if not plan['create']:
+            return []
+        with transaction.atomic():
+            results = Result.objects.bulk_create(
+                [result for _, result, _ in plan['create']], batch_size=self.chunk_size,
+            )
+            subject_marks = []
+            for result, (_, _, marks) in zip(results, plan['create']):
+                for subject_mark in marks:
+                    subject_mark.result = result
+                    subject_marks.append(subject_mark)
+            SubjectMark.objects.bulk_create(subject_marks, batch_size=self.chunk_size)
+        return results
+
+    @staticmethod
+    def build_subject_marks(result, marks_data):
+        """Unsaved, evaluated SubjectMarks for the result and a list of validation errors"""
+        subject_marks, errors = [], []
+        subjects = set()
+        for data in marks_data:
+            subject_mark = SubjectMark(result=result, **data)
+            subject_mark.evaluate(result.exam_type)
+            name = subject_mark.get_subject_name_display()
+            if subject_mark.subject_name in subjects:
+                errors.append(f"{name}: entered more than once")
+                continue
+            subjects.add(subject_mark.subject_name)
+            errors.extend(f"{name}: {error}" for error in ResultIngestionService.mark_errors(subject_mark))
+            subject_marks.append(subject_mark)
+        return subject_marks, errors
+
+    @staticmethod
+    def mark_errors(subject_mark):
+        """Validation errors of one evaluated SubjectMark"""
+        errors = []
+        if subject_mark.total_marks is None or subject_mark.total_marks <= 0:
+            errors.append("total marks must be greater than 0")
+        elif not 0 <= (subject_mark.obtained_marks or 0) <= subject_mark.total_marks:
+            errors.append(f"obtained marks must be between 0 and {subject_mark.total_marks:g}")
+        if subject_mark.has_practical and subject_mark.practical_obtained:
+            practical_total = subject_mark.practical_total or 0
+            if not 0 <= subject_mark.practical_obtained <= practical_total:
+                errors.append(f"practical marks must be between 0 and {practical_total:g}")
+        return errors
+
+    @staticmethod
+    def _identity(result):
+        return (result.student_id, result.exam_type, result.academic_year, result.semester)
+
+    def _existing_results(self, results):
+        student_ids = {result.student_id for result in results}
+        if not student_ids:
+            return set()
+        return set(Result.objects.filter(
+            student_id__in=student_ids,
+            exam_type__in={result.exam_type for result in results},
+        ).values_list('student_id', 'exam_type', 'academic_year', 'semester'))
+
+    def _approved_mid_terms(self, results):
+        if not self.require_mid_term:
+            return set()
+        student_ids = {result.student_id for result in results if result.exam_type == 'final_term'}
+        if not student_ids:
+            return set()
+        return set(Result.objects.filter(
+            student_id__in=student_ids, exam_type='mid_term', status='approved',
+        ).values_list('student_id', flat=True))
+
+
+class MarkSheetService:
+    """
+    Turn a class mark sheet into ResultIngestionService entries.
+
+    A sheet has one row per student. The `student` column holds the student's
+    student_id, student_code, GR number or primary key. Marks come either as a
+    `subject_marks` list (JSON rows) or as flat columns per subject: `<subject>`
+    (obtained), `<subject>_total`, `<subject>_practical` and
+    `<subject>_practical_total`. Empty cells and other columns are ignored.
+    """
+
+    # Row key for cells beyond the header (see read_csv)
+    EXTRA_CELLS = '_extra_cells'
+
+    SUBJECT_COLUMNS = {
+        '': 'obtained_marks',
+        '_total': 'total_marks',
+        '_practical': 'practical_obtained',
+        '_practical_total': 'practical_total',
+    }
+
+    @staticmethod
+    def read_csv(text):
+        """
+        [(row number, row dict)] of a CSV sheet; the header is row 1. Empty cells
+        beyond the header (trailing commas) are dropped, others are kept under
+        EXTRA_CELLS so that entries() reports the row.
+        """
+        extra_key = MarkSheetService.EXTRA_CELLS
+        reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')), restkey=extra_key)
+        if not reader.fieldnames or 'student' not in [name.strip().lower() for name in reader.fieldnames]:
+            raise ValueError("The CSV needs a header row with a 'student' column")
+        rows = []
+        for row_num, row in enumerate(reader, start=2):
+            extra = [cell.strip() for cell in row.pop(extra_key, None) or [] if cell.strip()]
+            cells = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+            if extra:
+                cells[extra_key] = extra
+            rows.append((row_num, cells))
+        return rows
+
+    @staticmethod
+    def student_lookup(students):
+        """{identifier: student or None (ambiguous)} for the students of a class"""
+        lookup = {}
+        # A value found in several fields means the first: student_id, student_code, GR number, pk
+        for field in ('student_id', 'student_code', 'gr_no', 'pk'):
+            found = {}
+            for student in students:
+                value = getattr(student, field)
+                if value in (None, ''):
+                    continue
+                value = str(value).strip()
+                found[value] = None if value in found else student
+            for value, student in found.items():
+                lookup.setdefault(value, student)
+        return lookup
+
+    @staticmethod
+    def entries(rows, students, exam_fields):
+        """
+        ([(row number, ingestion data)], [(row number, message)]) for the sheet rows,
+        matched against the class's students.
+        """
+        lookup = MarkSheetService.student_lookup(students)
+        entries, errors = [], []
+        for row_num, row in rows:
+            if row.get(MarkSheetService.EXTRA_CELLS):
+                errors.append((row_num, "The row has more cells than the header"))
+                continue
+            identifier = str(row.get('student') or '').strip()
+            if not identifier:
+                errors.append((row_num, "Missing student"))
+                continue
+            if identifier not in lookup:
+                errors.append((row_num, f"No student '{identifier}' in this class"))
+                continue
+            student = lookup[identifier]
+            if student is None:
+                errors.append((row_num, f"'{identifier}' matches more than one student of this class"))
+                continue
+            try:
+                subject_marks = MarkSheetService.subject_marks(row)
+            except ValueError as e:
+                errors.append((row_num, str(e)))
+                continue
+            if not subject_marks:
+                errors.append((row_num, "No marks entered"))
+                continue
+            entries.append((row_num, dict(exam_fields, student=student, subject_marks=subject_marks)))
+        return entries, errors
+
+    @staticmethod
+    def subject_marks(row):
+        """Subject mark dicts of one row; raises ValueError on an unknown subject or a mark that is not a number"""
+        labels = dict(SubjectMark.SUBJECT_CHOICES)
+        if isinstance(row.get('subject_marks'), list):
+            cells = []
+            for item in row['subject_marks']:
+                subject = item.get('subject_name') if isinstance(item, dict) else None
+                if subject not in labels:
+                    raise ValueError(f"Unknown subject '{subject}'")
+                if any(cell[0] == subject for cell in cells):
+                    raise ValueError(f"{labels[subject]}: entered more than once")
+                cells.extend(
+                    (subject, field, item.get(field)) for field in MarkSheetService.SUBJECT_COLUMNS.values()
+                )
+        else:
+            cells = [
+                (subject, field, row.get(subject + suffix))
+                for subject in labels
+                for suffix, field in MarkSheetService.SUBJECT_COLUMNS.items()
+            ]
+
+        marks = {}
+        for subject, field, value in cells:
+            if value in (None, ''):
+                continue
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{labels[subject]}: '{value}' is not a number")
+            marks.setdefault(subject, {'subject_name': subject})[field] = number
+        # A total or practical mark alone is not a result for the subject
+        return [mark for mark in marks.values() if 'obtained_marks' in mark]
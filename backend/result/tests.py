@@ -0,0 +1,106 @@
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Result
+from .services import ResultIngestionService
+from campus.models import Campus
+from classes.models import ClassRoom, Grade, Level
+from coordinator.models import Coordinator
+from students.models import Student
+from teachers.models import Teacher
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ClassResultUploadTests(TestCase):
+    """Problems with a class mark sheet come back as a per-row report, never a 500"""
+
+    def setUp(self):
+        cache.clear()
+        campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        level = Level.objects.create(name='Primary', shift='morning', campus=campus)
+        grade = Grade.objects.create(name='Grade-1', level=level)
+        self.classroom = ClassRoom.objects.create(grade=grade, section='A', shift='morning')
+        self.user = User.objects.create(username='C01-M-25-T-0001', email='teacher@example.com', role='teacher')
+        self.teacher = Teacher.objects.bulk_create([Teacher(
+            full_name='Teacher', dob=date(1990, 1, 1), gender='female', contact_number='03000000000',
+            email='teacher@example.com', cnic='42101-0000001', employee_code='C01-M-25-T-0001',
+            current_campus=campus, assigned_classroom=self.classroom, is_class_teacher=True,
+        )])[0]
+        self.coordinator = Coordinator.objects.bulk_create([Coordinator(
+            full_name='Coordinator', dob=date(1985, 1, 1), gender='male', contact_number='03000000000',
+            email='coordinator@example.com', cnic='42101-0000002', permanent_address='Karachi',
+            education_level='Masters', institution_name='University', year_of_passing=2008,
+            total_experience_years=10, campus=campus, level=level, joining_date=date(2020, 1, 1),
+        )])[0]
+        self.teacher.assigned_coordinators.add(self.coordinator)
+        self.students = [
+            Student.objects.create(
+                name=f'Student {number}', classroom=self.classroom, campus=campus, current_grade='Grade-1',
+                section='A', shift='morning', enrollment_year=2025, gender='female', is_draft=False,
+            )
+            for number in range(2)
+        ]
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+
+    def upload(self):
+        return self.client.post('/api/result/bulk-upload/', {
+            'classroom': self.classroom.id,
+            'exam_type': 'mid_term',
+            'rows': [
+                {'student': student.student_id, 'english': 60, 'english_total': 100} for student in self.students
+            ],
+        }, content_type='application/json')
+
+    def upload_csv(self, text):
+        return self.client.post('/api/result/bulk-upload/', {
+            'classroom': self.classroom.id,
+            'exam_type': 'mid_term',
+            'file': SimpleUploadedFile('marks.csv', text.encode(), content_type='text/csv'),
+        })
+
+    def test_upload_creates_results(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Result.objects.count(), 2)
+
+    def test_results_saved_meanwhile_are_reported_per_row(self):
+        execute = ResultIngestionService.execute
+
+        def execute_after_other_upload(service, plan):
+            # Another upload saves the second student's result between plan() and execute()
+            Result.objects.create(
+                student=self.students[1], teacher=self.teacher, coordinator=self.coordinator, exam_type='mid_term',
+            )
+            return execute(service, plan)
+
+        with mock.patch.object(ResultIngestionService, 'execute', autospec=True, side_effect=execute_after_other_upload):
+            response = self.upload()
+        self.assertEqual(response.status_code, 400, response.content)
+        report = response.json()['errors']
+        self.assertEqual([(row['row'], row['student']) for row in report], [(2, self.students[1].student_id)])
+        self.assertIn('already exists', report[0]['errors'][0])
+        # Only the other upload's result exists
+        self.assertEqual(Result.objects.count(), 1)
+
+    def test_csv_cells_beyond_the_header(self):
+        first, second = (student.student_id for student in self.students)
+        # Excel exports often end every row with a comma
+        response = self.upload_csv(f"student,english,english_total\n{first},60,100,\n{second},70,100,70\n")
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(
+            response.json()['errors'],
+            [{'row': 3, 'student': second, 'errors': ['The row has more cells than the header']}],
+        )
+
+        response = self.upload_csv(f"student,english,english_total,\n{first},60,100,\n{second},70,100,,\n")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Result.objects.count(), 2)
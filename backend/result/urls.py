@@ -6,7 +6,8 @@ from .views import (
     CoordinatorResultListView,
     CheckMidTermView,
     ResultSubmitView,
-    ResultApprovalView
+    ResultApprovalView,
+    ClassResultUploadView
 )
 
 router = DefaultRouter()
@@ -17,6 +18,7 @@ urlpatterns = [
     path('my-results/', TeacherResultListView.as_view(), name='teacher-my-results'),
     path('coordinator/pending/', CoordinatorResultListView.as_view(), name='coordinator-pending-results'),
     path('coordinator/results/', CoordinatorResultListView.as_view(), name='coordinator-results'),
+    path('bulk-upload/', ClassResultUploadView.as_view(), name='class-result-upload'),
     path('check-midterm/<int:student_id>/', CheckMidTermView.as_view(), name='check-midterm'),
     path('<int:pk>/submit/', ResultSubmitView.as_view(), name='result-submit'),
     path('<int:pk>/approve/', ResultApprovalView.as_view(), name='result-approve'),
@@ -3,23 +3,35 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
 from django.db.models import Q
 from .models import Result, SubjectMark
 from .serializers import (
     ResultSerializer, ResultCreateSerializer, ResultUpdateSerializer,
-    ResultSubmitSerializer, ResultApprovalSerializer
+    ResultSubmitSerializer, ResultApprovalSerializer, ClassResultUploadSerializer
 )
+from .services import MarkSheetService, ResultIngestionService
 from users.permissions import IsTeacher, IsCoordinator
 from teachers.models import Teacher
 from coordinator.models import Coordinator
 from students.models import Student
+from users.role_profile import RoleProfileResolver
+from users.scopes import ClassroomScope
+from utils.pagination import KeysetOrPageNumberPagination
+import csv
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ResultViewSet(viewsets.ModelViewSet):
     queryset = Result.objects.all()
     serializer_class = ResultSerializer
     permission_classes = [IsAuthenticated]
+    # ?cursor= switches to (created_at, id) keyset pages without a count query
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -111,7 +123,8 @@ class CheckMidTermView(generics.RetrieveAPIView):
 
     def get(self, request, student_id):
         try:
-            student = Student.objects.get(id=student_id)
+            # Teachers may only check students of their own classrooms
+            student = ClassroomScope.filter_queryset(Student.objects.all(), request.user).get(id=student_id)
             mid_term_exists = Result.objects.filter(
                 student=student,
                 exam_type='mid_term',
@@ -156,6 +169,121 @@ class ResultApprovalView(generics.UpdateAPIView):
             coordinator=coordinator
         )
 
+class ClassResultUploadView(generics.GenericAPIView):
+    """
+    Create the results of a whole class from one mark sheet (JSON rows or a CSV file).
+    Nothing is saved unless every row is valid; errors are reported per row.
+    dry_run=true only validates and returns the computed results.
+    """
+    serializer_class = ClassResultUploadSerializer
+    permission_classes = [IsAuthenticated, IsTeacher]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        classroom = data['classroom']
+
+        if not ClassroomScope.can_access(request.user, classroom.id):
+            return Response(
+                {'error': 'You can only upload results for your own classes'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            teacher = RoleProfileResolver.for_user(request.user).get_instance(Teacher)
+        except Teacher.DoesNotExist:
+            return Response({'error': 'Teacher profile not found'}, status=status.HTTP_400_BAD_REQUEST)
+        coordinator = teacher.assigned_coordinators.first()
+        if coordinator is None:
+            return Response({'error': 'No coordinator assigned to this teacher'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if data.get('file'):
+            try:
+                rows = MarkSheetService.read_csv(data['file'].read().decode('utf-8-sig'))
+            except (UnicodeDecodeError, ValueError, csv.Error) as e:
+                return Response({'error': f'Could not read the CSV file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(rows) > ClassResultUploadSerializer.MAX_ROWS:
+                return Response(
+                    {'error': f'A sheet can have at most {ClassResultUploadSerializer.MAX_ROWS} rows'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            rows = list(enumerate(data['rows'], start=1))
+
+        students = list(
+            Student.objects.filter(classroom=classroom).only('id', 'name', 'student_id', 'student_code', 'gr_no')
+        )
+        exam_fields = {
+            'exam_type': data['exam_type'],
+            'academic_year': data['academic_year'],
+            'semester': data['semester'],
+        }
+        entries, errors = MarkSheetService.entries(rows, students, exam_fields)
+        service = ResultIngestionService(teacher, coordinator)
+        plan = service.plan(entries)
+        errors += plan['errors']
+
+        if errors:
+            return self._error_response(rows, errors, plan)
+
+        if data['dry_run']:
+            return Response({
+                'message': f'{len(plan["create"])} result(s) are valid',
+                'results': [self._summary(row, result) for row, result, _ in plan['create']],
+            })
+
+        try:
+            results = service.execute(plan)
+        except IntegrityError:
+            # Another upload saved results for some of these students after plan() ran
+            plan = service.plan(entries)
+            if not plan['errors']:
+                raise
+            return self._error_response(rows, plan['errors'], plan)
+        logger.info(
+            "Teacher %s uploaded %d %s results for classroom %s",
+            teacher.id, len(results), data['exam_type'], classroom.id,
+        )
+        return Response({
+            'message': f'{len(results)} result(s) created',
+            'results': [
+                self._summary(row, result) for (row, _, _), result in zip(plan['create'], results)
+            ],
+        }, status=status.HTTP_201_CREATED)
+
+    def _error_response(self, rows, errors, plan):
+        return Response({
+            'error': f'{len({row for row, _ in errors})} row(s) have errors; nothing was saved',
+            'errors': self._error_report(rows, errors),
+            'valid_rows': len(plan['create']),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def _error_report(rows, errors):
+        """[{'row', 'student', 'errors'}] in sheet order"""
+        identifiers = {row_num: row.get('student') for row_num, row in rows}
+        report = {}
+        for row_num, message in errors:
+            report.setdefault(row_num, {
+                'row': row_num, 'student': identifiers.get(row_num), 'errors': [],
+            })['errors'].append(message)
+        return [report[row_num] for row_num in sorted(report)]
+
+    @staticmethod
+    def _summary(row, result):
+        return {
+            'row': row,
+            'id': result.id,
+            'student': result.student_id,
+            'student_name': result.student.name,
+            'total_marks': result.total_marks,
+            'obtained_marks': result.obtained_marks,
+            'percentage': round(result.percentage, 2),
+            'grade': result.grade,
+            'result_status': result.result_status,
+        }
+
 class CoordinatorResultListView(generics.ListAPIView):
     """Get all results assigned to coordinator for review"""
     serializer_class = ResultSerializer
@@ -167,43 +295,16 @@ class CoordinatorResultListView(generics.ListAPIView):
     pagination_class = None  # Disable pagination to return direct array
 
     def get_queryset(self):
-        print(f"🔍 Request user: {self.request.user}")
-        print(f"🔍 User email: {self.request.user.email}")
-        print(f"🔍 User is coordinator: {self.request.user.is_coordinator()}")
-        print(f"🔍 User is authenticated: {self.request.user.is_authenticated}")
-        
         try:
             coordinator = get_object_or_404(Coordinator, email=self.request.user.email)
-            print(f"🔍 Coordinator found: {coordinator.email}")
-            print(f"🔍 Coordinator name: {coordinator.full_name}")
-        except Exception as e:
-            print(f"❌ Error finding coordinator: {e}")
-            print(f"❌ Available coordinators:")
-            for c in Coordinator.objects.all():
-                print(f"    - {c.email} ({c.full_name})")
+        except Exception:
+            logger.warning("No coordinator profile for user %s", self.request.user.pk)
             return Result.objects.none()
         
-        # Check total results in database
-        total_results = Result.objects.count()
-        print(f"🔍 Total results in database: {total_results}")
-        
-        # Check results with coordinators
-        results_with_coordinators = Result.objects.filter(coordinator__isnull=False).count()
-        print(f"🔍 Results with coordinators: {results_with_coordinators}")
-        
-        # First check all results assigned to this coordinator
-        all_results = Result.objects.filter(coordinator=coordinator).select_related('student', 'teacher', 'coordinator').prefetch_related('subject_marks')
-        print(f"🔍 All results for coordinator: {all_results.count()}")
-        
-        # Check results by status
-        for status in ['draft', 'submitted', 'pending', 'under_review', 'approved', 'rejected']:
-            count = all_results.filter(status=status).count()
-            print(f"🔍 Results with status '{status}': {count}")
-        
-        # Return ALL results for this coordinator (no status filter)
-        print(f"🔍 Returning all results for coordinator: {all_results.count()}")
-        
-        return all_results
+        # All results assigned to this coordinator, whatever their status
+        return Result.objects.filter(coordinator=coordinator).select_related(
+            'student', 'teacher', 'coordinator'
+        ).prefetch_related('subject_marks')
 
     @action(detail=False, methods=['get'])
     def pending(self, request):
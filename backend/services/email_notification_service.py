@@ -1,9 +1,15 @@
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from .email_outbox import EmailOutbox
+from .models import OutboxEmail
+
 class EmailNotificationService:
+    """
+    Builds notification e-mails and puts them in the outbox (services/email_outbox.py);
+    they are sent in the background, so callers never wait on SMTP.
+    """
     DEFAULT_PASSWORD = '12345'
     
     @staticmethod
@@ -31,17 +37,13 @@ Best regards,
 School Administration
         """
         
+        if not user.email:
+            return False, "User has no email address"
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-            return True, "Email sent successfully"
+            EmailOutbox.enqueue(subject, message, [user.email], category='credentials')
+            return True, "Email queued for delivery"
         except Exception as e:
-            return False, f"Failed to send email: {str(e)}"
+            return False, f"Failed to queue email: {str(e)}"
     
     @staticmethod
     def send_password_change_otp_email(user, otp_code):
@@ -127,15 +129,14 @@ Best regards,
 School Administration
         """
         
+        if not user.email:
+            return False, "User has no email address"
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-                html_message=html_message,
+            # The code expires in minutes, so it goes ahead of any queued bulk mail
+            EmailOutbox.enqueue(
+                subject, message, [user.email], html_body=html_message,
+                category='otp', priority=OutboxEmail.PRIORITY_HIGH,
             )
-            return True, "OTP email sent successfully"
+            return True, "OTP email queued for delivery"
         except Exception as e:
-            return False, f"Failed to send OTP email: {str(e)}"
+            return False, f"Failed to queue OTP email: {str(e)}"
@@ -0,0 +1,201 @@
+"""
+Outbox for outgoing e-mail.
+
+EmailOutbox.enqueue() stores an OutboxEmail row and returns, so a request never
+waits on the SMTP handshake. deliver_due() sends the rows that are due:
+
+- A batch is claimed first: the rows become 'sending' for
+  EMAIL_OUTBOX_LEASE_SECONDS, so two workers never send the same message. If a
+  worker dies mid-batch, its claim expires and the rows are picked up again.
+- The whole batch goes out over one SMTP connection.
+- A failed message is retried after EMAIL_OUTBOX_RETRY_SECONDS * 2^(attempts - 1),
+  up to EMAIL_OUTBOX_MAX_ATTEMPTS tries. A refused recipient fails immediately.
+
+EMAIL_OUTBOX_WORKER picks who calls deliver_due():
+- 'thread' (default): a background thread of the web process, woken when the
+  enqueuing transaction commits.
+- 'command': `manage.py send_queued_email --loop`.
+"""
+import logging
+import smtplib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, connections, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+logger = logging.getLogger(__name__)
+
+# Rows a worker may pick up: pending ones once due, sending ones once their claim expired
+_CLAIMABLE = [OutboxEmail.STATUS_PENDING, OutboxEmail.STATUS_SENDING]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class EmailOutbox:
+    @staticmethod
+    def enqueue(subject, body, to, html_body='', from_email=None, category='',
+                priority=OutboxEmail.PRIORITY_NORMAL):
+        """Store a message for delivery and return the OutboxEmail"""
+        email = OutboxEmail.objects.create(
+            subject=subject,
+            body=body,
+            html_body=html_body or '',
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(to),
+            category=category,
+            priority=priority,
+            next_attempt_at=timezone.now(),
+        )
+        if _setting('EMAIL_OUTBOX_WORKER', 'thread') == 'thread':
+            transaction.on_commit(OutboxWorker.wake)
+        return email
+
+    @staticmethod
+    def deliver_due(batch_size=None):
+        """Send every due message, one batch (and SMTP connection) at a time; returns (sent, failed)"""
+        batch_size = batch_size or _setting('EMAIL_OUTBOX_BATCH_SIZE', 50)
+        sent = failed = 0
+        while True:
+            batch = EmailOutbox.claim(batch_size)
+            if not batch:
+                return sent, failed
+            batch_sent, batch_failed = EmailOutbox.send_batch(batch)
+            sent += batch_sent
+            failed += batch_failed
+
+    @staticmethod
+    def claim(batch_size):
+        """Mark up to batch_size due messages as 'sending' for this worker and return them"""
+        now = timezone.now()
+        lease_until = now + timedelta(seconds=_setting('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+        with transaction.atomic():
+            due = OutboxEmail.objects.filter(
+                status__in=_CLAIMABLE, next_attempt_at__lte=now,
+            ).order_by('priority', 'next_attempt_at', 'id')
+            if db_connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(due.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return []
+            OutboxEmail.objects.filter(id__in=ids).update(
+                status=OutboxEmail.STATUS_SENDING,
+                next_attempt_at=lease_until,
+                attempts=F('attempts') + 1,
+            )
+        return list(OutboxEmail.objects.filter(id__in=ids).order_by('priority', 'next_attempt_at', 'id'))
+
+    @staticmethod
+    def send_batch(emails):
+        """Send claimed messages over one connection; returns (sent, failed)"""
+        connection = get_connection(fail_silently=False)
+        sent = failed = 0
+        needs_open = True
+        try:
+            for index, email in enumerate(emails):
+                if needs_open:
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        # The server is unreachable: retry the rest of the batch later
+                        for pending in emails[index:]:
+                            EmailOutbox._schedule_retry(pending, e)
+                        return sent, failed + len(emails) - index
+                    needs_open = False
+
+                message = EmailMultiAlternatives(
+                    email.subject, email.body, email.from_email, email.to, connection=connection,
+                )
+                if email.html_body:
+                    message.attach_alternative(email.html_body, 'text/html')
+                try:
+                    message.send()
+                except Exception as e:
+                    EmailOutbox._schedule_retry(email, e)
+                    failed += 1
+                    # The connection may be broken now; open a fresh one for the next message
+                    connection.close()
+                    needs_open = True
+                else:
+                    OutboxEmail.objects.filter(id=email.id).update(
+                        status=OutboxEmail.STATUS_SENT, sent_at=timezone.now(), last_error='',
+                    )
+                    sent += 1
+        finally:
+            connection.close()
+        logger.info("Outbox batch: %d sent, %d failed", sent, failed)
+        return sent, failed
+
+    @staticmethod
+    def _schedule_retry(email, error):
+        max_attempts = _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        if email.attempts >= max_attempts or isinstance(error, smtplib.SMTPRecipientsRefused):
+            OutboxEmail.objects.filter(id=email.id).update(
+                status=OutboxEmail.STATUS_FAILED, last_error=str(error),
+            )
+            logger.error("Outbox email %s failed after %d attempt(s): %s", email.id, email.attempts, error)
+            return
+        delay = _setting('EMAIL_OUTBOX_RETRY_SECONDS', 30) * 2 ** max(email.attempts - 1, 0)
+        OutboxEmail.objects.filter(id=email.id).update(
+            status=OutboxEmail.STATUS_PENDING,
+            next_attempt_at=timezone.now() + timedelta(seconds=delay),
+            last_error=str(error),
+        )
+        logger.warning("Outbox email %s attempt %d failed, retrying in %ss: %s", email.id, email.attempts, delay, error)
+
+    @staticmethod
+    def requeue_failed():
+        """Make failed messages due again with a fresh set of attempts; returns how many"""
+        return OutboxEmail.objects.filter(status=OutboxEmail.STATUS_FAILED).update(
+            status=OutboxEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+
+    @staticmethod
+    def seconds_until_next():
+        """Seconds until the next message is due (0 if one is due now), or None if the outbox is empty"""
+        next_at = OutboxEmail.objects.filter(status__in=_CLAIMABLE).aggregate(
+            next_at=Min('next_attempt_at'),
+        )['next_at']
+        if next_at is None:
+            return None
+        return max((next_at - timezone.now()).total_seconds(), 0)
+
+
+class OutboxWorker:
+    """One background thread per process that drains the outbox whenever it is woken"""
+
+    _thread = None
+    _wakeup = threading.Event()
+    _lock = threading.Lock()
+
+    @classmethod
+    def wake(cls):
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._run, name='email-outbox', daemon=True)
+                cls._thread.start()
+        cls._wakeup.set()
+
+    @classmethod
+    def _run(cls):
+        timeout = None
+        while True:
+            cls._wakeup.wait(timeout)
+            cls._wakeup.clear()
+            try:
+                EmailOutbox.deliver_due()
+                # Sleep until a retry is due instead of waiting for the next enqueue
+                timeout = EmailOutbox.seconds_until_next()
+            except Exception:
+                logger.exception("Outbox worker failed to deliver email")
+                timeout = _setting('EMAIL_OUTBOX_RETRY_SECONDS', 30)
+            finally:
+                connections.close_all()
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from services.email_outbox import EmailOutbox
+from services.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the due messages of the e-mail outbox in batches over one SMTP connection. "
+        "Use --loop to keep consuming (EMAIL_OUTBOX_WORKER='command' deployments)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when the outbox is empty")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop (default: 5)")
+        parser.add_argument(
+            "--batch-size", type=int, default=None,
+            help="Messages per SMTP connection (default: EMAIL_OUTBOX_BATCH_SIZE, 50)",
+        )
+        parser.add_argument(
+            "--requeue-failed", action="store_true",
+            help="Give messages that ran out of attempts a fresh set of retries first",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_failed"]:
+            requeued = EmailOutbox.requeue_failed()
+            self.stdout.write(f"Requeued {requeued} failed message(s).")
+
+        while True:
+            sent, failed = EmailOutbox.deliver_due(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+            if not options["loop"]:
+                break
+            connections.close_all()
+            time.sleep(options["interval"])
+
+        pending = OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).count()
+        self.stdout.write(self.style.SUCCESS(f"Done. {pending} message(s) waiting for a retry."))
@@ -21,3 +21,55 @@ class GlobalCounter(models.Model):
 from django.db import models
 
 # Create your models here.
+
+
+class OutboxEmail(models.Model):
+    """
+    An e-mail waiting in the outbox (see services/email_outbox.py).
+    Requests only insert a row; a worker sends due rows in batches over one
+    SMTP connection and retries failures with backoff.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    # Lower goes first, so an OTP is not stuck behind a bulk import's credential emails
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 5
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    category = models.CharField(max_length=50, blank=True, default='')
+    priority = models.PositiveSmallIntegerField(default=PRIORITY_NORMAL)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When a pending row is due, or when a worker's claim on a sending row expires
+    next_attempt_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(
+                fields=['priority', 'next_attempt_at'],
+                name='outbox_due_idx',
+                condition=models.Q(status__in=['pending', 'sending']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
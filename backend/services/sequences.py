@@ -0,0 +1,124 @@
+"""
+Number sequences for generated IDs (student numbers, employee numbers, super admin codes).
+
+Every sequence has a key ('student', 'employee:<campus id>', ...). Workers reserve
+numbers in blocks and hand them out from memory, so most allocations touch no
+database row at all. A number is never handed out twice. Numbers are unique and
+increase within a worker, but they are not ordered across workers, and the unused
+rest of a block is skipped when a worker exits. ID_SEQUENCE_BLOCK_SIZE=1 gives
+gap-free numbering.
+
+Backends:
+- PostgreSQL: one native sequence per key (sis_seq_<key>). nextval() never waits on
+  another transaction and is not rolled back with it.
+- Others: a GlobalCounter row per key. A block taken inside a transaction is
+  only cached once that transaction commits, so a rollback cannot hand the same
+  numbers out twice.
+
+A sequence that does not exist yet starts after `seed()`, the highest number that
+is already in use (e.g. scanned from existing codes); this runs once per key.
+"""
+import re
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import GlobalCounter
+
+
+class SequenceService:
+    _blocks = {}
+    _lock = threading.Lock()
+    # Keys whose PostgreSQL sequence is known to exist
+    _ready = set()
+
+    @classmethod
+    def next(cls, key, seed=None, block_size=None):
+        """Next number of the sequence"""
+        with cls._lock:
+            cached = cls._blocks.get(key)
+            if cached:
+                return cached.popleft()
+        if block_size is None:
+            block_size = getattr(settings, 'ID_SEQUENCE_BLOCK_SIZE', 20)
+        numbers = cls._allocate(key, max(block_size, 1), seed)
+        if len(numbers) > 1:
+            cls._stash(key, numbers[1:])
+        return numbers[0]
+
+    @classmethod
+    def reserve(cls, key, count, seed=None):
+        """`count` unused numbers in ascending order (bulk creation), taken in one database round trip"""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        return cls._allocate(key, count, seed)
+
+    @classmethod
+    def reset_cache(cls):
+        """Forget cached blocks (their numbers are skipped)"""
+        with cls._lock:
+            cls._blocks.clear()
+            cls._ready.clear()
+
+    @classmethod
+    def _stash(cls, key, numbers):
+        def stash():
+            with cls._lock:
+                cls._blocks.setdefault(key, deque()).extend(numbers)
+
+        if connection.vendor == 'postgresql':
+            stash()
+        else:
+            # A rollback would return the counter row's numbers
+            transaction.on_commit(stash)
+
+    @classmethod
+    def _allocate(cls, key, count, seed):
+        if connection.vendor == 'postgresql':
+            return cls._allocate_postgres(key, count, seed)
+        return cls._allocate_counter(key, count, seed)
+
+    @classmethod
+    def _allocate_counter(cls, key, count, seed):
+        counters = GlobalCounter.objects.filter(key=key)
+        with transaction.atomic():
+            # The UPDATE locks the row until commit, so the value read back is ours
+            if not counters.update(value=F('value') + count):
+                GlobalCounter.objects.get_or_create(key=key, defaults={'value': seed() if seed else 0})
+                counters.update(value=F('value') + count)
+            last = counters.values_list('value', flat=True).get()
+        return list(range(last - count + 1, last + 1))
+
+    @classmethod
+    def _allocate_postgres(cls, key, count, seed):
+        name = cls._sequence_name(key)
+        if key not in cls._ready:
+            cls._create_sequence(key, name, seed)
+            # Not before commit: a rolled back CREATE SEQUENCE leaves nothing behind
+            transaction.on_commit(lambda: cls._ready.add(key))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [name, count])
+            return sorted(row[0] for row in cursor.fetchall())
+
+    @classmethod
+    def _create_sequence(cls, key, name, seed):
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Serialises the first use of a key across workers; held until commit
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute(f"CREATE SEQUENCE {connection.ops.quote_name(name)}")
+            # Continue where the counter table (or the existing data) left off
+            start = GlobalCounter.objects.filter(key=key).values_list('value', flat=True).first()
+            if start is None and seed:
+                start = seed()
+            if start:
+                cursor.execute("SELECT setval(%s, %s)", [name, start])
+
+    @staticmethod
+    def _sequence_name(key):
+        return 'sis_seq_' + re.sub(r'[^a-z0-9_]', '_', key.lower())
@@ -1,3 +1,293 @@
-from django.test import TestCase
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+
+from .email_outbox import EmailOutbox
+from .models import GlobalCounter, OutboxEmail
+from .sequences import SequenceService
+from campus.models import Campus
+from students.models import Student
+
+
+class BouncingEmailBackend(locmem.EmailBackend):
+    """locmem backend that fails messages to 'bounce' addresses and refuses 'refused' ones"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            for address in message.to:
+                if address.startswith('refused'):
+                    raise smtplib.SMTPRecipientsRefused({address: (550, b'No such user')})
+                if address.startswith('bounce'):
+                    raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+OUTBOX_SETTINGS = {
+    'EMAIL_BACKEND': 'services.tests.BouncingEmailBackend',
+    'EMAIL_OUTBOX_WORKER': 'command',
+    'EMAIL_OUTBOX_RETRY_SECONDS': 30,
+    'EMAIL_OUTBOX_MAX_ATTEMPTS': 3,
+    'EMAIL_OUTBOX_LEASE_SECONDS': 300,
+}
+
+
+def enqueue(to, subject='Subject', **kwargs):
+    return EmailOutbox.enqueue(subject, 'Body', [to], **kwargs)
+
+
+@override_settings(**OUTBOX_SETTINGS)
+class EmailOutboxTests(TestCase):
+    def test_enqueue_claim_and_send(self):
+        normal = enqueue('parent@example.com', 'Credentials')
+        urgent = enqueue('teacher@example.com', 'OTP', priority=OutboxEmail.PRIORITY_HIGH)
+        self.assertEqual(len(mail.outbox), 0)
+
+        claimed = EmailOutbox.claim(10)
+        self.assertEqual([email.id for email in claimed], [urgent.id, normal.id])
+        self.assertTrue(all(email.status == OutboxEmail.STATUS_SENDING and email.attempts == 1 for email in claimed))
+
+        self.assertEqual(EmailOutbox.send_batch(claimed), (2, 0))
+        self.assertEqual([message.subject for message in mail.outbox], ['OTP', 'Credentials'])
+        self.assertEqual(
+            set(OutboxEmail.objects.values_list('status', flat=True)), {OutboxEmail.STATUS_SENT}
+        )
+        self.assertEqual(EmailOutbox.deliver_due(), (0, 0))
+
+    def test_failed_send_is_retried_with_backoff(self):
+        bounce = enqueue('bounce@example.com')
+        enqueue('parent@example.com')
+
+        started = timezone.now()
+        self.assertEqual(EmailOutbox.deliver_due(), (1, 1))
+        # The message after the failure still went out, over a fresh connection
+        self.assertEqual([message.to for message in mail.outbox], [['parent@example.com']])
+
+        bounce.refresh_from_db()
+        self.assertEqual(bounce.status, OutboxEmail.STATUS_PENDING)
+        self.assertEqual(bounce.attempts, 1)
+        self.assertIn('Connection unexpectedly closed', bounce.last_error)
+        self.assertAlmostEqual((bounce.next_attempt_at - started).total_seconds(), 30, delta=5)
+        # Not due yet
+        self.assertEqual(EmailOutbox.deliver_due(), (0, 0))
+
+        OutboxEmail.objects.filter(id=bounce.id).update(next_attempt_at=timezone.now())
+        started = timezone.now()
+        EmailOutbox.deliver_due()
+        bounce.refresh_from_db()
+        self.assertEqual(bounce.attempts, 2)
+        self.assertAlmostEqual((bounce.next_attempt_at - started).total_seconds(), 60, delta=5)
+
+        OutboxEmail.objects.filter(id=bounce.id).update(next_attempt_at=timezone.now())
+        EmailOutbox.deliver_due()
+        bounce.refresh_from_db()
+        self.assertEqual(bounce.status, OutboxEmail.STATUS_FAILED)
+
+    def test_refused_recipient_fails_at_once(self):
+        refused = enqueue('refused@example.com')
+        self.assertEqual(EmailOutbox.deliver_due(), (0, 1))
+        refused.refresh_from_db()
+        self.assertEqual((refused.status, refused.attempts), (OutboxEmail.STATUS_FAILED, 1))
+
+    def test_second_claim_skips_claimed_rows(self):
+        emails = [enqueue(f'parent{number}@example.com') for number in range(3)]
+
+        first = EmailOutbox.claim(2)
+        second = EmailOutbox.claim(10)
+        self.assertEqual([email.id for email in first], [emails[0].id, emails[1].id])
+        self.assertEqual([email.id for email in second], [emails[2].id])
+        self.assertEqual(EmailOutbox.claim(10), [])
+
+        # A worker that died mid-batch loses its claim once the lease runs out
+        OutboxEmail.objects.filter(id=emails[0].id).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([email.id for email in EmailOutbox.claim(10)], [emails[0].id])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SKIP LOCKED needs PostgreSQL')
+@override_settings(**OUTBOX_SETTINGS)
+class EmailOutboxConcurrentClaimTests(TransactionTestCase):
+    def test_claim_skips_rows_locked_by_another_worker(self):
+        emails = [enqueue(f'parent{number}@example.com') for number in range(4)]
+        locked, release = threading.Event(), threading.Event()
+
+        def other_worker():
+            try:
+                with transaction.atomic():
+                    # Another worker in the middle of claiming the first two rows
+                    list(OutboxEmail.objects.select_for_update().filter(id__in=[emails[0].id, emails[1].id]))
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            claimed = EmailOutbox.claim(10)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual({email.id for email in claimed}, {emails[2].id, emails[3].id})
+
+
+
+class ConcurrentAllocationMixin:
+    """Runs `work(index)` from many threads started together, watching PostgreSQL for lock waits meanwhile"""
+
+    THREADS = 8
+    PER_THREAD = 25
+
+    def run_concurrently(self, work):
+        results, errors = [], []
+        lock = threading.Lock()
+        start_gate = threading.Barrier(self.THREADS)
+
+        def run(thread_index):
+            try:
+                start_gate.wait()
+                for i in range(self.PER_THREAD):
+                    try:
+                        value = work(thread_index * self.PER_THREAD + i)
+                    except Exception as e:
+                        with lock:
+                            errors.append(repr(e))
+                        continue
+                    with lock:
+                        results.append(value)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=run, args=(index,)) for index in range(self.THREADS)]
+        for worker in workers:
+            worker.start()
+        lock_waits = 0
+        while any(worker.is_alive() for worker in workers):
+            lock_waits = max(lock_waits, self.lock_waits())
+            time.sleep(0.001)
+        for worker in workers:
+            worker.join()
+        return results, errors, lock_waits
+
+    @staticmethod
+    def lock_waits():
+        if connection.vendor != 'postgresql':
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_locks WHERE NOT granted AND pid <> pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def assertUniqueWithoutLockWaits(self, results, errors, lock_waits):
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), self.THREADS * self.PER_THREAD)
+        self.assertEqual(len(set(results)), len(results))
+        self.assertEqual(lock_waits, 0)
+
+
+class SequenceServiceTests(TestCase):
+    def tearDown(self):
+        SequenceService.reset_cache()
+
+    def test_numbers_continue_after_seed(self):
+        seed = lambda: 41
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(SequenceService.next('sequence-test', seed=seed, block_size=5), 42)
+        # The rest of the block is served from memory, reservations start after it
+        self.assertEqual(SequenceService.reserve('sequence-test', 3, seed=seed), [47, 48, 49])
+        with self.assertNumQueries(0):
+            self.assertEqual(SequenceService.next('sequence-test', seed=seed), 43)
+
+    def test_reserve_needs_a_count(self):
+        with self.assertRaises(ValueError):
+            SequenceService.reserve('sequence-test', 0)
+
+
+# Needs a test database that several threads can write to (not SQLite)
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class SequenceServiceConcurrencyTests(ConcurrentAllocationMixin, TransactionTestCase):
+    """Concurrent workers never get the same number, and on PostgreSQL never wait on each other"""
+
+    def setUp(self):
+        self.campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        # The first use of a key creates its sequence, once, under a lock
+        SequenceService.next('sequence-test')
+        SequenceService.next('student')
+
+    def tearDown(self):
+        SequenceService.reset_cache()
+        drop_sequences('sequence-test', 'student')
+
+    def test_concurrent_allocations_are_unique(self):
+        self.assertUniqueWithoutLockWaits(*self.run_concurrently(lambda index: SequenceService.next('sequence-test')))
+
+    def test_concurrent_students_get_unique_numbers(self):
+        def create_student(index):
+            student = Student(
+                name=f'Student {index}', campus=self.campus, shift='morning', enrollment_year=2025, is_draft=False,
+            )
+            student.save()
+            return student.student_id
+
+        results, errors, lock_waits = self.run_concurrently(create_student)
+        self.assertUniqueWithoutLockWaits(results, errors, lock_waits)
+        self.assertNotIn(None, results)
+        self.assertEqual(Student.objects.values('gr_no').distinct().count(), len(results))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Native sequences need PostgreSQL')
+class PostgresSequenceTests(TransactionTestCase):
+    def tearDown(self):
+        SequenceService.reset_cache()
+        drop_sequences('pg-counter', 'pg-seed')
+
+    def sequence_exists(self, key):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [SequenceService._sequence_name(key)])
+            return cursor.fetchone()[0]
+
+    def test_sequence_continues_from_counter_row(self):
+        GlobalCounter.objects.create(key='pg-counter', value=100)
+        self.assertEqual(SequenceService.next('pg-counter', block_size=1), 101)
+        self.assertTrue(self.sequence_exists('pg-counter'))
+        self.assertIn('pg-counter', SequenceService._ready)
+        self.assertEqual(SequenceService.reserve('pg-counter', 3), [102, 103, 104])
+        # The counter row is only read, once
+        self.assertEqual(GlobalCounter.objects.get(key='pg-counter').value, 100)
+
+    def test_sequence_is_created_once_from_seed(self):
+        calls = []
+
+        def seed():
+            calls.append(1)
+            return 500
+
+        name = SequenceService._sequence_name('pg-seed')
+        SequenceService._create_sequence('pg-seed', name, seed)
+        SequenceService._create_sequence('pg-seed', name, seed)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(SequenceService._allocate_postgres('pg-seed', 2, seed), [501, 502])
+
+    def test_numbers_survive_a_rollback(self):
+        SequenceService.next('pg-seed', block_size=1)
+        try:
+            with transaction.atomic():
+                taken = SequenceService.next('pg-seed', block_size=1)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertGreater(SequenceService.next('pg-seed', block_size=1), taken)
+
+
+def drop_sequences(*keys):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for key in keys:
+            cursor.execute(f"DROP SEQUENCE IF EXISTS {connection.ops.quote_name(SequenceService._sequence_name(key))}")
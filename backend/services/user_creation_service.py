@@ -5,6 +5,9 @@ from teachers.models import Teacher
 from coordinator.models import Coordinator
 from principals.models import Principal
 from utils.id_generator import IDGenerator
+import logging
+
+logger = logging.getLogger(__name__)
 
 class UserCreationService:
     DEFAULT_PASSWORD = '12345'
@@ -120,9 +123,9 @@ class UserCreationService:
                     user, employee_code, entity_type
                 )
                 if email_sent:
-                    print(f"📧 Credentials email sent to {user.email}")
+                    logger.info("Credentials email sent to user %s", user.id)
                 else:
-                    print(f"⚠️ Failed to send email: {email_message}")
+                    logger.warning("Credentials email to user %s failed: %s", user.id, email_message)
                 
                 return user, "User created successfully"
                 
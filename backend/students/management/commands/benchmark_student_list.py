@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from students.models import Student
+from students.serializers import StudentSerializer, StudentListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query count, latency and payload size of one student list page: the legacy "
+        "full serializer against StudentListSerializer with default, sparse and expanded fields."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100, help="Students per page (default: 100)")
+        parser.add_argument("--runs", type=int, default=5, help="Runs per variant (default: 5)")
+        parser.add_argument(
+            "--fields", default="id,name,student_id,gr_no,classroom_name,current_grade",
+            help="?fields= used for the sparse variant",
+        )
+
+    def handle(self, *args, **options):
+        page_size = max(options["page_size"], 1)
+        runs = max(options["runs"], 1)
+        total = Student.objects.count()
+        if not total:
+            self.stderr.write(self.style.ERROR("No students found."))
+            return
+
+        variants = [
+            ("legacy", None, {}),
+            ("default", StudentListSerializer, {}),
+            ("sparse", StudentListSerializer, {"fields": options["fields"]}),
+            ("expanded", StudentListSerializer, {"expand": "campus_data,classroom_data"}),
+        ]
+        self.stdout.write(f"Students: {total}, page size: {min(page_size, total)}, runs: {runs}")
+        for label, serializer_class, params in variants:
+            queries, size, timings = self._measure(serializer_class, params, page_size, runs)
+            self.stdout.write(
+                f"{label:>8}: queries={queries:<5} bytes={size:<9} "
+                f"p50={statistics.median(timings):.1f}ms min={min(timings):.1f}ms max={max(timings):.1f}ms"
+            )
+
+    def _measure(self, serializer_class, params, page_size, runs):
+        request = Request(RequestFactory().get("/api/students/", params))
+        timings = []
+        queries = size = 0
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                if serializer_class is None:
+                    # What the list endpoint did before StudentListSerializer
+                    queryset = Student.objects.select_related("campus", "classroom")
+                    serializer = StudentSerializer(
+                        queryset.order_by("-created_at")[:page_size], many=True, context={"request": request}
+                    )
+                else:
+                    fields = serializer_class.selected_fields(request.query_params)
+                    related = serializer_class.related_for(fields)
+                    queryset = Student.objects.select_related(*related) if related else Student.objects.all()
+                    serializer = serializer_class(
+                        queryset.order_by("-created_at")[:page_size], many=True, context={"request": request}
+                    )
+                payload = JSONRenderer().render(serializer.data)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = len(ctx.captured_queries)
+            size = len(payload)
+        return queries, size, timings
@@ -5,13 +5,17 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils.dateparse import parse_date
 from students.models import Student
+from students.services import StudentBulkImportService
 from campus.models import Campus
-from classes.models import Grade, ClassRoom
 import re
 
 
 class Command(BaseCommand):
-    help = 'Populate students data from CSV file with classroom assignments'
+    help = (
+        'Populate students data from CSV file with classroom assignments. '
+        'Rows matching an existing student of the campus (name, father name, date of birth) are skipped; '
+        'use --dry-run for the report without saving.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -30,6 +34,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Run without actually saving data (for testing)'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows per INSERT statement (default: 500)'
+        )
 
     def handle(self, *args, **options):
         csv_file_path = options['csv_file_path']
@@ -73,53 +83,52 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No data will be saved'))
 
-        # Process each student
-        success_count = 0
-        error_count = 0
+        # Parse every row first; the import engine then works on the whole sheet at once
+        rows = []
         errors = []
-
         for row_num, student_data in enumerate(students_data, start=2):
             try:
-                student = self.process_student_data(student_data, campus, row_num)
-                
-                if not dry_run:
-                    student.save()
-                    self.stdout.write(
-                        self.style.SUCCESS(f'✅ Row {row_num}: Created student {student.name}')
-                    )
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(f'🔍 Row {row_num}: Would create student {student.name}')
-                    )
-                
-                success_count += 1
-                
+                rows.append((row_num, self.process_student_data(student_data, campus, row_num)))
             except Exception as e:
-                error_count += 1
-                error_msg = f'Row {row_num}: {str(e)}'
-                errors.append(error_msg)
-                self.stdout.write(
-                    self.style.ERROR(f'❌ {error_msg}')
-                )
-
-        # Summary
-        self.stdout.write('\n' + '='*50)
-        self.stdout.write('SUMMARY:')
-        self.stdout.write(f'Total rows processed: {len(students_data)}')
-        self.stdout.write(f'Successfully processed: {success_count}')
-        self.stdout.write(f'Errors: {error_count}')
-        
-        if errors:
-            self.stdout.write('\nERRORS:')
-            for error in errors[:10]:  # Show first 10 errors
-                self.stdout.write(f'  - {error}')
-            if len(errors) > 10:
-                self.stdout.write(f'  ... and {len(errors) - 10} more errors')
+                errors.append((row_num, str(e)))
+
+        importer = StudentBulkImportService(campus, chunk_size=options['chunk_size'])
+        plan = importer.plan(rows)
+        errors.extend(plan['errors'])
+        errors.sort()
+        self.print_plan(plan, errors)
 
         if dry_run:
             self.stdout.write(self.style.WARNING('\n🔍 This was a DRY RUN - No data was actually saved'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'\n✅ Successfully processed {success_count} students'))
+            return
+
+        try:
+            created = importer.execute(plan)
+        except Exception as e:
+            raise CommandError(f'Import failed, nothing was saved: {str(e)}')
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Successfully created {len(created)} students'))
+
+    def print_plan(self, plan, errors):
+        """Dry-run diff: students per classroom, rows matching existing students, errors"""
+        per_classroom = {}
+        for _, student in plan['create']:
+            label = str(student.classroom) if student.classroom else 'No classroom'
+            per_classroom[label] = per_classroom.get(label, 0) + 1
+
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write('SUMMARY:')
+        self.stdout.write(f'New students: {len(plan["create"])}')
+        for label, count in sorted(per_classroom.items()):
+            self.stdout.write(f'  + {count:>4}  {label}')
+
+        self.stdout.write(f'Already on this campus (skipped): {len(plan["existing"])}')
+        for row_num, student, existing, changed in plan['existing']:
+            differs = f'; sheet differs in: {", ".join(changed)}' if changed else ''
+            self.stdout.write(f'  = Row {row_num}: {student.name} is {existing["student_id"] or existing["id"]}{differs}')
+
+        self.stdout.write(f'Errors: {len(errors)}')
+        for row_num, error in errors:
+            self.stdout.write(self.style.ERROR(f'  ❌ Row {row_num}: {error}'))
 
     def process_student_data(self, data, campus, row_num):
         """Process individual student data and create Student object"""
@@ -255,66 +264,8 @@ class Command(BaseCommand):
             is_draft=False
         )
 
-        # Assign classroom if grade and section are provided
-        if current_grade and section and shift:
-            self.assign_classroom_to_student(student, campus, current_grade, section, shift)
-
         return student
 
-    def assign_classroom_to_student(self, student, campus, grade_name, section, shift):
-        """Assign classroom to student based on grade, section, and shift"""
-        try:
-            # Map grade names to Roman numerals
-            grade_mapping = {
-                'Grade 1': 'Grade I',
-                'Grade 2': 'Grade II', 
-                'Grade 3': 'Grade III',
-                'Grade 4': 'Grade IV',
-                'Grade 5': 'Grade V',
-                'Grade 6': 'Grade VI',
-                'Grade 7': 'Grade VII',
-                'Grade 8': 'Grade VIII',
-                'Grade 9': 'Grade IX',
-                'Grade 10': 'Grade X',
-                'KG-1': 'KG-I',
-                'KG-2': 'KG-II',
-                'KG1': 'KG-I',
-                'KG2': 'KG-II',
-                'Nursery': 'Nursery',
-            }
-            
-            # Convert grade name to Roman numeral format
-            mapped_grade_name = grade_mapping.get(grade_name, grade_name)
-            
-            # Find the grade
-            grade = Grade.objects.filter(
-                name=mapped_grade_name,
-                level__campus=campus,
-                level__shift=shift
-            ).first()
-            
-            if not grade:
-                self.stdout.write(f"⚠️ Grade not found: {grade_name} -> {mapped_grade_name} for {shift} shift")
-                return
-            
-            # Find the classroom
-            classroom = ClassRoom.objects.filter(
-                grade=grade,
-                section=section,
-                shift=shift
-            ).first()
-            
-            if not classroom:
-                self.stdout.write(f"⚠️ Classroom not found: {grade_name}-{section} for {shift} shift")
-                return
-            
-            # Assign classroom to student
-            student.classroom = classroom
-            self.stdout.write(f"✅ Assigned classroom: {mapped_grade_name}-{section} to {student.name}")
-            
-        except Exception as e:
-            self.stdout.write(f"❌ Error assigning classroom: {str(e)}")
-
     def clean_text(self, text):
         """Clean and normalize text data"""
         if not text or text.strip() in ['000', '0000', 'nil', 'N/A', 'No', '########']:
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0007_alter_campus_library_available_and_more'),
+        ('classes', '0006_alter_level_campus'),
+        ('students', '0005_alter_student_campus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'id'], name='students_st_created_a5766e_idx'),
+        ),
+    ]
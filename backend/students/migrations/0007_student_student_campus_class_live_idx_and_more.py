@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('campus', '0007_alter_campus_library_available_and_more'),
+        ('classes', '0006_alter_level_campus'),
+        ('students', '0006_student_students_st_created_a5766e_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['campus', 'classroom'], name='student_campus_class_live_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['classroom', 'name'], name='student_class_name_live_idx'),
+        ),
+    ]
@@ -6,6 +6,9 @@ from django.db.models import Q
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from .validators import StudentValidator
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class StudentManager(models.Manager):
@@ -299,7 +302,7 @@ class Student(models.Model):
             )
             
             if not matching_grades.exists():
-                print(f"❌ No matching grade found for '{self.current_grade}' in campus '{self.campus.campus_name}'")
+                logger.warning("No matching grade for %r in campus %s", self.current_grade, self.campus_id)
                 return
             
             # Find classroom with matching grade, section, and shift
@@ -311,19 +314,19 @@ class Student(models.Model):
             
             if classroom:
                 self.classroom = classroom
-                print(f"✅ Auto-assigned student '{self.name}' to classroom '{classroom.grade.name}-{classroom.section}' ({classroom.shift})")
-                
-                # If classroom has a teacher, student is automatically connected to that teacher
-                if classroom.class_teacher:
-                    print(f"✅ Student '{self.name}' is now connected to teacher '{classroom.class_teacher.full_name}'")
+                # A class teacher of the classroom is the student's teacher from now on
+                logger.info(
+                    "Auto-assigned student %r to classroom %s (teacher %s)",
+                    self.name, classroom.id, classroom.class_teacher_id,
+                )
             else:
-                print(f"❌ No classroom found for Grade: {self.current_grade}, Section: {self.section}, Shift: {self.shift} in campus '{self.campus.campus_name}'")
-                print(f"💡 Please create a classroom first for this combination")
+                logger.warning(
+                    "No classroom for grade %r, section %r, shift %r in campus %s",
+                    self.current_grade, self.section, self.shift, self.campus_id,
+                )
                 
-        except Exception as e:
-            print(f"❌ Error in auto-assignment: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Classroom auto-assignment failed for student %r", self.name)
 
     def save(self, *args, **kwargs):
         # Set termination date automatically
@@ -352,8 +355,8 @@ class Student(models.Model):
                 self.student_code = IDGenerator.generate_unique_student_code(
                     self.classroom, self.enrollment_year or 2025
                 )
-            except Exception as e:
-                print(f"Error generating student code: {str(e)}")
+            except Exception:
+                logger.exception("Generating student code failed for %r", self.name)
 
         # Generate student_id using global student sequence
         if not self.student_id and all([self.campus, self.shift, self.enrollment_year]):
@@ -367,8 +370,8 @@ class Student(models.Model):
                 # Set GR number from sequence
                 if not self.gr_no:
                     self.gr_no = f"GR-{seq:05d}"
-            except Exception as e:
-                print(f"Error generating student id: {e}")
+            except Exception:
+                logger.exception("Generating student id failed for %r", self.name)
 
         # Auto-generate GR No. from Student ID (last 5 digits)
         if self.student_id and not self.gr_no:
@@ -386,4 +389,11 @@ class Student(models.Model):
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination (?cursor=) walks (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            # Campus/class scoped lists and class rosters sorted by name, live rows only
+            models.Index(fields=['campus', 'classroom'], condition=Q(is_deleted=False), name='student_campus_class_live_idx'),
+            models.Index(fields=['classroom', 'name'], condition=Q(is_deleted=False), name='student_class_name_live_idx'),
+        ]
\ No newline at end of file
@@ -1,17 +1,19 @@
 import graphene
 from graphene_django import DjangoObjectType
+from backend.loaders import BatchedListConnectionField
 from .models import Student
 
 class StudentType(DjangoObjectType):
     class Meta:
         model = Student
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_students = graphene.List(StudentType)
+    all_students = BatchedListConnectionField(StudentType)
     
-    def resolve_all_students(self, info):
-        return Student.objects.all()
+    def resolve_all_students(self, info, **kwargs):
+        return Student.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
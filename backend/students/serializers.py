@@ -58,3 +58,86 @@ class StudentSerializer(serializers.ModelSerializer):
             today = date.today()
             return today.year - obj.dob.year - ((today.month, today.day) < (obj.dob.month, obj.dob.day))
         return None
+
+
+class StudentListSerializer(StudentSerializer):
+    """
+    Default serializer for the student list: every model field plus the flat
+    display fields, without the nested campus/classroom objects.
+
+    ?fields=id,name,classroom_name   only return these fields ('id' is always kept)
+    ?expand=campus_data,classroom_data   add the nested objects back
+
+    The view derives select_related from the same field set (related_for), so a
+    page costs one query no matter which display fields are requested.
+    """
+
+    EXPANDABLE_FIELDS = ('campus_data', 'classroom_data')
+    _available_fields = None
+
+    # Relations each field reads
+    RELATED_FIELDS = {
+        'campus_data': ['campus'],
+        'campus_name': ['campus'],
+        'classroom_data': [
+            'classroom__grade__level__campus', 'classroom__class_teacher', 'classroom__assigned_by'
+        ],
+        'classroom_name': ['classroom__grade'],
+        'class_name': ['classroom__grade'],
+        'class_teacher_name': ['classroom__class_teacher'],
+        'class_teacher_code': ['classroom__class_teacher'],
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        selected = self.selected_fields(request.query_params if request else {})
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, query_params):
+        """Field names for ?fields=/?expand=. Raises ValidationError on unknown names."""
+        available = cls.available_fields()
+        expand = cls._parse_list(query_params.get('expand'))
+        unknown = [name for name in expand if name not in cls.EXPANDABLE_FIELDS]
+        if unknown:
+            raise serializers.ValidationError({
+                'expand': f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(cls.EXPANDABLE_FIELDS)}"
+            })
+
+        requested = cls._parse_list(query_params.get('fields'))
+        if requested:
+            unknown = [name for name in requested if name not in available]
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+            selected = {'id', *requested}
+        else:
+            selected = {name for name in available if name not in cls.EXPANDABLE_FIELDS}
+        return selected | set(expand)
+
+    @classmethod
+    def related_for(cls, fields):
+        """select_related paths needed to render fields without extra queries"""
+        paths = set()
+        for name in fields:
+            paths.update(cls.RELATED_FIELDS.get(name, ()))
+        # Drop paths already covered by a longer one (classroom__grade by classroom__grade__level__campus)
+        return sorted(path for path in paths if not any(other.startswith(path + '__') for other in paths))
+
+    @staticmethod
+    def _parse_list(value):
+        names = []
+        for name in (value or '').split(','):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    @classmethod
+    def available_fields(cls):
+        """All field names of the full StudentSerializer, computed once"""
+        if cls._available_fields is None:
+            cls._available_fields = tuple(StudentSerializer().fields)
+        return cls._available_fields
@@ -0,0 +1,334 @@
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from .models import Student
+from .signals import assign_student_to_teacher_and_coordinator
+from classes.models import ClassRoom, Grade
+from users.utils import generate_student_id, get_shift_code, reserve_student_numbers
+from utils.response_cache import bump_version
+
+
+class StudentStatsService:
+    """
+    Demographic counts for the dashboard, computed for any set of dimensions
+    in a single round trip: GROUPING SETS on PostgreSQL, a CTE with one
+    UNION ALL branch per dimension elsewhere.
+    """
+
+    DIMENSIONS = {
+        'gender': F('gender'),
+        'campus': F('campus__campus_name'),
+        'grade': F('current_grade'),
+        'enrollment_year': F('enrollment_year'),
+        'mother_tongue': F('mother_tongue'),
+        'religion': F('religion'),
+        'age': ExtractYear('dob'),
+        'zakat_status': F('zakat_status'),
+        'house_ownership': F('house_owned'),
+    }
+
+    @staticmethod
+    def parse_dimensions(value):
+        """Parse ?dimensions=gender,campus (default, also for '?dimensions=,': all). Raises ValueError on unknown names."""
+        if not value:
+            return list(StudentStatsService.DIMENSIONS)
+        dimensions = []
+        for name in value.split(','):
+            name = name.strip()
+            if not name:
+                continue
+            if name not in StudentStatsService.DIMENSIONS:
+                raise ValueError(
+                    f"Unknown dimension '{name}'. Choose from: {', '.join(StudentStatsService.DIMENSIONS)}"
+                )
+            if name not in dimensions:
+                dimensions.append(name)
+        return dimensions or list(StudentStatsService.DIMENSIONS)
+
+    @staticmethod
+    def compute(queryset, dimensions):
+        """Return {'total': n, <dimension>: <formatted counts>, ...} for the scoped student queryset"""
+        total, grouped = StudentStatsService._grouped_counts(queryset, dimensions)
+        stats = {'total': total}
+        for name in dimensions:
+            formatter = getattr(StudentStatsService, f'_format_{name}')
+            stats[name] = formatter(grouped[name])
+        return stats
+
+    @staticmethod
+    def _grouped_counts(queryset, dimensions):
+        if not dimensions:
+            # GROUPING SETS needs at least one column
+            return queryset.count(), {}
+        columns = [f'dim_{name}' for name in dimensions]
+        inner = queryset.order_by().annotate(
+            **{column: StudentStatsService.DIMENSIONS[name] for name, column in zip(dimensions, columns)}
+        ).values(*columns)
+        inner_sql, params = inner.query.sql_with_params()
+        connection = connections[queryset.db]
+
+        grouped = {name: [] for name in dimensions}
+        total = 0
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                flags = ', '.join(f'GROUPING({column})' for column in columns)
+                sets = ', '.join(f'({column})' for column in columns)
+                cursor.execute(
+                    f"SELECT {', '.join(columns)}, {flags}, COUNT(*) "
+                    f"FROM ({inner_sql}) AS scoped GROUP BY GROUPING SETS ({sets}, ())",
+                    params
+                )
+                width = len(columns)
+                for row in cursor.fetchall():
+                    values, grouping, count = row[:width], row[width:2 * width], row[-1]
+                    if all(grouping):
+                        total = count
+                        continue
+                    index = list(grouping).index(0)
+                    grouped[dimensions[index]].append((values[index], count))
+            else:
+                branches = [
+                    f"SELECT {index} AS dimension, {column} AS value, COUNT(*) FROM scoped GROUP BY {column}"
+                    for index, column in enumerate(columns)
+                ]
+                branches.append("SELECT -1, NULL, COUNT(*) FROM scoped")
+                cursor.execute(f"WITH scoped AS ({inner_sql}) " + " UNION ALL ".join(branches), params)
+                for index, value, count in cursor.fetchall():
+                    if index == -1:
+                        total = count
+                    else:
+                        grouped[dimensions[index]].append((value, count))
+        return total, grouped
+
+    # --- Response formats (same shapes as the per-stat endpoints) ---
+
+    @staticmethod
+    def _format_gender(rows):
+        counts = {'male': 0, 'female': 0, 'other': 0}
+        for value, count in rows:
+            key = value if value in ('male', 'female') else 'other'
+            counts[key] += count
+        return counts
+
+    @staticmethod
+    def _format_campus(rows):
+        rows = sorted(rows, key=lambda row: -row[1])
+        return [{'campus': value or 'Unknown Campus', 'count': count} for value, count in rows]
+
+    @staticmethod
+    def _format_grade(rows):
+        rows = sorted(rows, key=lambda row: (row[0] is None, row[0] or ''))
+        return [{'grade': value or 'Unknown Grade', 'count': count} for value, count in rows]
+
+    @staticmethod
+    def _format_enrollment_year(rows):
+        rows = sorted(rows, key=lambda row: (row[0] is None, row[0] or 0))
+        return [{'year': str(value or 2025), 'count': count} for value, count in rows]
+
+    @staticmethod
+    def _format_mother_tongue(rows):
+        rows = sorted(rows, key=lambda row: -row[1])
+        return [{'name': value or 'Unknown', 'value': count} for value, count in rows]
+
+    @staticmethod
+    def _format_religion(rows):
+        return StudentStatsService._format_mother_tongue(rows)
+
+    @staticmethod
+    def _format_age(rows):
+        current_year = timezone.now().year
+        data = []
+        for birth_year, count in sorted(rows, key=lambda row: row[0] or 0):
+            if birth_year:
+                age = current_year - int(birth_year)
+                if 0 < age < 25:  # Reasonable age range for students
+                    data.append({'age': age, 'count': count})
+        return data
+
+    @staticmethod
+    def _format_zakat_status(rows):
+        rows = sorted(rows, key=lambda row: -row[1])
+        return [{'status': value or 'Unknown', 'count': count} for value, count in rows]
+
+    @staticmethod
+    def _format_house_ownership(rows):
+        # SQLite returns booleans as 0/1
+        counts = {}
+        for value, count in rows:
+            status = 'Owned' if value else 'Rented'
+            counts[status] = counts.get(status, 0) + count
+        return [
+            {'status': status, 'count': count}
+            for status, count in sorted(counts.items(), key=lambda item: -item[1])
+        ]
+
+
+class StudentBulkImportService:
+    """
+    Create a campus's students in bulk (CSV imports) without running Student.save() per row.
+
+    - Grades and classrooms of the campus are loaded once and matched in memory.
+    - Student numbers are reserved in one sequence round trip.
+    - Rows are inserted with bulk_create in chunks.
+    - The post_save side effects (class teacher -> coordinator assignment and
+      the student cache version) run once per classroom instead of once per student.
+
+    plan() only reads, so its result doubles as the dry-run report.
+    """
+
+    # Sheet grade names -> Grade.name
+    GRADE_ALIASES = {
+        'Grade 1': 'Grade I',
+        'Grade 2': 'Grade II',
+        'Grade 3': 'Grade III',
+        'Grade 4': 'Grade IV',
+        'Grade 5': 'Grade V',
+        'Grade 6': 'Grade VI',
+        'Grade 7': 'Grade VII',
+        'Grade 8': 'Grade VIII',
+        'Grade 9': 'Grade IX',
+        'Grade 10': 'Grade X',
+        'KG-1': 'KG-I',
+        'KG-2': 'KG-II',
+        'KG1': 'KG-I',
+        'KG2': 'KG-II',
+        'Nursery': 'Nursery',
+    }
+
+    # Compared with an existing student that has the same name, father name and date of birth
+    DIFF_FIELDS = [
+        'gender', 'father_cnic', 'father_contact', 'mother_name', 'mother_contact', 'emergency_contact',
+        'address', 'current_grade', 'section', 'shift', 'enrollment_year', 'classroom_id',
+    ]
+
+    def __init__(self, campus, chunk_size=500):
+        self.campus = campus
+        self.chunk_size = chunk_size
+        self._grades = None
+        self._classrooms = None
+        self._resolved = {}
+
+    def plan(self, rows):
+        """
+        Match rows ([(row_num, unsaved Student)]) to classrooms and existing students without writing.
+
+        Returns {'create': [(row_num, student)], 'existing': [(row_num, student, existing, changed_fields)],
+        'errors': [(row_num, message)]}.
+        """
+        existing = self._existing_students()
+        plan = {'create': [], 'existing': [], 'errors': []}
+        seen = {}
+        for row_num, student in rows:
+            student.campus = self.campus
+            if not student.classroom_id and all([student.current_grade, student.section, student.shift]):
+                student.classroom = self.resolve_classroom(student.current_grade, student.section, student.shift)
+                if student.classroom is None:
+                    # Same rule as Student.save()
+                    plan['errors'].append((row_num, (
+                        f"No classroom is available for {student.current_grade}-{student.section} "
+                        f"({student.shift}). Please create the classroom first."
+                    )))
+                    continue
+
+            key = self._identity(student.name, student.father_name, student.dob)
+            if key in existing:
+                match = existing[key]
+                changed = [
+                    field for field in self.DIFF_FIELDS
+                    if getattr(student, field) not in (None, '') and getattr(student, field) != match[field]
+                ]
+                plan['existing'].append((row_num, student, match, changed))
+            elif key in seen:
+                plan['errors'].append((row_num, f"Duplicate of row {seen[key]} in this file"))
+            else:
+                seen[key] = row_num
+                plan['create'].append((row_num, student))
+        return plan
+
+    def execute(self, plan):
+        """Insert the planned new students and run their side effects; returns the created students"""
+        students = [student for _, student in plan['create']]
+        if not students:
+            return []
+
+        with transaction.atomic():
+            self._assign_ids(students)
+            created = Student.objects.bulk_create(students, batch_size=self.chunk_size)
+
+            classrooms = {}
+            for student in created:
+                if student.classroom_id and student.classroom_id not in classrooms:
+                    classrooms[student.classroom_id] = student
+            for student in classrooms.values():
+                assign_student_to_teacher_and_coordinator(student)
+
+        bump_version('student')
+        return created
+
+    def resolve_classroom(self, grade_name, section, shift):
+        key = (grade_name, section, shift)
+        if key not in self._resolved:
+            self._resolved[key] = self._find_classroom(grade_name, section, shift)
+        return self._resolved[key]
+
+    def _find_classroom(self, grade_name, section, shift):
+        self._load_lookups()
+        # Exact grade name (after aliases) at a level of the student's shift first,
+        # then the looser name match of Student._auto_assign_classroom
+        mapped = self.GRADE_ALIASES.get(grade_name, grade_name)
+        exact = [grade for grade in self._grades if grade.name == mapped and grade.level.shift == shift]
+        variations = {
+            grade_name.lower(), grade_name.replace('-', ' ').lower(), grade_name.replace(' ', '-').lower(),
+        }
+        loose = [grade for grade in self._grades if any(v in grade.name.lower() for v in variations)]
+        for grades in (exact, loose):
+            for grade in grades:
+                classroom = self._classrooms.get((grade.id, section, shift))
+                if classroom is not None:
+                    return classroom
+        return None
+
+    def _load_lookups(self):
+        if self._grades is not None:
+            return
+        self._grades = list(
+            Grade.objects.filter(level__campus=self.campus).select_related('level').order_by('id')
+        )
+        self._classrooms = {}
+        for classroom in ClassRoom.objects.filter(grade__level__campus=self.campus).select_related(
+            'class_teacher'
+        ).order_by('-id'):
+            # Lowest id wins when a grade has two rooms with the same section and shift
+            self._classrooms[(classroom.grade_id, classroom.section, classroom.shift)] = classroom
+
+    def _existing_students(self):
+        existing = {}
+        for row in Student.objects.filter(campus=self.campus).values(
+            'id', 'name', 'father_name', 'dob', 'student_id', *self.DIFF_FIELDS,
+        ):
+            existing.setdefault(self._identity(row['name'], row['father_name'], row['dob']), row)
+        return existing
+
+    @staticmethod
+    def _identity(name, father_name, dob):
+        return ((name or '').strip().casefold(), (father_name or '').strip().casefold(), dob)
+
+    def _assign_ids(self, students):
+        """student_id and gr_no as Student.save() would set them, from one reserved number range"""
+        numbered = [
+            student for student in students
+            if not student.student_id and all([student.shift, student.enrollment_year])
+        ]
+        if numbered:
+            campus_code = self.campus.campus_code or f"C{self.campus.id:02d}"
+            for student, seq in zip(numbered, reserve_student_numbers(len(numbered))):
+                student.student_id = generate_student_id(
+                    campus_code, get_shift_code(student.shift), str(student.enrollment_year)[-2:], seq,
+                )
+                if not student.gr_no:
+                    student.gr_no = f"GR-{seq:05d}"
+        for student in students:
+            student.terminated_on = None
+            student.termination_reason = None
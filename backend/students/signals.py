@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from .models import Student
+from utils.response_cache import bump_version
 from classes.models import ClassRoom
 from teachers.models import Teacher
 from coordinator.models import Coordinator
@@ -164,3 +165,10 @@ def update_teacher_assignments(sender, instance, created, **kwargs):
             
         except Exception as e:
             logger.error(f"Error updating teacher assignments for {instance.full_name}: {str(e)}")
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def bump_student_cache_version(sender, instance, **kwargs):
+    """Cached responses that count students (e.g. /students/stats/) are stale once any student changes"""
+    bump_version('student')
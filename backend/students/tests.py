@@ -1,3 +1,46 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .models import Student
+from .services import StudentStatsService
+from campus.models import Campus
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StudentStatsTests(TestCase):
+    """?dimensions= without any name means every dimension, never an empty GROUPING SETS query"""
+
+    def setUp(self):
+        cache.clear()
+        campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        for number, gender in enumerate(['male', 'female', 'female']):
+            Student.objects.create(
+                name=f'Student {number}', campus=campus, shift='morning', enrollment_year=2025,
+                gender=gender, is_draft=False,
+            )
+        admin = User.objects.create(username='S-admin', email='admin@example.com', role='superadmin', is_superuser=True)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(admin).access_token}'
+
+    def test_blank_dimensions_mean_all(self):
+        for value in (None, '', ',', ' , '):
+            self.assertEqual(StudentStatsService.parse_dimensions(value), list(StudentStatsService.DIMENSIONS))
+        with self.assertRaises(ValueError):
+            StudentStatsService.parse_dimensions('gender,shoe_size')
+
+    def test_stats_endpoint(self):
+        response = self.client.get('/api/students/stats/', {'dimensions': ' , '})
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        self.assertEqual(set(data), {'total', *StudentStatsService.DIMENSIONS})
+        self.assertEqual(data['gender'], {'male': 1, 'female': 2, 'other': 0})
+
+        response = self.client.get('/api/students/stats/', {'dimensions': 'gender,shoe_size'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_compute_without_dimensions(self):
+        self.assertEqual(StudentStatsService.compute(Student.objects.all(), []), {'total': 3})
@@ -1,4 +1,5 @@
 # views.py
+from django.conf import settings
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -8,13 +9,20 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Count, Q
 from .models import Student
-from .serializers import StudentSerializer
+from .serializers import StudentSerializer, StudentListSerializer
 from .filters import StudentFilter
+from .services import StudentStatsService
+from utils.response_cache import cache_response
+from users.role_profile import RoleProfileResolver
+from users.scopes import ClassroomScope
+from utils.pagination import KeysetOrPageNumberPagination
 
 class StudentViewSet(viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, IsTeacherOrAbove]
+    # ?cursor= switches to (created_at, id) keyset pages without a count query
+    pagination_class = KeysetOrPageNumberPagination
     
     # Filtering, search, and ordering
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -23,14 +31,26 @@ class StudentViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at', 'enrollment_year', 'student_code']
     ordering = ['-created_at']  # Default ordering
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return StudentListSerializer
+        return StudentSerializer
+
     def get_queryset(self):
         """Override to handle role-based filtering for list views and stats actions"""
-        queryset = Student.objects.select_related('campus', 'classroom').all()
+        if self.action == 'list':
+            # Only join what the requested ?fields=/?expand= render
+            fields = StudentListSerializer.selected_fields(self.request.query_params)
+        else:
+            fields = StudentListSerializer.available_fields()
+        related = StudentListSerializer.related_for(fields)
+        # select_related() without arguments would follow every foreign key
+        queryset = Student.objects.select_related(*related) if related else Student.objects.all()
         
         # Apply role-based filtering for list views and stats actions
         if self.action in ['list', 'gender_stats', 'campus_stats', 'grade_distribution', 
                           'enrollment_trend', 'mother_tongue_distribution', 
-                          'religion_distribution', 'total']:
+                          'religion_distribution', 'total', 'stats']:
             user = self.request.user
             
             # Superadmin gets ALL students for both list and stats
@@ -40,53 +60,10 @@ class StudentViewSet(viewsets.ModelViewSet):
             # Principal: Only show students from their campus
             if hasattr(user, 'campus') and user.campus and user.is_principal():
                 queryset = queryset.filter(campus=user.campus)
-            elif user.is_teacher():
-                # Teacher: Show students from their assigned classrooms (supports both single and multiple assignments)
-                # Find teacher by employee code (username)
-                from teachers.models import Teacher
-                try:
-                    teacher_obj = Teacher.objects.get(employee_code=user.username)
-                    
-                    # Get all assigned classrooms (both legacy single assignment and new multiple assignments)
-                    assigned_classrooms = []
-                    
-                    # Add legacy single classroom assignment
-                    if teacher_obj.assigned_classroom:
-                        assigned_classrooms.append(teacher_obj.assigned_classroom)
-                    
-                    # Add multiple classroom assignments
-                    assigned_classrooms.extend(teacher_obj.assigned_classrooms.all())
-                    
-                    # Remove duplicates
-                    assigned_classrooms = list(set(assigned_classrooms))
-                    
-                    if assigned_classrooms:
-                        # Filter students by any of the assigned classrooms
-                        queryset = queryset.filter(classroom__in=assigned_classrooms)
-                    else:
-                        # If no classroom assigned, show no students
-                        queryset = queryset.none()
-                except Teacher.DoesNotExist:
-                    # If teacher object doesn't exist, show no students
-                    queryset = queryset.none()
-            elif user.is_coordinator():
-                # Coordinator: Show students from classrooms under their assigned level
-                from coordinator.models import Coordinator
-                try:
-                    coordinator_obj = Coordinator.objects.get(employee_code=user.username)
-                    
-                    # Get all classrooms under this coordinator's level
-                    from classes.models import ClassRoom
-                    coordinator_classrooms = ClassRoom.objects.filter(
-                        grade__level=coordinator_obj.level,
-                        grade__level__campus=coordinator_obj.campus
-                    ).values_list('id', flat=True)
-                    
-                    # Filter students from these classrooms
-                    queryset = queryset.filter(classroom__in=coordinator_classrooms)
-                except Coordinator.DoesNotExist:
-                    # If coordinator object doesn't exist, return empty queryset
-                    queryset = queryset.none()
+            elif user.is_teacher() or user.is_coordinator():
+                # Teacher: students of their assigned classrooms (legacy single, multiple and class teacher)
+                # Coordinator: students of classrooms under their managed level(s)
+                queryset = ClassroomScope.filter_queryset(queryset, user)
             
             # Handle shift filtering
             shift_filter = self.request.query_params.get('shift')
@@ -110,31 +87,15 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         if user.is_teacher():
             # Teacher: Check if student is in their assigned classrooms
-            from teachers.models import Teacher
-            try:
-                teacher_obj = Teacher.objects.get(employee_code=user.username)
-                
-                # Get all assigned classrooms (both legacy single assignment and new multiple assignments)
-                assigned_classrooms = []
-                
-                # Add legacy single classroom assignment
-                if teacher_obj.assigned_classroom:
-                    assigned_classrooms.append(teacher_obj.assigned_classroom)
-                
-                # Add multiple classroom assignments
-                assigned_classrooms.extend(teacher_obj.assigned_classrooms.all())
-                
-                # Remove duplicates
-                assigned_classrooms = list(set(assigned_classrooms))
-                
-                if assigned_classrooms and obj.classroom not in assigned_classrooms:
-                    # Student is not in teacher's assigned classrooms
-                    from rest_framework.exceptions import PermissionDenied
-                    raise PermissionDenied("You don't have permission to view this student.")
-                    
-            except Teacher.DoesNotExist:
+            if not RoleProfileResolver.for_request(self.request).exists:
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("Teacher profile not found.")
+            
+            classroom_ids = ClassroomScope.visible_classroom_ids(user)
+            if classroom_ids and obj.classroom_id not in classroom_ids:
+                # Student is not in teacher's assigned classrooms
+                from rest_framework.exceptions import PermissionDenied
+                raise PermissionDenied("You don't have permission to view this student.")
                 
         elif user.is_principal() and hasattr(user, 'campus') and user.campus:
             # Principal: Check if student is from their campus
@@ -144,15 +105,12 @@ class StudentViewSet(viewsets.ModelViewSet):
                 
         elif user.is_coordinator():
             # Coordinator: Check if student is from their assigned level
-            from coordinator.models import Coordinator
-            try:
-                coordinator_obj = Coordinator.objects.get(employee_code=user.username)
-                if obj.classroom and obj.classroom.grade.level != coordinator_obj.level:
-                    from rest_framework.exceptions import PermissionDenied
-                    raise PermissionDenied("You don't have permission to view this student.")
-            except Coordinator.DoesNotExist:
+            if not RoleProfileResolver.for_request(self.request).exists:
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("Coordinator profile not found.")
+            if obj.classroom_id and not ClassroomScope.can_access(user, obj.classroom_id):
+                from rest_framework.exceptions import PermissionDenied
+                raise PermissionDenied("You don't have permission to view this student.")
         
         return obj
 
@@ -343,6 +301,21 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         return Response(data)
     
+    @action(detail=False, methods=['get'], url_path='stats')
+    @cache_response('student', 'classroom', 'campus', timeout=settings.STUDENT_STATS_CACHE_TIMEOUT)
+    def stats(self, request):
+        """
+        All dashboard demographics in one round trip.
+        ?dimensions=gender,campus,grade,enrollment_year,mother_tongue,religion,age,zakat_status,house_ownership
+        (default: all). Cached per role scope for STUDENT_STATS_CACHE_TIMEOUT seconds.
+        """
+        try:
+            dimensions = StudentStatsService.parse_dimensions(request.query_params.get('dimensions'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        return Response(StudentStatsService.compute(self.get_queryset(), dimensions))
+    
     @action(detail=False, methods=['get'], url_path='total')
     def total_students(self, request):
         """Get total student count"""
@@ -451,7 +424,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         
         attendance_records = StudentAttendance.objects.filter(
             student=student
-        ).select_related('attendance').order_by('-attendance__date')
+        ).select_related('attendance__classroom__grade').order_by('-attendance__date')
         
         attendance_data = []
         for record in attendance_records:
@@ -464,12 +437,42 @@ class StudentViewSet(viewsets.ModelViewSet):
                 'attendance': {
                     'id': record.attendance.id,
                     'date': record.attendance.date,
-                    'classroom': record.attendance.classroom.name if record.attendance.classroom else None
+                    'classroom': str(record.attendance.classroom) if record.attendance.classroom else None
                 }
             })
         
         return Response(attendance_data)
     
+    @action(detail=True, methods=['get'], url_path='attendance-summary')
+    def get_student_attendance_summary(self, request, pk=None):
+        """Get maintained yearly attendance counters and current absence streak for a student"""
+        student = self.get_object()
+        from attendance.models import StudentAttendanceSummary
+        
+        summaries = StudentAttendanceSummary.objects.filter(student=student)
+        academic_year = request.query_params.get('academic_year')
+        if academic_year:
+            summaries = summaries.filter(academic_year=academic_year)
+        
+        data = [
+            {
+                'academic_year': summary.academic_year,
+                'total_marked': summary.total_marked,
+                'present_count': summary.present_count,
+                'absent_count': summary.absent_count,
+                'late_count': summary.late_count,
+                'leave_count': summary.leave_count,
+                'excused_count': summary.excused_count,
+                'attendance_percentage': summary.attendance_percentage,
+                'current_absent_streak': summary.current_absent_streak,
+                'last_marked_date': summary.last_marked_date,
+                'last_status': summary.last_status
+            }
+            for summary in summaries.order_by('-academic_year')
+        ]
+        
+        return Response(data)
+    
     @action(detail=False, methods=['get'], url_path='mother_tongue_distribution')
     def mother_tongue_distribution(self, request):
         """Get mother tongue distribution"""
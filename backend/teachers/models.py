@@ -1,6 +1,9 @@
 from django.db import models
 from campus.models import Campus
 from users.models import User
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Choices
 GENDER_CHOICES = [
@@ -202,8 +205,8 @@ class Teacher(models.Model):
                 self.employee_code = IDGenerator.generate_unique_employee_code(
                     self.current_campus, shift, year, 'teacher'
                 )
-            except Exception as e:
-                print(f"Error generating employee code: {str(e)}")
+            except Exception:
+                logger.exception("Generating employee code failed for teacher %r", self.full_name)
         
         # FIX: Auto-set class teacher status when classrooms are assigned
         has_classrooms = (self.assigned_classroom or 
@@ -211,10 +214,10 @@ class Teacher(models.Model):
         
         if has_classrooms and not self.is_class_teacher:
             self.is_class_teacher = True
-            print(f"Setting {self.full_name} as class teacher")
+            logger.info("Teacher %r is now a class teacher", self.full_name)
         elif not has_classrooms and self.is_class_teacher:
             self.is_class_teacher = False
-            print(f"Removing class teacher status from {self.full_name}")
+            logger.info("Teacher %r is no longer a class teacher", self.full_name)
         
         # Save first to get ID for ManyToMany operations
         is_new = self.pk is None
@@ -249,11 +252,11 @@ class Teacher(models.Model):
                     # Add coordinator (not replace)
                     if coordinator not in self.assigned_coordinators.all():
                         self.assigned_coordinators.add(coordinator)
-                        print(f"✅ Added coordinator {coordinator.full_name} for level {level.name}")
+                        logger.info("Added coordinator %s to teacher %s for level %s", coordinator.pk, self.pk, level.pk)
                 else:
-                    print(f"❌ No coordinator for level {level.name}")
-        except Exception as e:
-            print(f"Error: {str(e)}")
+                    logger.warning("No active coordinator for level %s of teacher %s", level.pk, self.pk)
+        except Exception:
+            logger.exception("Assigning coordinators from the classroom failed for teacher %s", self.pk)
 
     def _assign_coordinators_from_classrooms(self):
         """Assign coordinators from all assigned classrooms"""
@@ -275,12 +278,10 @@ class Teacher(models.Model):
                     
                     if coordinator and coordinator not in self.assigned_coordinators.all():
                         self.assigned_coordinators.add(coordinator)
-                        print(f"✅ Added coordinator {coordinator.full_name} for level {level.name}")
-            
-            print(f"✅ Assigned {self.assigned_coordinators.count()} coordinators to {self.full_name}")
+                        logger.info("Added coordinator %s to teacher %s for level %s", coordinator.pk, self.pk, level.pk)
             
-        except Exception as e:
-            print(f"Error: {str(e)}")
+        except Exception:
+            logger.exception("Assigning coordinators from classrooms failed for teacher %s", self.pk)
 
     def _assign_coordinators_from_classes(self):
         """Extract all grades and assign all relevant coordinators"""
@@ -333,12 +334,10 @@ class Teacher(models.Model):
                 
                 if coordinator:
                     self.assigned_coordinators.add(coordinator)
-                    print(f"✅ Added coordinator {coordinator.full_name} for level {level.name}")
-            
-            print(f"✅ Assigned {self.assigned_coordinators.count()} coordinators to {self.full_name}")
+                    logger.info("Added coordinator %s to teacher %s for level %s", coordinator.pk, self.pk, level.pk)
             
-        except Exception as e:
-            print(f"Error: {str(e)}")
+        except Exception:
+            logger.exception("Assigning coordinators from classes taught failed for teacher %s", self.pk)
 
     def __str__(self):
         return f"{self.full_name} ({self.employee_code or 'No Code'})"
@@ -1,17 +1,24 @@
 import graphene
 from graphene_django import DjangoObjectType
 from .models import Teacher
+from backend.loaders import BatchedListConnectionField, get_loaders
 
 class TeacherType(DjangoObjectType):
+    loader_keys = {'classrooms': 'assigned_classroom_id'}
+    
     class Meta:
         model = Teacher
         fields = "__all__"
+        use_connection = True
+    
+    def resolve_assigned_classroom(self, info):
+        return get_loaders(info).classrooms.load(self.assigned_classroom_id)
 
 class Query(graphene.ObjectType):
-    all_teachers = graphene.List(TeacherType)
+    all_teachers = BatchedListConnectionField(TeacherType)
     
-    def resolve_all_teachers(self, info):
-        return Teacher.objects.all()
+    def resolve_all_teachers(self, info, **kwargs):
+        return Teacher.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
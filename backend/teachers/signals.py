@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from .models import Teacher
 from services.user_creation_service import UserCreationService
+from users.role_profile import RoleProfileResolver
+from utils.response_cache import bump_version
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Teacher)
 def create_teacher_user(sender, instance, created, **kwargs):
@@ -11,16 +16,16 @@ def create_teacher_user(sender, instance, created, **kwargs):
             # Check if user already exists
             from users.models import User
             if User.objects.filter(email=instance.email).exists():
-                print(f"User already exists for {instance.full_name}")
+                logger.info("User already exists for teacher %s", instance.id)
                 return
             
             user, message = UserCreationService.create_user_from_entity(instance, 'teacher')
             if not user:
-                print(f"Failed to create user for teacher {instance.id}: {message}")
+                logger.error("Failed to create user for teacher %s: %s", instance.id, message)
             else:
-                print(f"✅ Created user for teacher: {instance.full_name} ({instance.employee_code})")
-        except Exception as e:
-            print(f"Error creating user for teacher {instance.id}: {str(e)}")
+                logger.info("Created user for teacher %s (%s)", instance.id, instance.employee_code)
+        except Exception:
+            logger.exception("Error creating user for teacher %s", instance.id)
 
 @receiver(pre_save, sender=Teacher)
 def update_class_teacher_status(sender, instance, **kwargs):
@@ -42,7 +47,7 @@ def sync_teacher_classroom_assignment(sender, instance, created, **kwargs):
         if classroom.class_teacher != instance:
             classroom.class_teacher = instance
             classroom.save(update_fields=['class_teacher'])
-            print(f"✅ Synced: Classroom {classroom} assigned teacher {instance.full_name}")
+            logger.info("Synced classroom %s class teacher to teacher %s", classroom.id, instance.id)
     else:
         # Agar teacher se classroom remove kiya gaya hai
         # Pehle check karo ke koi classroom is teacher se assigned hai ya nahi
@@ -51,7 +56,7 @@ def sync_teacher_classroom_assignment(sender, instance, created, **kwargs):
             classroom = ClassRoom.objects.get(class_teacher=instance)
             classroom.class_teacher = None
             classroom.save(update_fields=['class_teacher'])
-            print(f"✅ Synced: Classroom {classroom} removed teacher {instance.full_name}")
+            logger.info("Removed teacher %s as class teacher of classroom %s", instance.id, classroom.id)
         except ClassRoom.DoesNotExist:
             pass  # Koi classroom assigned nahi tha
 
@@ -80,13 +85,13 @@ def auto_assign_teacher_to_coordinators(sender, instance, created, **kwargs):
                 if coordinator not in instance.assigned_coordinators.all():
                     instance.assigned_coordinators.add(coordinator)
                     assigned_count += 1
-                    print(f"✅ Auto-assigned coordinator {coordinator.full_name} to teacher {instance.full_name}")
+                    logger.info("Auto-assigned coordinator %s to teacher %s", coordinator.id, instance.id)
         
         if assigned_count > 0:
-            print(f"✅ Auto-assigned {assigned_count} coordinators to teacher {instance.full_name}")
+            logger.info("Auto-assigned %d coordinators to teacher %s", assigned_count, instance.id)
             
-    except Exception as e:
-        print(f"Error auto-assigning coordinators to teacher {instance.full_name}: {str(e)}")
+    except Exception:
+        logger.exception("Error auto-assigning coordinators to teacher %s", instance.id)
 
 def teacher_teaches_coordinator_levels(teacher, coordinator):
     """Check if teacher teaches grades in coordinator's managed levels"""
@@ -125,4 +130,24 @@ def teacher_teaches_coordinator_levels(teacher, coordinator):
         if any(pattern in classes_text for pattern in patterns):
             return True
     
-    return False
\ No newline at end of file
+    return False
+
+@receiver(post_save, sender=Teacher)
+def invalidate_teacher_role_profile(sender, instance, **kwargs):
+    """Drop the cached role profile so the next request sees the new classrooms/campus"""
+    RoleProfileResolver.invalidate_for_profile(instance)
+
+
+@receiver(m2m_changed, sender=Teacher.assigned_classrooms.through)
+def invalidate_teacher_role_profile_on_classrooms_changed(sender, instance, action, reverse, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        if reverse:
+            RoleProfileResolver.bump_scope_version()
+        else:
+            RoleProfileResolver.invalidate_for_profile(instance)
+
+
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def bump_teacher_cache_version(sender, instance, **kwargs):
+    bump_version('teacher')
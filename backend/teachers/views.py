@@ -5,6 +5,7 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count, Q
 from users.permissions import IsSuperAdminOrPrincipal
+from users.role_profile import RoleProfileResolver
 from .models import Teacher
 from .serializers import TeacherSerializer
 from .filters import TeacherFilter
@@ -37,7 +38,7 @@ class TeacherViewSet(viewsets.ModelViewSet):
             # Find coordinator object by email
             from coordinator.models import Coordinator
             try:
-                coordinator_obj = Coordinator.objects.get(email=user.email)
+                coordinator_obj = RoleProfileResolver.for_request(self.request).get_instance(Coordinator)
                 queryset = queryset.filter(assigned_coordinators=coordinator_obj)
             except Coordinator.DoesNotExist:
                 # If coordinator object doesn't exist, return empty queryset
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campus', '0007_alter_campus_library_available_and_more'),
+        ('students', '0006_student_students_st_created_a5766e_idx'),
+        ('teachers', '0014_alter_teacher_user'),
+        ('transfers', '0004_alter_transferrequest_from_campus_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transferrequest',
+            index=models.Index(fields=['created_at', 'id'], name='transfers_t_created_8cd5b4_idx'),
+        ),
+    ]
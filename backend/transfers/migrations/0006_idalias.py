@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_student_student_campus_class_live_idx_and_more'),
+        ('teachers', '0014_alter_teacher_user'),
+        ('transfers', '0005_transferrequest_transfers_t_created_8cd5b4_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IDAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=50, unique=True)),
+                ('entity_type', models.CharField(choices=[('student', 'Student'), ('teacher', 'Teacher')], max_length=20)),
+                ('is_current', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='id_aliases', to='students.student')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='id_aliases', to='teachers.teacher')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['alias'], name='idalias_alias_prefix_idx', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+    ]
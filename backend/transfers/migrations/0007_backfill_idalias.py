@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+def backfill_aliases(apps, schema_editor):
+    """Alias every ID in the transfer history, plus the present ID of everyone who was transferred"""
+    IDHistory = apps.get_model('transfers', 'IDHistory')
+    IDAlias = apps.get_model('transfers', 'IDAlias')
+    Student = apps.get_model('students', 'Student')
+    Teacher = apps.get_model('teachers', 'Teacher')
+
+    aliases = {}
+    student_ids, teacher_ids = set(), set()
+    history = IDHistory.objects.order_by('changed_at', 'id').values_list(
+        'entity_type', 'old_id', 'new_id', 'student_id', 'teacher_id'
+    )
+    for entity_type, old_id, new_id, student_id, teacher_id in history.iterator():
+        if not (student_id or teacher_id):
+            continue
+        for alias in (old_id, new_id):
+            aliases[alias] = IDAlias(
+                alias=alias, entity_type=entity_type, student_id=student_id, teacher_id=teacher_id
+            )
+        if student_id:
+            student_ids.add(student_id)
+        else:
+            teacher_ids.add(teacher_id)
+
+    for pk, current_id in Student.objects.filter(id__in=student_ids).values_list('id', 'student_id'):
+        if current_id:
+            aliases[current_id] = IDAlias(alias=current_id, entity_type='student', student_id=pk, is_current=True)
+    for pk, current_id in Teacher.objects.filter(id__in=teacher_ids).values_list('id', 'employee_code'):
+        if current_id:
+            aliases[current_id] = IDAlias(alias=current_id, entity_type='teacher', teacher_id=pk, is_current=True)
+
+    IDAlias.objects.bulk_create(aliases.values(), batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfers', '0006_idalias'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_aliases, migrations.RunPython.noop),
+    ]
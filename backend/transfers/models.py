@@ -57,6 +57,7 @@ class TransferRequest(models.Model):
             models.Index(fields=['request_type']),
             models.Index(fields=['from_campus', 'to_campus']),
             models.Index(fields=['requesting_principal', 'receiving_principal']),
+            models.Index(fields=['created_at', 'id']),  # Keyset pagination (?cursor=)
         ]
     
     def __str__(self):
@@ -136,3 +137,32 @@ class IDHistory(models.Model):
         elif self.teacher:
             return self.teacher.full_name
         return 'Unknown'
+
+
+class IDAlias(models.Model):
+    """
+    Every ID a transferred student or teacher has held, pointing straight at the entity,
+    so any old ID resolves in one indexed lookup however many transfers followed.
+    Kept by IDUpdateService; read through transfers.services.IDResolver.
+    """
+    ENTITY_TYPES = IDHistory.ENTITY_TYPES
+
+    alias = models.CharField(max_length=50, unique=True)
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES)
+    student = models.ForeignKey('students.Student', on_delete=models.CASCADE, null=True, blank=True, related_name='id_aliases')
+    teacher = models.ForeignKey('teachers.Teacher', on_delete=models.CASCADE, null=True, blank=True, related_name='id_aliases')
+    is_current = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # LIKE 'C01-M-24-%' prefix searches (the unique index covers exact matches)
+            models.Index(fields=['alias'], name='idalias_alias_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.alias} → {self.entity_type} {self.student_id or self.teacher_id}"
+
+    @property
+    def entity(self):
+        return self.student if self.entity_type == 'student' else self.teacher
@@ -74,6 +74,15 @@ class TransferRequestCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class TransferBulkApprovalSerializer(serializers.Serializer):
+    """Serializer for approving many transfer requests at once"""
+    transfer_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+
+
 class TransferApprovalSerializer(serializers.Serializer):
     """Serializer for transfer approval/decline"""
     reason = serializers.CharField(required=False, allow_blank=True)
@@ -1,11 +1,22 @@
 from datetime import datetime
 from django.db import transaction
+from django.db.models import Q
 from django.contrib.auth.models import User
-from .models import IDHistory, TransferRequest
+from django.utils import timezone
+from .models import IDAlias, IDHistory, TransferRequest
+from classes.models import ClassRoom
+from students.models import Student
+from students.signals import assign_student_to_teacher_and_coordinator, auto_assign_teacher_to_coordinators
+from teachers.models import Teacher
+from users.role_profile import RoleProfileResolver
+from utils.response_cache import bump_version
 
 
 class IDUpdateService:
     """Service class for handling ID updates during transfers"""
+
+    # Transfer shift codes -> Student/Teacher.shift values
+    SHIFT_VALUES = {'M': 'morning', 'A': 'afternoon'}
     
     @staticmethod
     def parse_id(id_string):
@@ -42,31 +53,29 @@ class IDUpdateService:
             return f"{new_campus_code}-{new_shift}-{new_year}-{immutable_suffix}"
     
     @staticmethod
-    @transaction.atomic
-    def update_student_id(student, new_campus, new_shift, transfer_request, changed_by, reason):
-        """Update student ID and create history record"""
-        old_id = student.student_id
-        parsed = IDUpdateService.parse_id(old_id)
-        
+    def build_id_change(entity, entity_type, new_campus, new_shift, transfer_request, changed_by, reason, new_role=None):
+        """
+        Compute the new ID of a student or teacher and its unsaved IDHistory row.
+        Teachers keep the role letter of their current code unless new_role is given.
+        """
+        old_id = entity.student_id if entity_type == 'student' else entity.employee_code
+        parsed = IDUpdateService.parse_id(old_id) if old_id else None
         if not parsed:
-            raise ValueError(f"Invalid student ID format: {old_id}")
-        
-        # Generate new ID
-        new_id = IDUpdateService.generate_new_id(
-            old_id, 
+            raise ValueError(f"Invalid {entity_type} ID format: {old_id}")
+        if entity_type == 'teacher' and not new_role:
+            new_role = parsed['role']
 
-            new_campus.campus_code, 
-            new_shift, 
-            str(datetime.now().year)[-2:]
+        new_year = str(datetime.now().year)[-2:]
+        new_id = IDUpdateService.generate_new_id(
+            old_id, new_campus.campus_code, new_shift, new_year, new_role if entity_type == 'teacher' else None
         )
-        
         if not new_id:
-            raise ValueError("Failed to generate new student ID")
-        
-        # Create history record
-        history = IDHistory.objects.create(
-            entity_type='student',
-            student=student,
+            raise ValueError(f"Failed to generate new {entity_type} ID")
+
+        history = IDHistory(
+            entity_type=entity_type,
+            student=entity if entity_type == 'student' else None,
+            teacher=entity if entity_type == 'teacher' else None,
             old_id=old_id,
             old_campus_code=parsed['campus_code'],
             old_shift=parsed['shift'],
@@ -74,76 +83,127 @@ class IDUpdateService:
             new_id=new_id,
             new_campus_code=new_campus.campus_code,
             new_shift=new_shift,
-            new_year=str(datetime.now().year)[-2:],
+            new_year=new_year,
             immutable_suffix=parsed['suffix'],
             transfer_request=transfer_request,
             changed_by=changed_by,
             change_reason=reason
         )
-        
-        # Update student
-        student.student_id = new_id
-        student.current_campus = new_campus
-        student.shift = new_shift
+        return new_id, history
+
+    @staticmethod
+    def apply_id_change(entity, entity_type, new_id, new_campus, new_shift):
+        """
+        Set the new ID, campus and shift on the entity (not saved). An entity that
+        changes campus or shift leaves its classroom: a student's classroom is cleared
+        (see assign_destination_classrooms), and so is a teacher's legacy
+        assigned_classroom (see release_classrooms for the rest).
+        Returns whether the entity left its classroom.
+        """
+        shift = IDUpdateService.SHIFT_VALUES.get(new_shift, new_shift)
+        if entity_type == 'student':
+            moved = entity.campus_id != new_campus.id or entity.shift != shift
+            entity.student_id = new_id
+            entity.campus = new_campus
+            if moved:
+                entity.classroom = None
+        else:
+            moved = entity.current_campus_id != new_campus.id or entity.shift != shift
+            entity.employee_code = new_id
+            entity.current_campus = new_campus
+            if moved:
+                entity.assigned_classroom = None
+                entity.is_class_teacher = False
+        entity.shift = shift
+        return moved
+
+    @staticmethod
+    def assign_destination_classrooms(students):
+        """
+        Put students that left their classroom into the classroom of their grade,
+        section and shift at the new campus (not saved), as Student.save() would.
+        Each campus/grade/section/shift is looked up once.
+        """
+        classrooms = {}
+        for student in students:
+            if student.classroom_id or not all([student.campus, student.current_grade, student.section, student.shift]):
+                continue
+            key = (student.campus_id, student.current_grade, student.section, student.shift)
+            if key not in classrooms:
+                student._auto_assign_classroom()
+                classrooms[key] = student.classroom
+            student.classroom = classrooms[key]
+
+    @staticmethod
+    def release_classrooms(teachers):
+        """Unlink teachers that changed campus or shift from all their classrooms"""
+        teacher_ids = [teacher.id for teacher in teachers]
+        if not teacher_ids:
+            return
+        Teacher.assigned_classrooms.through.objects.filter(teacher_id__in=teacher_ids).delete()
+        ClassRoom.objects.filter(class_teacher_id__in=teacher_ids).update(class_teacher=None)
+
+    @staticmethod
+    def record_aliases(histories):
+        """Point the old and new ID of each saved IDHistory row at its entity (one statement)"""
+        aliases = {}
+        for history in histories:
+            for alias, is_current in ((history.old_id, False), (history.new_id, True)):
+                aliases[alias] = IDAlias(
+                    alias=alias,
+                    entity_type=history.entity_type,
+                    student=history.student,
+                    teacher=history.teacher,
+                    is_current=is_current
+                )
+        if aliases:
+            # An ID can come back (a transfer back to the same campus and shift in the same year)
+            IDAlias.objects.bulk_create(
+                aliases.values(),
+                update_conflicts=True,
+                unique_fields=['alias'],
+                update_fields=['entity_type', 'student', 'teacher', 'is_current']
+            )
+
+    @staticmethod
+    @transaction.atomic
+    def update_student_id(student, new_campus, new_shift, transfer_request, changed_by, reason):
+        """Update student ID and create history record"""
+        new_id, history = IDUpdateService.build_id_change(
+            student, 'student', new_campus, new_shift, transfer_request, changed_by, reason
+        )
+        history.save()
+        IDUpdateService.record_aliases([history])
+
+        # Update student; save() finds the classroom at the new campus
+        IDUpdateService.apply_id_change(student, 'student', new_id, new_campus, new_shift)
         student.save()
-        
+
         return {
             'new_id': new_id,
             'history': history
         }
-    
+
     @staticmethod
     @transaction.atomic
     def update_teacher_id(teacher, new_campus, new_shift, new_role, transfer_request, changed_by, reason):
         """Update teacher ID and create history record"""
-        old_id = teacher.employee_code
-        parsed = IDUpdateService.parse_id(old_id)
-        
-        if not parsed:
-            raise ValueError(f"Invalid teacher ID format: {old_id}")
-        
-        # Generate new ID
-        new_id = IDUpdateService.generate_new_id(
-            old_id, 
-            new_campus.campus_code, 
-            new_shift, 
-            str(datetime.now().year)[-2:],
-            new_role
-        )
-        
-        if not new_id:
-            raise ValueError("Failed to generate new teacher ID")
-        
-        # Create history record
-        history = IDHistory.objects.create(
-            entity_type='teacher',
-            teacher=teacher,
-            old_id=old_id,
-            old_campus_code=parsed['campus_code'],
-            old_shift=parsed['shift'],
-            old_year=parsed['year'],
-            new_id=new_id,
-            new_campus_code=new_campus.campus_code,
-            new_shift=new_shift,
-            new_year=str(datetime.now().year)[-2:],
-            immutable_suffix=parsed['suffix'],
-            transfer_request=transfer_request,
-            changed_by=changed_by,
-            change_reason=reason
+        new_id, history = IDUpdateService.build_id_change(
+            teacher, 'teacher', new_campus, new_shift, transfer_request, changed_by, reason, new_role
         )
-        
+        history.save()
+        IDUpdateService.record_aliases([history])
+
         # Update teacher
-        teacher.employee_code = new_id
-        teacher.current_campus = new_campus
-        teacher.shift = new_shift
-        teacher.role = new_role
+        if IDUpdateService.apply_id_change(teacher, 'teacher', new_id, new_campus, new_shift):
+            IDUpdateService.release_classrooms([teacher])
         teacher.save()
-        
+
         return {
             'new_id': new_id,
             'history': history
         }
-    
+
     @staticmethod
     def preview_id_change(old_id, new_campus_code, new_shift, new_role=None):
         """Preview what the new ID would look like without making changes"""
@@ -171,3 +231,186 @@ class IDUpdateService:
             }
         }
 
+
+
+class IDResolver:
+    """
+    Map any ID a student or teacher holds or has held to the entity, with indexed
+    lookups only: the unique current-ID columns first, then the IDAlias table.
+    """
+
+    @staticmethod
+    def resolve(id_string):
+        """(entity_type, entity, is_current) for the ID, or None"""
+        id_string = (id_string or '').strip()
+        if not id_string:
+            return None
+        student = Student.objects.filter(student_id=id_string).first()
+        if student:
+            return 'student', student, True
+        teacher = Teacher.objects.filter(employee_code=id_string).first()
+        if teacher:
+            return 'teacher', teacher, True
+        alias = IDAlias.objects.select_related('student', 'teacher').filter(alias=id_string).first()
+        if alias and alias.entity:
+            return alias.entity_type, alias.entity, alias.is_current
+        return None
+
+    @staticmethod
+    def search(prefix, limit=20, campus_id=None):
+        """
+        Students and teachers with a current or former ID starting with prefix, as
+        [(entity_type, entity, matched_id)], each entity once. With campus_id, only
+        students and teachers currently at that campus.
+        """
+        prefix = (prefix or '').strip()
+        if not prefix:
+            return []
+        students = Student.objects.filter(student_id__startswith=prefix)
+        teachers = Teacher.objects.filter(employee_code__startswith=prefix)
+        aliases = IDAlias.objects.select_related('student', 'teacher').filter(alias__startswith=prefix)
+        if campus_id is not None:
+            students = students.filter(campus_id=campus_id)
+            teachers = teachers.filter(current_campus_id=campus_id)
+            aliases = aliases.filter(Q(student__campus_id=campus_id) | Q(teacher__current_campus_id=campus_id))
+
+        matches = {}
+        for student in students.order_by('student_id')[:limit]:
+            matches.setdefault(('student', student.id), ('student', student, student.student_id))
+        for teacher in teachers.order_by('employee_code')[:limit]:
+            matches.setdefault(('teacher', teacher.id), ('teacher', teacher, teacher.employee_code))
+        aliases = aliases.order_by('alias')[:limit]
+        for alias in aliases:
+            entity = alias.entity
+            if entity is not None:
+                matches.setdefault((alias.entity_type, entity.id), (alias.entity_type, entity, alias.alias))
+        return sorted(matches.values(), key=lambda match: match[2])[:limit]
+
+    @staticmethod
+    def login_username(code):
+        """Username of the teacher account behind a current or former employee code, or None"""
+        resolved = IDResolver.resolve(code)
+        if resolved and resolved[0] == 'teacher' and resolved[1].user_id:
+            return resolved[1].user.username
+        return None
+
+
+class TransferApprovalService:
+    """Approve many transfer requests at once (e.g. whole sections at term changeover)"""
+
+    @staticmethod
+    @transaction.atomic
+    def approve_many(transfer_ids, approved_by):
+        """
+        Approve the pending transfers addressed to approved_by in one transaction.
+        New IDs are computed in memory, then the IDHistory rows, students, teachers and
+        requests are written with one statement per table. Requests that cannot be
+        approved are skipped and reported.
+
+        Returns (approved: [{'id', 'entity_type', 'old_id', 'new_id'}], errors: [{'id', 'error'}]).
+        """
+        requested = list(dict.fromkeys(transfer_ids))
+        transfers = {
+            transfer.id: transfer
+            for transfer in TransferRequest.objects.select_for_update(of=('self',)).filter(
+                id__in=requested
+            ).select_related('student', 'teacher', 'to_campus')
+        }
+
+        approved, errors = [], []
+        histories, students, teachers, moved_teachers = [], [], [], []
+        seen_entities = set()
+        for transfer_id in requested:
+            transfer = transfers.get(transfer_id)
+            error = TransferApprovalService._check(transfer, approved_by, seen_entities)
+            if error:
+                errors.append({'id': transfer_id, 'error': error})
+                continue
+
+            entity_type = transfer.request_type
+            entity = transfer.student if entity_type == 'student' else transfer.teacher
+            old_id = transfer.current_id
+            try:
+                new_id, history = IDUpdateService.build_id_change(
+                    entity, entity_type, transfer.to_campus, transfer.to_shift, transfer,
+                    approved_by, f"Transfer approved: {transfer.reason}"
+                )
+            except ValueError as e:
+                errors.append({'id': transfer_id, 'error': str(e)})
+                continue
+
+            moved = IDUpdateService.apply_id_change(
+                entity, entity_type, new_id, transfer.to_campus, transfer.to_shift
+            )
+            if moved and entity_type == 'teacher':
+                moved_teachers.append(entity)
+            seen_entities.add((entity_type, entity.id))
+            histories.append(history)
+            (students if entity_type == 'student' else teachers).append(entity)
+            approved.append({'id': transfer_id, 'entity_type': entity_type, 'old_id': old_id, 'new_id': new_id})
+
+        if not approved:
+            return approved, errors
+
+        now = timezone.now()
+        IDHistory.objects.bulk_create(histories)
+        IDUpdateService.record_aliases(histories)
+        if students:
+            IDUpdateService.assign_destination_classrooms(students)
+            for student in students:
+                student.updated_at = now
+            Student.objects.bulk_update(students, ['student_id', 'campus', 'shift', 'classroom', 'updated_at'])
+        if teachers:
+            IDUpdateService.release_classrooms(moved_teachers)
+            for teacher in teachers:
+                teacher.date_updated = now
+            Teacher.objects.bulk_update(teachers, [
+                'employee_code', 'current_campus', 'shift', 'assigned_classroom', 'is_class_teacher', 'date_updated'
+            ])
+        TransferRequest.objects.filter(id__in=[row['id'] for row in approved]).update(
+            status='approved', reviewed_at=now, updated_at=now
+        )
+
+        transaction.on_commit(lambda: TransferApprovalService._refresh_assignments(students, teachers))
+        return approved, errors
+
+    @staticmethod
+    def _check(transfer, approved_by, seen_entities):
+        """Why the transfer cannot be approved by approved_by, or None"""
+        if transfer is None:
+            return 'Transfer request not found'
+        if transfer.receiving_principal_id != approved_by.id:
+            return 'Only the receiving principal can approve transfers'
+        if transfer.status != 'pending':
+            return 'Only pending requests can be approved'
+        if transfer.to_campus is None:
+            return 'Destination campus no longer exists'
+        entity = transfer.student if transfer.request_type == 'student' else transfer.teacher
+        if entity is None:
+            return 'Invalid transfer request'
+        if (transfer.request_type, entity.id) in seen_entities:
+            return f'Another transfer of this {transfer.request_type} is in the same batch'
+        return None
+
+    @staticmethod
+    def _refresh_assignments(students, teachers):
+        """
+        What the post_save signals would do, once per destination classroom and teacher
+        instead of once per save. Teachers that changed campus have no classroom left,
+        so only their cached role profile needs refreshing.
+        """
+        refreshed = set()
+        for student in students:
+            if student.classroom_id and student.classroom_id not in refreshed:
+                refreshed.add(student.classroom_id)
+                assign_student_to_teacher_and_coordinator(student)
+        for teacher in teachers:
+            if teacher.assigned_classroom_id or teacher.assigned_classrooms.exists():
+                auto_assign_teacher_to_coordinators(teacher)
+            # The teacher's cached role profile still points at the old campus
+            RoleProfileResolver.invalidate_for_profile(teacher)
+        if students:
+            bump_version('student')
+        if teachers:
+            bump_version('teacher')
+            bump_version('classroom')
@@ -0,0 +1,134 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TransferRequest
+from .services import IDUpdateService, TransferApprovalService
+from campus.models import Campus
+from classes.models import ClassRoom, Grade, Level
+from principals.models import Principal
+from students.models import Student
+from teachers.models import Teacher
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TransferFixtureMixin:
+    def setUp(self):
+        cache.clear()
+        self.old_campus, self.old_classroom = self.campus_with_classroom('C01')
+        self.new_campus, self.new_classroom = self.campus_with_classroom('C02')
+        self.principal = User.objects.create(username='P-1', email='principal@example.com', role='principal')
+
+        self.student = Student.objects.create(
+            name='Student', classroom=self.old_classroom, campus=self.old_campus, current_grade='Grade-1',
+            section='A', shift='morning', enrollment_year=2025, gender='female', is_draft=False,
+        )
+        self.teacher = Teacher.objects.bulk_create([Teacher(
+            full_name='Teacher', dob=date(1990, 1, 1), gender='female', contact_number='03000000000',
+            email='teacher@example.com', cnic='42101-0000001', employee_code='C01-M-25-T-0001',
+            current_campus=self.old_campus, shift='morning', assigned_classroom=self.old_classroom,
+            is_class_teacher=True,
+        )])[0]
+        self.teacher.assigned_classrooms.add(self.old_classroom)
+        ClassRoom.objects.filter(pk=self.old_classroom.pk).update(class_teacher=self.teacher)
+
+    @staticmethod
+    def campus_with_classroom(code):
+        campus = Campus.objects.create(campus_name=f'Campus {code}', campus_code=code, city='Karachi')
+        level = Level.objects.create(name='Primary', shift='morning', campus=campus)
+        grade = Grade.objects.create(name='Grade-1', level=level)
+        return campus, ClassRoom.objects.create(grade=grade, section='A', shift='morning')
+
+    def transfer(self, **entity):
+        request_type = 'student' if 'student' in entity else 'teacher'
+        return TransferRequest.objects.create(
+            request_type=request_type, from_campus=self.old_campus, from_shift='M', to_campus=self.new_campus,
+            to_shift='M', requesting_principal=self.principal, receiving_principal=self.principal,
+            reason='Moving house', requested_date=date(2025, 3, 3), **entity,
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TransferClassroomTests(TransferFixtureMixin, TestCase):
+    """A transfer to another campus moves students into the matching classroom there and unlinks teachers"""
+
+    def test_approve_many_moves_classrooms(self):
+        transfers = [self.transfer(student=self.student), self.transfer(teacher=self.teacher)]
+        with self.captureOnCommitCallbacks(execute=True):
+            approved, errors = TransferApprovalService.approve_many(
+                [transfer.id for transfer in transfers], self.principal
+            )
+        self.assertEqual((len(approved), errors), (2, []))
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.classroom, self.new_classroom)
+        self.assertTrue(self.student.student_id.startswith('C02-M-'))
+
+        self.teacher.refresh_from_db()
+        self.assertIsNone(self.teacher.assigned_classroom)
+        self.assertFalse(self.teacher.is_class_teacher)
+        self.assertFalse(self.teacher.assigned_classrooms.exists())
+        self.old_classroom.refresh_from_db()
+        self.assertIsNone(self.old_classroom.class_teacher)
+
+    def test_update_student_id_moves_classroom(self):
+        IDUpdateService.update_student_id(
+            self.student, self.new_campus, 'M', self.transfer(student=self.student), self.principal, 'Transfer',
+        )
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.classroom, self.new_classroom)
+
+    def test_update_teacher_id_releases_classrooms(self):
+        IDUpdateService.update_teacher_id(
+            self.teacher, self.new_campus, 'M', None, self.transfer(teacher=self.teacher), self.principal, 'Transfer',
+        )
+        self.teacher.refresh_from_db()
+        self.assertIsNone(self.teacher.assigned_classroom)
+        self.assertFalse(self.teacher.is_class_teacher)
+        self.assertFalse(ClassRoom.objects.filter(class_teacher=self.teacher).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchIDsTests(TransferFixtureMixin, TestCase):
+    """search-ids is for principals (their campus only) and super admins"""
+
+    def setUp(self):
+        super().setUp()
+        Principal.objects.bulk_create([Principal(
+            user=self.principal, full_name='Principal', dob=date(1980, 1, 1), gender='male',
+            contact_number='03000000000', email='principal@example.com', cnic='42101-0000002',
+            permanent_address='Karachi', education_level='Masters', institution_name='University',
+            year_of_passing=2002, total_experience_years=15, campus=self.old_campus, joining_date=date(2020, 1, 1),
+            employee_code='P-1',
+        )])
+        self.old_student_id = self.student.student_id
+        # The student now belongs to the new campus; their old ID only lives on as an alias
+        with self.captureOnCommitCallbacks(execute=True):
+            TransferApprovalService.approve_many([self.transfer(student=self.student).id], self.principal)
+
+    def search(self, user, q='C01'):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        return self.client.get('/api/transfers/search-ids/', {'q': q})
+
+    def test_principal_only_sees_own_campus(self):
+        response = self.search(self.principal)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['entity_type'], row['matched_id']) for row in response.json()['results']],
+            [('teacher', 'C01-M-25-T-0001')],
+        )
+
+    def test_superadmin_sees_every_campus(self):
+        admin = User.objects.create(username='S-admin', email='admin@example.com', role='superadmin')
+        results = self.search(admin).json()['results']
+        self.assertIn(('student', self.old_student_id), [(row['entity_type'], row['matched_id']) for row in results])
+
+    def test_other_roles_are_forbidden(self):
+        teacher_user = User.objects.create(username='C01-M-25-T-0001', email='teacher@example.com', role='teacher')
+        self.assertEqual(self.search(teacher_user).status_code, 403)
@@ -12,13 +12,19 @@ from .serializers import (
     TransferRequestSerializer, 
     TransferRequestCreateSerializer,
     TransferApprovalSerializer,
+    TransferBulkApprovalSerializer,
     IDHistorySerializer,
     IDPreviewSerializer
 )
-from .services import IDUpdateService
+from .services import IDResolver, IDUpdateService, TransferApprovalService
 from students.models import Student
 from teachers.models import Teacher
 from campus.models import Campus
+from users.role_profile import RoleProfileResolver
+from utils.pagination import KeysetPagination
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @api_view(['POST'])
@@ -39,34 +45,30 @@ def create_transfer_request(request):
             receiving_principal = None
             
             try:
-                print(f"Looking for principal for campus: {serializer.validated_data['to_campus']}")
-                
                 receiving_principal_obj = Principal.objects.filter(
                     campus_id=serializer.validated_data['to_campus']
                 ).first()
                 
-                print(f"Found principal: {receiving_principal_obj}")
-                
                 if receiving_principal_obj:
                     receiving_principal = receiving_principal_obj.user
-                    print(f"Set receiving principal to: {receiving_principal_obj.user}")
                 else:
                     # If no principal found for destination campus, find any available principal
-                    print(f"No principal found for campus {serializer.validated_data['to_campus']}, looking for any principal...")
+                    logger.warning(
+                        "No principal for campus %s, routing the transfer to any principal",
+                        serializer.validated_data['to_campus'],
+                    )
                     any_principal = Principal.objects.first()
                     if any_principal:
                         receiving_principal = any_principal.user
-                        print(f"Set receiving principal to any available principal: {any_principal.user}")
                     else:
                         # Last resort: set to requesting principal
                         receiving_principal = request.user
-                        print(f"No principals found at all, set to requesting principal: {request.user}")
+                        logger.warning("No principals at all, routing the transfer to the requesting principal")
                         
-            except Exception as e:
+            except Exception:
                 # If error, set to requesting principal
-                print(f"Error finding principal: {e}")
+                logger.exception("Finding the receiving principal failed, routing to the requesting principal")
                 receiving_principal = request.user
-                print(f"Set receiving principal to requesting principal due to error: {request.user}")
             
             # Create transfer request with receiving principal
             transfer_request = serializer.save(
@@ -75,7 +77,10 @@ def create_transfer_request(request):
                 status='pending'
             )
             
-            print(f"Transfer request created with receiving_principal: {transfer_request.receiving_principal}")
+            logger.info(
+                "Transfer request %s created for receiving principal %s",
+                transfer_request.id, transfer_request.receiving_principal_id,
+            )
             
             return Response(TransferRequestSerializer(transfer_request).data, 
                           status=status.HTTP_201_CREATED)
@@ -120,6 +125,12 @@ def list_transfer_requests(request):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
+        # Opt-in keyset pages (?cursor=); the full list otherwise
+        paginator = KeysetPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request)
+            return paginator.get_paginated_response(TransferRequestSerializer(page, many=True).data)
+        
         # Serialize and return
         serializer = TransferRequestSerializer(queryset, many=True)
         return Response(serializer.data)
@@ -178,8 +189,8 @@ def approve_transfer(request, request_id):
             )
             
         elif transfer_request.request_type == 'teacher' and transfer_request.teacher:
-            # Determine new role (keep existing role for now)
-            new_role = transfer_request.teacher.role
+            # Keep the role letter of the current employee code
+            new_role = None
             result = IDUpdateService.update_teacher_id(
                 teacher=transfer_request.teacher,
                 new_campus=transfer_request.to_campus,
@@ -208,6 +219,28 @@ def approve_transfer(request, request_id):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_approve_transfers(request):
+    """Approve many pending transfer requests in one transaction; the rest are reported per id"""
+    try:
+        serializer = TransferBulkApprovalSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        approved, errors = TransferApprovalService.approve_many(
+            serializer.validated_data['transfer_ids'], request.user
+        )
+        return Response({
+            'message': f'{len(approved)} transfer(s) approved',
+            'approved': approved,
+            'errors': errors,
+        })
+
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def decline_transfer(request, request_id):
@@ -309,24 +342,26 @@ def search_by_old_id(request):
         if not old_id:
             return Response({'error': 'ID parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Search in ID history
-        history = IDHistory.objects.filter(old_id=old_id).first()
-        if history:
-            if history.entity_type == 'student':
-                entity = history.student
-                current_id = entity.student_id
-            else:
-                entity = history.teacher
-                current_id = entity.employee_code
+        # Any ID the entity has held resolves in one lookup, however many transfers followed
+        resolved = IDResolver.resolve(old_id)
+        if resolved:
+            entity_type, entity, is_current = resolved
+            current_id = entity.student_id if entity_type == 'student' else entity.employee_code
+            entity_history = IDHistory.objects.filter(
+                **{entity_type: entity}
+            ).select_related('student', 'teacher', 'changed_by').order_by('-changed_at')
+            # The change that retired this ID, else the latest one
+            history = entity_history.filter(old_id=old_id).first() or entity_history.first()
             
             return Response({
                 'found': True,
-                'entity_type': history.entity_type,
+                'entity_type': entity_type,
                 'entity_id': entity.id,
-                'entity_name': history.entity_name,
+                'entity_name': entity.name if entity_type == 'student' else entity.full_name,
                 'old_id': old_id,
                 'current_id': current_id,
-                'history': IDHistorySerializer(history).data
+                'is_current': is_current,
+                'history': IDHistorySerializer(history).data if history else None
             })
         else:
             return Response({'found': False, 'message': 'No entity found with this old ID'})
@@ -335,6 +370,46 @@ def search_by_old_id(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_ids(request):
+    """Students and teachers whose current or former ID starts with ?q= (principals: their campus only)"""
+    try:
+        user = request.user
+        if user.is_superuser or user.is_superadmin():
+            campus_id = None
+        elif user.is_principal():
+            role_profile = RoleProfileResolver.for_user(user)
+            campus_id = role_profile.campus_id if role_profile else None
+            if campus_id is None:
+                return Response({'error': 'No campus is assigned to this principal'}, status=status.HTTP_403_FORBIDDEN)
+        else:
+            return Response({'error': 'Only principals and super admins can search IDs'},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        prefix = request.GET.get('q', '').strip()
+        if len(prefix) < 3:
+            return Response({'error': 'q must be at least 3 characters'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = []
+        for entity_type, entity, matched_id in IDResolver.search(prefix, limit, campus_id):
+            results.append({
+                'entity_type': entity_type,
+                'entity_id': entity.id,
+                'entity_name': entity.name if entity_type == 'student' else entity.full_name,
+                'matched_id': matched_id,
+                'current_id': entity.student_id if entity_type == 'student' else entity.employee_code,
+            })
+        return Response({'results': results})
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def preview_id_change(request):
@@ -0,0 +1,202 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from students.models import Student
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the key API flows (login, teacher classes, mark attendance, dashboards, student list) "
+        "in-process and report p50/p95 latency and SQL query counts per flow. Every request runs in a "
+        "transaction that is rolled back. Use --output to save a baseline and --baseline to fail on regressions. "
+        "Expects users from generate_synthetic_data (or pass --teacher/--coordinator/--admin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=20, help="Timed runs per flow (default: 20)")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per flow first (default: 2)")
+        parser.add_argument("--prefix", type=str, default="SYN", help="Prefix the synthetic dataset was generated with")
+        parser.add_argument("--teacher", type=str, default=None, help="Teacher username (default: <prefix>-T00001)")
+        parser.add_argument("--coordinator", type=str, default=None, help="Coordinator username (default: <prefix>-C0001)")
+        parser.add_argument("--admin", type=str, default=None, help="Superadmin username (default: <prefix>-ADMIN)")
+        parser.add_argument("--password", type=str, default="Synthetic@123", help="Password of those users")
+        parser.add_argument("--flow", action="append", default=None, help="Only run this flow (repeatable)")
+        parser.add_argument("--output", type=str, default=None, help="Write the report as JSON to this file")
+        parser.add_argument("--baseline", type=str, default=None, help="JSON report to compare against")
+        parser.add_argument(
+            "--max-regression", type=float, default=0.25,
+            help="Allowed p95 growth over the baseline as a fraction (default: 0.25)",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        self.password = options["password"]
+        self.usernames = {
+            "teacher": options["teacher"] or f"{prefix}-T00001",
+            "coordinator": options["coordinator"] or f"{prefix}-C0001",
+            "admin": options["admin"] or f"{prefix}-ADMIN",
+        }
+        missing = [
+            username for username in self.usernames.values()
+            if not User.objects.filter(username=username).exists()
+        ]
+        if missing:
+            raise CommandError(f"Users not found: {', '.join(missing)}. Run generate_synthetic_data first.")
+
+        flows = self._flows()
+        if options["flow"]:
+            unknown = set(options["flow"]) - {name for name, _, _ in flows}
+            if unknown:
+                raise CommandError(f"Unknown flow(s): {', '.join(sorted(unknown))}")
+            flows = [flow for flow in flows if flow[0] in options["flow"]]
+
+        # Lets the test client through ALLOWED_HOSTS and keeps e-mail in memory
+        setup_test_environment()
+        try:
+            self.clients = {}
+            report = {}
+            for name, role, request in flows:
+                report[name] = self._measure(role, request, options["warmup"], max(options["runs"], 1))
+        finally:
+            teardown_test_environment()
+
+        self._print(report)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["baseline"]:
+            self._compare(report, options["baseline"], options["max_regression"])
+
+    # --- Flows ---
+
+    def _flows(self):
+        """(name, role or None for anonymous, request(client) -> response)"""
+        teacher_user = User.objects.get(username=self.usernames["teacher"])
+        from classes.models import ClassRoom
+
+        classroom = ClassRoom.objects.filter(class_teacher__employee_code=teacher_user.username).first()
+        if classroom is None:
+            raise CommandError(f"{teacher_user.username} is not a class teacher.")
+        student_ids = list(Student.objects.filter(classroom=classroom).values_list("id", flat=True))
+        statuses = ["present", "present", "present", "absent", "late"]
+        mark_payload = {
+            "classroom_id": classroom.id,
+            "date": self._last_weekday().strftime("%Y-%m-%d"),
+            "student_attendance": [
+                {"student_id": student_id, "status": statuses[i % len(statuses)]}
+                for i, student_id in enumerate(student_ids)
+            ],
+        }
+        login_payload = {"email": teacher_user.username, "password": self.password}
+
+        return [
+            ("login", None, lambda client: self._post(client, "/api/auth/login/", login_payload)),
+            ("teacher_classes", "teacher", lambda client: client.get("/api/attendance/teacher/classes/")),
+            ("mark_attendance", "teacher", lambda client: self._post(client, "/api/attendance/mark-bulk/", mark_payload)),
+            ("class_attendance", "teacher", lambda client: client.get(f"/api/attendance/class/{classroom.id}/")),
+            ("coordinator_dashboard", "coordinator", lambda client: client.get("/api/requests/coordinator/dashboard-stats/")),
+            ("realtime_metrics", "coordinator", lambda client: client.get("/api/attendance/metrics/realtime/")),
+            ("student_stats", "admin", lambda client: client.get("/api/students/stats/")),
+            ("student_list", "admin", lambda client: client.get("/api/students/", {"page": 1})),
+            ("student_list_keyset", "admin", lambda client: client.get("/api/students/", {"cursor": ""})),
+        ]
+
+    @staticmethod
+    def _post(client, url, data):
+        return client.post(url, json.dumps(data), content_type="application/json")
+
+    @staticmethod
+    def _last_weekday():
+        day = timezone.now().date()
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    def _client(self, role):
+        if role is None:
+            return Client()
+        if role not in self.clients:
+            response = self._post(Client(), "/api/auth/login/", {
+                "email": self.usernames[role], "password": self.password,
+            })
+            access = response.json().get("access") if response.status_code == 200 else None
+            if not access:
+                raise CommandError(f"Login as {self.usernames[role]} failed ({response.status_code}).")
+            self.clients[role] = Client(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return self.clients[role]
+
+    # --- Measuring ---
+
+    def _measure(self, role, request, warmup, runs):
+        client = self._client(role)
+        timings, queries, statuses = [], [], set()
+        for run in range(warmup + runs):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    response = request(client)
+                    elapsed = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+            if run < warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(len(ctx.captured_queries))
+            statuses.add(response.status_code)
+        return {
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(self._percentile(timings, 95), 2),
+            "max_ms": round(max(timings), 2),
+            "queries": max(queries),
+            "status": sorted(statuses),
+            "runs": runs,
+        }
+
+    @staticmethod
+    def _percentile(values, percent):
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * percent / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    def _print(self, report):
+        self.stdout.write(f"{'flow':<22} {'p50':>9} {'p95':>9} {'max':>9} {'queries':>8}  status")
+        for name, row in report.items():
+            line = (
+                f"{name:<22} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms "
+                f"{row['queries']:>8}  {','.join(str(code) for code in row['status'])}"
+            )
+            failed = any(code >= 400 for code in row["status"])
+            self.stdout.write(self.style.ERROR(line) if failed else line)
+
+    def _compare(self, report, path, max_regression):
+        try:
+            with open(path) as handle:
+                baseline = json.load(handle)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read baseline {path}: {e}")
+
+        regressions = []
+        for name, row in report.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            if row["queries"] > before["queries"]:
+                regressions.append(f"{name}: queries {before['queries']} -> {row['queries']}")
+            if row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+                regressions.append(f"{name}: p95 {before['p95_ms']:.1f}ms -> {row['p95_ms']:.1f}ms")
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"  {regression}"))
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}."))
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.synthetic_data import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic multi-campus dataset for load tests: campuses, levels, grades, "
+        "classrooms, principals, coordinators, teachers (with login users), students, weekday attendance, "
+        "results and behaviour records. The same options always produce the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campuses", type=int, default=50, help="Campuses (default: 50)")
+        parser.add_argument("--grades", type=int, default=10, help="Grades per campus, up to 10 (default: 10)")
+        parser.add_argument("--sections", type=int, default=2, help="Sections per grade, up to 5 (default: 2)")
+        parser.add_argument(
+            "--students-per-class", type=int, default=50,
+            help="Students per classroom (default: 50, 50k students with the other defaults)",
+        )
+        parser.add_argument("--days", type=int, default=365, help="Days of weekday attendance (default: 365)")
+        parser.add_argument("--behaviour-weeks", type=int, default=4, help="Weekly behaviour records per student (default: 4)")
+        parser.add_argument("--end-date", type=str, default=None, help="Last attendance day, YYYY-MM-DD (default: today)")
+        parser.add_argument("--prefix", type=str, default="SYN", help="Prefix of every generated code, username and email")
+        parser.add_argument("--password", type=str, default="Synthetic@123", help="Password of every generated user")
+        parser.add_argument("--seed", type=int, default=16, help="Random seed (default: 16)")
+        parser.add_argument(
+            "--skip-rollups", action="store_true",
+            help="Do not rebuild attendance rollups and summaries afterwards",
+        )
+
+    def handle(self, *args, **options):
+        end_date = None
+        if options["end_date"]:
+            try:
+                end_date = datetime.strptime(options["end_date"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Invalid --end-date. Use YYYY-MM-DD.")
+
+        generator = SyntheticDataGenerator(
+            campuses=options["campuses"],
+            grades=options["grades"],
+            sections=options["sections"],
+            students_per_class=options["students_per_class"],
+            days=options["days"],
+            behaviour_weeks=options["behaviour_weeks"],
+            end_date=end_date,
+            prefix=options["prefix"],
+            password=options["password"],
+            seed=options["seed"],
+            log=self.stdout.write,
+        )
+        if generator.exists():
+            raise CommandError(
+                f"A dataset with prefix '{options['prefix']}' already exists. Use another --prefix or a fresh database."
+            )
+        generator.generate()
+
+        if not options["skip_rollups"]:
+            start = generator.end_date.toordinal() - options["days"] + 1
+            call_command(
+                "rebuild_attendance_rollups",
+                start=datetime.fromordinal(start).strftime("%Y-%m-%d"),
+                end=generator.end_date.strftime("%Y-%m-%d"),
+                stdout=self.stdout,
+            )
+            call_command("backfill_attendance_summaries", stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Log in as {options['prefix']}-ADMIN, {options['prefix']}-C0001 (coordinator) or "
+            f"{options['prefix']}-T00001 (teacher) with password {options['password']}."
+        ))
@@ -3,6 +3,9 @@ from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from datetime import timedelta
 import secrets
+import logging
+
+logger = logging.getLogger(__name__)
 
 class User(AbstractUser):
     """
@@ -72,10 +75,10 @@ class User(AbstractUser):
                 
                 # Set username to employee code
                 self.username = employee_code
-                print(f"✅ Auto-generated super admin employee code: {employee_code}")
+                logger.info("Generated super admin employee code %s", employee_code)
                     
-            except Exception as e:
-                print(f"❌ Error generating super admin employee code: {str(e)}")
+            except Exception:
+                logger.exception("Generating super admin employee code failed")
         
         # Ensure super admin doesn't have campus assignment
         if self.role == 'superadmin':
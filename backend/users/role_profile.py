@@ -0,0 +1,202 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+
+CACHE_KEY_PREFIX = 'role_profile'
+SCOPE_VERSION_KEY = f'{CACHE_KEY_PREFIX}:scope_version'
+
+
+class RoleProfile:
+    """
+    The caller's Teacher/Coordinator/Principal profile reduced to ids:
+    campus, managed levels and visible classrooms. Superadmins (and users
+    without a profile) have profile_id None.
+    """
+
+    def __init__(self, user_id, role, profile_id=None, is_active=False, shift=None,
+                 campus_id=None, level_ids=(), classroom_ids=()):
+        self.user_id = user_id
+        self.role = role
+        self.profile_id = profile_id
+        self.is_active = is_active
+        self.shift = shift
+        self.campus_id = campus_id
+        self.level_ids = frozenset(level_ids)
+        self.classroom_ids = frozenset(classroom_ids)
+        self._instance = None
+
+    def __repr__(self):
+        return f"<RoleProfile user={self.user_id} role={self.role} profile={self.profile_id}>"
+
+    @property
+    def model(self):
+        return RoleProfileResolver.profile_model(self.role)
+
+    @property
+    def exists(self):
+        return self.profile_id is not None
+
+    def get_instance(self, model=None):
+        """
+        Load the profile model instance (one query, memoized for the request).
+        Raises model.DoesNotExist when the user has no profile of that model,
+        like the old per-view Teacher/Coordinator/Principal lookups did.
+        """
+        model = model or self.model
+        if model is None:
+            raise ValueError(f"Role '{self.role}' has no profile model")
+        if self.profile_id is None or model is not self.model:
+            raise model.DoesNotExist(f"No {model.__name__} profile for user {self.user_id}")
+        if self._instance is None:
+            self._instance = model.objects.get(pk=self.profile_id)
+        return self._instance
+
+    def to_cache(self):
+        return {
+            'user_id': self.user_id,
+            'role': self.role,
+            'profile_id': self.profile_id,
+            'is_active': self.is_active,
+            'shift': self.shift,
+            'campus_id': self.campus_id,
+            'level_ids': sorted(self.level_ids),
+            'classroom_ids': sorted(self.classroom_ids),
+        }
+
+
+class RoleProfileResolver:
+    """
+    Resolve a user's role profile once per request and share it across
+    requests through the cache, keyed by user id.
+
+    Per-user entries are dropped from the Teacher/Coordinator/Principal
+    post_save signals. Classroom and level changes bump a scope version
+    that is part of every key, so all entries go stale at once.
+    """
+
+    @staticmethod
+    def profile_model(role):
+        if role == 'teacher':
+            from teachers.models import Teacher
+            return Teacher
+        if role == 'coordinator':
+            from coordinator.models import Coordinator
+            return Coordinator
+        if role == 'principal':
+            from principals.models import Principal
+            return Principal
+        return None
+
+    @staticmethod
+    def for_user(user):
+        """Return the RoleProfile of an authenticated user, memoized on the user instance"""
+        if not user or not user.is_authenticated:
+            return None
+        role_profile = getattr(user, '_role_profile', None)
+        if role_profile is not None and role_profile.role == user.role:
+            return role_profile
+
+        key = RoleProfileResolver.cache_key(user.pk)
+        data = cache.get(key)
+        if data is not None and data.get('role') == user.role:
+            role_profile = RoleProfile(**data)
+        else:
+            role_profile = RoleProfileResolver.resolve(user)
+            cache.set(key, role_profile.to_cache(), getattr(settings, 'ROLE_PROFILE_CACHE_TIMEOUT', 900))
+
+        user._role_profile = role_profile
+        return role_profile
+
+    @staticmethod
+    def for_request(request):
+        """
+        RoleProfile of the request's user, whatever authenticated it (JWT, session,
+        force_authenticate). Anonymous users get an empty profile, so `.exists` is
+        False and get_instance() raises DoesNotExist.
+        """
+        user = getattr(request, 'user', None)
+        return RoleProfileResolver.for_user(user) or RoleProfile(None, getattr(user, 'role', None))
+
+    @staticmethod
+    def resolve(user):
+        """Build a RoleProfile from the database"""
+        from classes.models import ClassRoom, Level
+
+        model = RoleProfileResolver.profile_model(user.role)
+        if model is None:
+            return RoleProfile(user.pk, user.role)
+
+        # Profiles are created with username = employee_code; older accounts only share the email
+        profile = model.objects.filter(employee_code=user.username).first()
+        if profile is None and user.email:
+            profile = model.objects.filter(email=user.email).first()
+        if profile is None:
+            return RoleProfile(user.pk, user.role)
+
+        if user.role == 'teacher':
+            classroom_ids = set(profile.assigned_classrooms.values_list('id', flat=True))
+            classroom_ids.update(ClassRoom.objects.filter(class_teacher=profile).values_list('id', flat=True))
+            if profile.assigned_classroom_id:
+                classroom_ids.add(profile.assigned_classroom_id)
+            level_ids = ClassRoom.objects.filter(id__in=classroom_ids).values_list('grade__level_id', flat=True)
+            campus_id = profile.current_campus_id
+        elif user.role == 'coordinator':
+            from .scopes import ClassroomScope
+            level_ids = ClassroomScope.managed_level_ids(profile)
+            classroom_ids = ClassroomScope.coordinator_classroom_ids(profile)
+            campus_id = profile.campus_id
+        else:
+            campus_id = profile.campus_id
+            level_ids = Level.objects.filter(campus_id=campus_id).values_list('id', flat=True) if campus_id else []
+            classroom_ids = (
+                ClassRoom.objects.filter(grade__level__campus_id=campus_id).values_list('id', flat=True)
+                if campus_id else []
+            )
+
+        return RoleProfile(
+            user.pk,
+            user.role,
+            profile_id=profile.pk,
+            is_active=profile.is_currently_active,
+            shift=profile.shift,
+            campus_id=campus_id,
+            level_ids=[level_id for level_id in level_ids if level_id is not None],
+            classroom_ids=classroom_ids,
+        )
+
+    @staticmethod
+    def cache_key(user_id):
+        return f"{CACHE_KEY_PREFIX}:v{RoleProfileResolver.scope_version()}:user:{user_id}"
+
+    @staticmethod
+    def scope_version():
+        version = cache.get(SCOPE_VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.add(SCOPE_VERSION_KEY, version, None)
+        return version
+
+    @staticmethod
+    def bump_scope_version():
+        """Invalidate every cached profile, e.g. after a classroom or level changed"""
+        try:
+            cache.incr(SCOPE_VERSION_KEY)
+        except ValueError:
+            cache.set(SCOPE_VERSION_KEY, 2, None)
+
+    @staticmethod
+    def invalidate_users(user_ids):
+        cache.delete_many([RoleProfileResolver.cache_key(user_id) for user_id in user_ids])
+
+    @staticmethod
+    def invalidate_for_profile(instance):
+        """Drop the cached profile of the user(s) behind a Teacher/Coordinator/Principal"""
+        from users.models import User
+
+        lookup = Q(email=instance.email)
+        if instance.employee_code:
+            lookup |= Q(username=instance.employee_code)
+        user_ids = list(User.objects.filter(lookup).values_list('id', flat=True))
+        if user_ids:
+            RoleProfileResolver.invalidate_users(user_ids)
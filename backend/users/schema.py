@@ -1,5 +1,6 @@
 import graphene
 from graphene_django import DjangoObjectType
+from backend.loaders import BatchedListConnectionField
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -8,12 +9,13 @@ class UserType(DjangoObjectType):
     class Meta:
         model = User
         fields = "__all__"
+        use_connection = True
 
 class Query(graphene.ObjectType):
-    all_users = graphene.List(UserType)
+    all_users = BatchedListConnectionField(UserType)
     
-    def resolve_all_users(self, info):
-        return User.objects.all()
+    def resolve_all_users(self, info, **kwargs):
+        return User.objects.order_by('id')
 
 class Mutation(graphene.ObjectType):
     pass
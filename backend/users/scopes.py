@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .role_profile import CACHE_KEY_PREFIX, RoleProfileResolver
+
+
+class ClassroomScope:
+    """
+    Visible classroom ids per user, as a frozenset, so role filtering is a
+    single `classroom_id__in` lookup instead of per-request profile queries.
+
+    - Superadmins: None (no restriction)
+    - Teachers: legacy assigned_classroom, assigned_classrooms and class_teacher rooms
+    - Coordinators: classrooms of their managed level(s)
+    - Principals: classrooms of their campus
+
+    The per-user sets live in the cached RoleProfile, so they stay valid until
+    a profile, classroom or level changes (see RoleProfileResolver).
+    """
+
+    @staticmethod
+    def visible_classroom_ids(user):
+        if user.is_superuser or user.is_superadmin():
+            return None
+        role_profile = RoleProfileResolver.for_user(user)
+        return role_profile.classroom_ids if role_profile else frozenset()
+
+    @staticmethod
+    def filter_queryset(queryset, user, field='classroom_id'):
+        """Restrict queryset to rows whose `field` is a visible classroom id"""
+        classroom_ids = ClassroomScope.visible_classroom_ids(user)
+        if classroom_ids is None:
+            return queryset
+        if not classroom_ids:
+            return queryset.none()
+        return queryset.filter(**{f'{field}__in': classroom_ids})
+
+    @staticmethod
+    def can_access(user, classroom_id):
+        classroom_ids = ClassroomScope.visible_classroom_ids(user)
+        return classroom_ids is None or classroom_id in classroom_ids
+
+    @staticmethod
+    def managed_level_ids(coordinator):
+        """Level ids a coordinator manages ('both' shift coordinators use assigned_levels)"""
+        if coordinator.shift == 'both':
+            level_ids = list(coordinator.assigned_levels.values_list('id', flat=True))
+            if level_ids:
+                return level_ids
+        return [coordinator.level_id] if coordinator.level_id else []
+
+    @staticmethod
+    def coordinator_classroom_ids(coordinator):
+        """Classroom ids under any coordinator (not just the caller), cached until assignments change"""
+        from classes.models import ClassRoom
+
+        key = ClassroomScope._coordinator_cache_key(coordinator.pk)
+        classroom_ids = cache.get(key)
+        if classroom_ids is None:
+            classroom_ids = frozenset(
+                ClassRoom.objects.filter(
+                    grade__level_id__in=ClassroomScope.managed_level_ids(coordinator)
+                ).values_list('id', flat=True)
+            )
+            cache.set(key, classroom_ids, getattr(settings, 'ROLE_PROFILE_CACHE_TIMEOUT', 900))
+        return classroom_ids
+
+    @staticmethod
+    def invalidate_coordinator(coordinator):
+        cache.delete(ClassroomScope._coordinator_cache_key(coordinator.pk))
+
+    @staticmethod
+    def _coordinator_cache_key(coordinator_id):
+        return f"{CACHE_KEY_PREFIX}:v{RoleProfileResolver.scope_version()}:coordinator_classrooms:{coordinator_id}"
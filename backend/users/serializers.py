@@ -74,6 +74,10 @@ class UserLoginSerializer(serializers.Serializer):
     def validate_email(self, value):
         # Check if user exists with either email or username (employee code)
         if not User.objects.filter(email=value).exists() and not User.objects.filter(username=value).exists():
+            # A former employee code of a transferred teacher
+            from transfers.services import IDResolver
+            if IDResolver.login_username(value):
+                return value
             raise serializers.ValidationError("User with this email or employee code does not exist")
         return value
 
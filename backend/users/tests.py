@@ -1,3 +1,62 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from .models import User
+from .role_profile import RoleProfileResolver
+from campus.models import Campus
+from classes.models import ClassRoom, Grade, Level
+from students.models import Student
+from students.views import StudentViewSet
+from teachers.models import Teacher
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RoleProfileForRequestTests(TestCase):
+    """The caller's role profile does not depend on which authenticator ran"""
+
+    def setUp(self):
+        cache.clear()
+        self.campus = Campus.objects.create(campus_name='Test Campus', campus_code='C01', city='Karachi')
+        level = Level.objects.create(name='Primary', shift='morning', campus=self.campus)
+        grade = Grade.objects.create(name='Grade-1', level=level)
+        self.classroom = ClassRoom.objects.create(grade=grade, section='A', shift='morning')
+        self.user = User.objects.create(username='C01-M-25-T-0001', email='teacher@example.com', role='teacher')
+        self.teacher = Teacher.objects.bulk_create([Teacher(
+            full_name='Teacher', dob=date(1990, 1, 1), gender='female', contact_number='03000000000',
+            email='teacher@example.com', cnic='42101-0000001', employee_code='C01-M-25-T-0001',
+            current_campus=self.campus, assigned_classroom=self.classroom, is_class_teacher=True,
+        )])[0]
+        self.factory = RequestFactory()
+
+    def test_plain_django_request(self):
+        request = self.factory.get('/')
+        request.user = self.user
+        role_profile = RoleProfileResolver.for_request(request)
+        self.assertEqual(role_profile.get_instance(Teacher), self.teacher)
+        self.assertEqual(role_profile.classroom_ids, {self.classroom.id})
+        self.assertIs(RoleProfileResolver.for_request(request), role_profile)
+
+    def test_anonymous_request(self):
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        role_profile = RoleProfileResolver.for_request(request)
+        self.assertFalse(role_profile.exists)
+        with self.assertRaises(Teacher.DoesNotExist):
+            role_profile.get_instance(Teacher)
+
+    def test_view_with_forced_authentication(self):
+        student = Student.objects.create(
+            name='Student', classroom=self.classroom, campus=self.campus, current_grade='Grade-1',
+            section='A', shift='morning', enrollment_year=2025, gender='female', is_draft=False,
+        )
+        request = self.factory.get(f'/api/students/{student.id}/')
+        # What APIClient.force_authenticate does: no JWT authenticator runs
+        request._force_auth_user = self.user
+        response = StudentViewSet.as_view({'get': 'retrieve'})(request, pk=student.id)
+        self.assertEqual(response.status_code, 200, response.data)
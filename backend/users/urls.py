@@ -14,7 +14,8 @@ from .views import (
     change_password_with_otp,
     send_forgot_password_otp,
     verify_forgot_password_otp,
-    reset_password_with_otp
+    reset_password_with_otp,
+    response_cache_stats
 )
 
 urlpatterns = [
@@ -39,4 +40,7 @@ urlpatterns = [
     path('send-forgot-password-otp/', send_forgot_password_otp, name='send_forgot_password_otp'),
     path('verify-forgot-password-otp/', verify_forgot_password_otp, name='verify_forgot_password_otp'),
     path('reset-password-with-otp/', reset_password_with_otp, name='reset_password_with_otp'),
+    
+    # Monitoring
+    path('cache-stats/', response_cache_stats, name='response_cache_stats'),
 ]
@@ -1,5 +1,3 @@
-from django.db import transaction
-from django.db.models import F
 from .models import User
 from campus.models import Campus
 
@@ -23,30 +21,29 @@ def generate_class_code(campus_code, grade, section):
 
 def get_next_student_number(campus, enrollment_year):
     """
-    System-wide strictly increasing student number (never repeats).
+    System-wide student number (never repeats), from a block-allocated sequence.
     Ignores campus/year to guarantee global uniqueness as requested.
     """
-    from services.models import GlobalCounter
+    from services.sequences import SequenceService
 
-    with transaction.atomic():
-        counter, _ = GlobalCounter.objects.select_for_update().get_or_create(key='student')
-        counter.value = F('value') + 1
-        counter.save(update_fields=['value'])
-        counter.refresh_from_db()
-        return counter.value
+    return SequenceService.next('student')
+
+def reserve_student_numbers(count):
+    """
+    Reserve `count` student numbers in one round trip (bulk imports).
+    Returns them in ascending order.
+    """
+    from services.sequences import SequenceService
+
+    return SequenceService.reserve('student', count)
 
 def get_next_teacher_number(campus, joining_year):
     """
-    System-wide strictly increasing employee number (never repeats).
+    System-wide employee number (never repeats), from a block-allocated sequence.
     """
-    from services.models import GlobalCounter
+    from services.sequences import SequenceService
 
-    with transaction.atomic():
-        counter, _ = GlobalCounter.objects.select_for_update().get_or_create(key='employee')
-        counter.value = F('value') + 1
-        counter.save(update_fields=['value'])
-        counter.refresh_from_db()
-        return counter.value
+    return SequenceService.next('employee')
 
 def get_role_code(role):
     """
@@ -57,6 +57,14 @@ class UserLoginView(generics.GenericAPIView):
             except User.DoesNotExist:
                 pass
         
+        # Finally, an employee code the teacher held before a transfer (or after, if the
+        # username is still the old one)
+        if not user:
+            from transfers.services import IDResolver
+            username = IDResolver.login_username(email_or_code)
+            if username and username != email_or_code:
+                user = authenticate(request, username=username, password=password)
+        
         if user and user.is_active:
             # Check if user needs to change password
             if not user.has_changed_default_password:
@@ -787,3 +795,22 @@ def reset_password_with_otp(request):
         
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsSuperAdmin])
+def response_cache_stats(request):
+    """Hit/miss counters of the cached dashboard endpoints (see utils.response_cache) and GraphQL documents"""
+    from utils.response_cache import cache_stats
+    from backend.graphql_documents import DocumentCache
+    
+    views = cache_stats()
+    hits = sum(view['hits'] for view in views)
+    misses = sum(view['misses'] for view in views)
+    return Response({
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses) * 100, 2) if hits + misses else 0.0,
+        'views': views,
+        'graphql_documents': DocumentCache.stats()
+    })
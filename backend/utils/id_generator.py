@@ -3,6 +3,10 @@ from campus.models import Campus
 from teachers.models import Teacher
 from coordinator.models import Coordinator
 from principals.models import Principal
+from services.sequences import SequenceService
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class IDGenerator:
@@ -49,55 +53,37 @@ class IDGenerator:
     
     @staticmethod
     def get_next_employee_number(campus_id, shift, year, role):
-        """Get next available employee number for given campus, shift, year, role"""
-        try:
-            # Get all existing employee codes for this combination
-            existing_codes = []
-            
-            # Check teachers
-            teachers = Teacher.objects.filter(
-                current_campus_id=campus_id,
-                shift=shift,
-                employee_code__isnull=False
-            ).values_list('employee_code', flat=True)
-            existing_codes.extend(teachers)
-            
-            # Check coordinators (no shift field, use default 'morning')
-            coordinators = Coordinator.objects.filter(
-                campus_id=campus_id,
-                employee_code__isnull=False
-            ).values_list('employee_code', flat=True)
-            existing_codes.extend(coordinators)
-            
-            # Check principals
-            principals = Principal.objects.filter(
-                campus_id=campus_id,
-                shift=shift,
-                employee_code__isnull=False
-            ).values_list('employee_code', flat=True)
-            existing_codes.extend(principals)
-            
-            # Extract numbers from existing codes
-            numbers = []
-            for code in existing_codes:
-                if code and '-' in code:
-                    try:
-                        # Extract last part (number) from code like C01-M-25-P-0001
-                        number_part = code.split('-')[-1]
-                        if number_part.isdigit():
-                            numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-            
-            # Return next available number
-            if not numbers:
-                return 1
-            
-            return max(numbers) + 1
-            
-        except Exception as e:
-            print(f"Error getting next employee number: {str(e)}")
-            return 1
+        """
+        Next employee number of the campus. One sequence per campus (shared by shifts
+        and roles), so a generated code never repeats.
+        """
+        return SequenceService.next(
+            f'employee:{campus_id}',
+            seed=lambda: IDGenerator._max_employee_number(campus_id),
+            block_size=1,
+        )
+
+    @staticmethod
+    def _max_employee_number(campus_id):
+        """Highest number among the campus's existing employee codes; seeds its sequence once"""
+        existing_codes = []
+        for model, campus_field in ((Teacher, 'current_campus_id'), (Coordinator, 'campus_id'), (Principal, 'campus_id')):
+            existing_codes.extend(
+                model.objects.filter(**{campus_field: campus_id}, employee_code__isnull=False)
+                .values_list('employee_code', flat=True)
+            )
+        return IDGenerator._max_code_number(existing_codes)
+
+    @staticmethod
+    def _max_code_number(codes):
+        """Largest trailing number of codes like C01-M-25-P-0001 (0 if none)"""
+        numbers = [0]
+        for code in codes:
+            if code and '-' in code:
+                number_part = code.split('-')[-1]
+                if number_part.isdigit():
+                    numbers.append(int(number_part))
+        return max(numbers)
 
     @staticmethod
     def generate_unique_employee_code(campus, shift, year, role):
@@ -118,8 +104,8 @@ class IDGenerator:
             if (Teacher.objects.filter(employee_code=employee_code).exists() or
                 Coordinator.objects.filter(employee_code=employee_code).exists() or
                 Principal.objects.filter(employee_code=employee_code).exists()):
-                # If somehow still exists, try next number
-                next_number += 1
+                # A code created outside the sequence (e.g. an import) took it; draw again
+                next_number = IDGenerator.get_next_employee_number(campus_id, shift, year, role)
                 employee_code = IDGenerator.generate_employee_code(campus_id, shift, year, role, next_number)
             
             return employee_code
@@ -146,36 +132,17 @@ class IDGenerator:
     @staticmethod
     def get_next_superadmin_number():
         """Get next available super admin number"""
-        try:
-            from users.models import User
-            
-            # Get all existing super admin codes
-            super_admins = User.objects.filter(
-                role='superadmin',
-                username__startswith='S-'
-            ).values_list('username', flat=True)
-            
-            # Extract numbers from existing codes
-            numbers = []
-            for code in super_admins:
-                if code and '-' in code:
-                    try:
-                        # Extract last part (number) from code like S-25-0001
-                        number_part = code.split('-')[-1]
-                        if number_part.isdigit():
-                            numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-            
-            # Return next available number
-            if not numbers:
-                return 1
-            
-            return max(numbers) + 1
-            
-        except Exception as e:
-            print(f"Error getting next super admin number: {str(e)}")
-            return 1
+        return SequenceService.next(
+            'superadmin', seed=IDGenerator._max_superadmin_number, block_size=1,
+        )
+
+    @staticmethod
+    def _max_superadmin_number():
+        from users.models import User
+
+        return IDGenerator._max_code_number(
+            User.objects.filter(role='superadmin', username__startswith='S-').values_list('username', flat=True)
+        )
 
     @staticmethod
     def generate_unique_student_code(classroom, year):
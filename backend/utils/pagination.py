@@ -0,0 +1,114 @@
+"""
+Opt-in keyset pagination for large lists.
+
+Page numbers cost a COUNT(*) plus an OFFSET scan that grows with the page
+number. With ?cursor= (empty for the first page) a list is instead ordered
+by (created_at, id), newest first, and each page continues strictly after
+the last row of the previous one, so every page is one index range scan
+and no count is run. The response is
+{"next": <url or null>, "next_cursor": <token or null>, "results": [...]}.
+Without ?cursor= the regular page-number pagination is used.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """(created_at, id) keyset pagination; forward only"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, field='created_at'):
+        self.field = field
+        self.next_cursor = None
+        self.request = None
+
+    def is_requested(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f'-{self.field}', '-id')
+
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__lt': value}) | Q(**{self.field: value, 'id__lt': pk})
+            )
+
+        # One extra row tells whether there is a next page, without a count
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_cursor = self.encode_cursor(getattr(last, self.field), last.pk)
+        else:
+            self.next_cursor = None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    def encode_cursor(self, value, pk):
+        raw = json.dumps([value.isoformat(), pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+            value, pk = json.loads(raw)
+            return datetime.fromisoformat(value), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """ViewSet pagination: keyset pages with ?cursor=, page numbers otherwise"""
+
+    keyset_field = 'created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keyset = KeysetPagination(self.keyset_field)
+        if keyset.is_requested(request):
+            self.keyset = keyset
+            return keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
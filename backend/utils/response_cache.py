@@ -0,0 +1,144 @@
+"""
+Versioned response cache for read-heavy dashboard endpoints.
+
+Each cached view declares the entities its response depends on
+(e.g. 'student', 'attendance'). Every entity has a version counter in the
+cache that is bumped from the model post_save/post_delete signals; the
+current versions are part of the cache key, so a write makes the old
+entries unreachable without deleting any keys. Entries are also scoped by
+the caller's role scope and the request's path and query params.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+KEY_PREFIX = 'response_cache'
+
+# Names of all decorated views, for the hit/miss report
+CACHED_VIEWS = set()
+
+
+def version_key(entity):
+    return f'{KEY_PREFIX}:version:{entity}'
+
+
+def bump_version(*entities):
+    """Invalidate every cached response that depends on any of entities"""
+    for entity in entities:
+        key = version_key(entity)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Unknown (never read or evicted): start from a fresh, never used value
+            cache.set(key, int(time.time() * 1000), None)
+
+
+def current_versions(entities):
+    keys = [version_key(entity) for entity in entities]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key, 0)
+    return [str(versions[key]) for key in keys]
+
+
+def role_scope(request):
+    """Identify which rows the caller can see, so users with the same visibility share entries"""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_superuser or user.is_superadmin():
+        return 'all'
+    staff = ':staff' if user.is_staff else ''
+    if user.is_teacher() or user.is_coordinator() or user.is_principal():
+        from users.role_profile import RoleProfileResolver
+        role_profile = RoleProfileResolver.for_user(user)
+        classroom_ids = ','.join(map(str, sorted(role_profile.classroom_ids)))
+        digest = hashlib.md5(classroom_ids.encode()).hexdigest()
+        return f'{user.role}{staff}:{user.campus_id}:{role_profile.campus_id}:{digest}'
+    return f'user:{user.pk}'
+
+
+def _request_digest(request):
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    raw = request.path + '?' + '&'.join(f'{key}={value}' for key, value in params)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _record(name, outcome):
+    key = f'{KEY_PREFIX}:stats:{name}:{outcome}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def cache_response(*entities, timeout=None, name=None):
+    """
+    Cache successful GET responses of a DRF function view or viewset action.
+
+    Usage: put it under @api_view/@action, e.g.
+        @action(detail=True, methods=['get'])
+        @cache_response('coordinator', 'teacher', 'student', 'classroom')
+        def dashboard_stats(self, request, pk=None): ...
+    """
+    def decorator(view_func):
+        cache_name = name or f'{view_func.__module__}.{view_func.__qualname__}'
+        CACHED_VIEWS.add(cache_name)
+
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            request = next((arg for arg in args[:2] if isinstance(arg, Request)), None)
+            if request is None or request.method != 'GET':
+                return view_func(*args, **kwargs)
+
+            key = ':'.join([
+                KEY_PREFIX,
+                cache_name,
+                role_scope(request),
+                '.'.join(current_versions(entities)),
+                _request_digest(request),
+            ])
+            data = cache.get(key)
+            if data is not None:
+                _record(cache_name, 'hits')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record(cache_name, 'misses')
+            response = view_func(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, response.data, timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss counters per cached view"""
+    names = sorted(CACHED_VIEWS)
+    keys = [f'{KEY_PREFIX}:stats:{name}:{outcome}' for name in names for outcome in ('hits', 'misses')]
+    counters = cache.get_many(keys)
+    stats = []
+    for name in names:
+        hits = counters.get(f'{KEY_PREFIX}:stats:{name}:hits', 0)
+        misses = counters.get(f'{KEY_PREFIX}:stats:{name}:misses', 0)
+        total = hits + misses
+        stats.append({
+            'view': name,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 2) if total else 0.0,
+        })
+    return stats
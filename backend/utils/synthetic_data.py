@@ -0,0 +1,341 @@
+"""
+Deterministic synthetic dataset for load testing and benchmarks.
+
+SyntheticDataGenerator builds N campuses, each with one morning level,
+its grades and sections, a principal, a coordinator, one class teacher per
+classroom (all with login users), students, weekday attendance for the
+days up to end_date, mid term results with subject marks and weekly
+behaviour records. The same options always produce the same rows: every
+random choice comes from one seeded Random, and dates are counted back
+from end_date.
+
+Rows are bulk inserted, so model save() and post_save signals do not run;
+codes and counters that save() would fill are set directly. Every code,
+username and email carries the prefix, so a dataset is easy to find and
+never collides with real data.
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+
+FIRST_NAMES = [
+    'Ahmed', 'Fatima', 'Ali', 'Aisha', 'Hassan', 'Zainab', 'Omar', 'Maryam', 'Yusuf', 'Khadija',
+    'Bilal', 'Hira', 'Usman', 'Sana', 'Hamza', 'Amna', 'Saad', 'Iqra', 'Zaid', 'Noor',
+]
+LAST_NAMES = ['Khan', 'Ahmed', 'Ali', 'Hassan', 'Malik', 'Sheikh', 'Raza', 'Syed', 'Butt', 'Chaudhry']
+GRADE_NAMES = [f'Grade-{n}' for n in range(1, 11)]
+SECTION_NAMES = ['A', 'B', 'C', 'D', 'E']
+# Roughly nine in ten present, like the production data
+ATTENDANCE_STATUSES = ['present'] * 17 + ['absent', 'absent', 'late', 'leave']
+BEHAVIOUR_METRICS = ['punctuality', 'obedience', 'classBehaviour', 'participation', 'homework', 'respect']
+RESULT_SUBJECTS = ['urdu', 'english', 'mathematics', 'science', 'islamiat']
+# (minimum percentage, grade) as in Result.calculate_totals
+RESULT_GRADES = [(90, 'A+'), (80, 'A'), (70, 'B'), (60, 'C'), (50, 'D'), (0, 'F')]
+BATCH_SIZE = 5000
+
+
+class SyntheticDataGenerator:
+    """Generate one prefixed dataset; see the module docstring"""
+
+    def __init__(self, campuses=50, grades=10, sections=2, students_per_class=50, days=365,
+                 behaviour_weeks=4, end_date=None, prefix='SYN', password='Synthetic@123',
+                 seed=16, log=None):
+        self.campuses = campuses
+        self.grades = GRADE_NAMES[:max(min(grades, len(GRADE_NAMES)), 1)]
+        self.sections = SECTION_NAMES[:max(min(sections, len(SECTION_NAMES)), 1)]
+        self.students_per_class = students_per_class
+        self.days = days
+        self.behaviour_weeks = behaviour_weeks
+        self.end_date = end_date or date.today()
+        self.prefix = prefix
+        self.password = password
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.counts = {}
+
+    def exists(self):
+        from campus.models import Campus
+
+        return Campus.objects.filter(campus_code__startswith=self.prefix).exists()
+
+    def generate(self):
+        """Create the dataset and return {model name: rows created}"""
+        started = time.perf_counter()
+        with transaction.atomic():
+            structure = self._create_structure()
+            staff = self._create_staff(structure)
+            students = self._create_students(structure)
+        # Attendance commits per day so a year of it never sits in one transaction
+        self._create_attendance(structure, staff, students)
+        with transaction.atomic():
+            self._create_results(structure, staff, students)
+            self._create_behaviour(students)
+        self.log(f"Generated {self._describe()} in {time.perf_counter() - started:.0f}s")
+        return self.counts
+
+    # --- Campuses, levels, grades, classrooms ---
+
+    def _create_structure(self):
+        from campus.models import Campus
+        from classes.models import ClassRoom, Grade, Level
+
+        # Codes of levels, grades and classrooms are built in save(), so these go one by one
+        campuses, levels, classrooms = [], [], []
+        for number in range(1, self.campuses + 1):
+            campus = Campus.objects.create(
+                campus_name=f'{self.prefix} Campus {number}',
+                campus_code=f'{self.prefix}{number:03d}',
+                city='Karachi',
+                postal_code=f'{75000 + number}',
+                status='active',
+            )
+            level = Level.objects.create(name='Primary', shift='morning', campus=campus)
+            for grade_name in self.grades:
+                grade = Grade.objects.create(name=grade_name, level=level)
+                for section in self.sections:
+                    classrooms.append(
+                        ClassRoom.objects.create(grade=grade, section=section, shift='morning', capacity=self.students_per_class)
+                    )
+            campuses.append(campus)
+            levels.append(level)
+        self._count('campuses', len(campuses))
+        self._count('classrooms', len(classrooms))
+        self.log(f"Created {len(campuses)} campuses and {len(classrooms)} classrooms")
+        return {'campuses': campuses, 'levels': levels, 'classrooms': classrooms}
+
+    # --- Principals, coordinators, teachers and their users ---
+
+    def _create_staff(self, structure):
+        from classes.models import ClassRoom
+        from coordinator.models import Coordinator
+        from principals.models import Principal
+        from teachers.models import Teacher
+        from users.models import User
+
+        profile = {
+            'dob': date(1985, 1, 1), 'contact_number': '03000000000', 'permanent_address': 'Karachi',
+            'education_level': 'Masters', 'institution_name': 'University of Karachi', 'year_of_passing': 2008,
+            'total_experience_years': 12, 'joining_date': date(2015, 1, 1),
+        }
+        principals, coordinators = [], []
+        for number, (campus, level) in enumerate(zip(structure['campuses'], structure['levels']), 1):
+            principals.append(Principal(
+                full_name=f'{self.prefix} Principal {number}', gender='female', email=self._email('p', number),
+                cnic=f'{self.prefix}P{number:09d}', employee_code=f'{self.prefix}-P{number:04d}',
+                campus=campus, shift='morning', **profile,
+            ))
+            coordinators.append(Coordinator(
+                full_name=f'{self.prefix} Coordinator {number}', gender='male', email=self._email('c', number),
+                cnic=f'{self.prefix}C{number:09d}', employee_code=f'{self.prefix}-C{number:04d}',
+                campus=campus, level=level, shift='morning', **profile,
+            ))
+        Principal.objects.bulk_create(principals)
+        Coordinator.objects.bulk_create(coordinators)
+
+        classrooms = structure['classrooms']
+        teachers = Teacher.objects.bulk_create([
+            Teacher(
+                full_name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                dob=date(1990, 1, 1), gender=self.rng.choice(['male', 'female']), contact_number='03000000000',
+                email=self._email('t', number), cnic=f'{self.prefix}T{number:09d}',
+                employee_code=f'{self.prefix}-T{number:05d}', current_campus_id=self._campus_id(classroom),
+                assigned_classroom=classroom, is_class_teacher=True,
+            )
+            for number, classroom in enumerate(classrooms, 1)
+        ], batch_size=BATCH_SIZE)
+        for classroom, teacher in zip(classrooms, teachers):
+            classroom.class_teacher = teacher
+        ClassRoom.objects.bulk_update(classrooms, ['class_teacher'], batch_size=BATCH_SIZE)
+
+        # One hash for every account; hashing is deliberately slow
+        password = make_password(self.password)
+        users = [User(
+            username=f'{self.prefix}-ADMIN', email=self._email('admin', 0), role='superadmin',
+            is_superuser=True, is_staff=True, password=password, has_changed_default_password=True,
+        )]
+        for role, profiles, campus_attr in (
+            ('principal', principals, 'campus_id'),
+            ('coordinator', coordinators, 'campus_id'),
+            ('teacher', teachers, 'current_campus_id'),
+        ):
+            users.extend(
+                User(
+                    username=person.employee_code, email=person.email, role=role,
+                    campus_id=getattr(person, campus_attr), first_name=person.full_name.split()[0],
+                    password=password, has_changed_default_password=True,
+                )
+                for person in profiles
+            )
+        users = User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+        self._count('principals', len(principals))
+        self._count('coordinators', len(coordinators))
+        self._count('teachers', len(teachers))
+        self._count('users', len(users))
+        self.log(f"Created {len(principals)} principals, {len(coordinators)} coordinators, {len(teachers)} teachers")
+        return {
+            'coordinators': {coordinator.campus_id: coordinator for coordinator in coordinators},
+            'teachers': {classroom.id: teacher for classroom, teacher in zip(classrooms, teachers)},
+            'users': {user.username: user for user in users if user.role == 'teacher'},
+        }
+
+    # --- Students ---
+
+    def _create_students(self, structure):
+        from students.models import Student
+
+        rows = []
+        for classroom in structure['classrooms']:
+            for _ in range(self.students_per_class):
+                number = len(rows) + 1
+                gender = self.rng.choice(['male', 'female'])
+                rows.append(Student(
+                    name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                    father_name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                    gender=gender, campus_id=self._campus_id(classroom), classroom=classroom,
+                    current_grade=classroom.grade.name, section=classroom.section, shift='morning',
+                    enrollment_year=self.end_date.year - self.rng.randint(0, 5),
+                    student_id=f'{self.prefix}{number:07d}', student_code=f'{self.prefix}-S{number:07d}',
+                    is_draft=False,
+                    # A few soft deleted rows, like production
+                    is_deleted=self.rng.random() < 0.02,
+                ))
+        Student.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+        students = {}
+        for student_id, classroom_id, is_deleted in (
+            Student.objects.with_deleted()
+            .filter(student_code__startswith=f'{self.prefix}-S')
+            .order_by('id')
+            .values_list('id', 'classroom_id', 'is_deleted')
+        ):
+            if not is_deleted:
+                students.setdefault(classroom_id, []).append(student_id)
+        self._count('students', len(rows))
+        self.log(f"Created {len(rows)} students")
+        return students
+
+    # --- Attendance ---
+
+    def _school_days(self):
+        days = (self.end_date - timedelta(days=offset) for offset in range(self.days - 1, -1, -1))
+        return [day for day in days if day.weekday() < 5]
+
+    def _create_attendance(self, structure, staff, students):
+        from attendance.models import Attendance, StudentAttendance
+
+        school_days = self._school_days()
+        classrooms = structure['classrooms']
+        marks = 0
+        for number, day in enumerate(school_days, 1):
+            statuses = {
+                classroom.id: [self.rng.choice(ATTENDANCE_STATUSES) for _ in students.get(classroom.id, [])]
+                for classroom in classrooms
+            }
+            with transaction.atomic():
+                attendances = Attendance.objects.bulk_create([
+                    self._attendance(classroom, day, staff, statuses[classroom.id]) for classroom in classrooms
+                ])
+                rows = [
+                    StudentAttendance(student_id=student_id, attendance=attendance, status=status)
+                    for attendance in attendances
+                    for student_id, status in zip(students.get(attendance.classroom_id, []), statuses[attendance.classroom_id])
+                ]
+                StudentAttendance.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+            marks += len(rows)
+            if number % 20 == 0 or number == len(school_days):
+                self.log(f"  attendance: {number}/{len(school_days)} days, {marks} student marks")
+        self._count('attendance', len(school_days) * len(classrooms))
+        self._count('student_attendance', marks)
+
+    def _attendance(self, classroom, day, staff, statuses):
+        from attendance.models import Attendance
+
+        teacher_user = staff['users'][staff['teachers'][classroom.id].employee_code]
+        return Attendance(
+            classroom=classroom, date=day, marked_by=teacher_user, created_by=teacher_user,
+            status='final', is_final=True,
+            total_students=len(statuses),
+            present_count=statuses.count('present'),
+            absent_count=statuses.count('absent'),
+            late_count=statuses.count('late'),
+            leave_count=statuses.count('leave'),
+        )
+
+    # --- Results ---
+
+    def _create_results(self, structure, staff, students):
+        from result.models import Result, SubjectMark
+
+        results, marks = [], []
+        for classroom in structure['classrooms']:
+            teacher = staff['teachers'][classroom.id]
+            coordinator = staff['coordinators'][self._campus_id(classroom)]
+            for student_id in students.get(classroom.id, []):
+                subject_marks = [
+                    (subject, self.rng.randint(25, 100), self.rng.randint(8, 20) if subject in ('urdu', 'english') else 0)
+                    for subject in RESULT_SUBJECTS
+                ]
+                total = sum(100 + (20 if practical else 0) for _, _, practical in subject_marks)
+                obtained = sum(theory + practical for _, theory, practical in subject_marks)
+                percentage = obtained / total * 100
+                all_pass = all(theory >= 33 for _, theory, _ in subject_marks)
+                results.append(Result(
+                    student_id=student_id, teacher=teacher, coordinator=coordinator, exam_type='mid_term',
+                    status=self.rng.choice(['draft', 'submitted', 'submitted', 'approved', 'approved', 'approved']),
+                    total_marks=total, obtained_marks=obtained, percentage=round(percentage, 2),
+                    grade=next(grade for minimum, grade in RESULT_GRADES if percentage >= minimum),
+                    result_status='pass' if all_pass and percentage >= 50 else 'fail',
+                ))
+                marks.append(subject_marks)
+
+        results = Result.objects.bulk_create(results, batch_size=BATCH_SIZE)
+        SubjectMark.objects.bulk_create([
+            SubjectMark(
+                result=result, subject_name=subject, obtained_marks=theory, is_pass=theory >= 33,
+                has_practical=bool(practical), practical_total=20 if practical else 0, practical_obtained=practical,
+            )
+            for result, subject_marks in zip(results, marks)
+            for subject, theory, practical in subject_marks
+        ], batch_size=BATCH_SIZE)
+        self._count('results', len(results))
+        self.log(f"Created {len(results)} results")
+
+    # --- Behaviour ---
+
+    def _create_behaviour(self, students):
+        from behaviour.models import StudentBehaviourRecord
+
+        last_monday = self.end_date - timedelta(days=self.end_date.weekday())
+        weeks = [last_monday - timedelta(weeks=n) for n in range(self.behaviour_weeks, 0, -1)]
+        rows = [
+            StudentBehaviourRecord(
+                student_id=student_id, week_start=week_start, week_end=week_start + timedelta(days=4),
+                metrics={metric: self.rng.randint(1, 4) for metric in BEHAVIOUR_METRICS},
+            )
+            for student_ids in students.values()
+            for student_id in student_ids
+            for week_start in weeks
+        ]
+        StudentBehaviourRecord.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        self._count('behaviour_records', len(rows))
+        self.log(f"Created {len(rows)} behaviour records")
+
+    # --- Helpers ---
+
+    def _email(self, kind, number):
+        return f'{self.prefix.lower()}.{kind}{number}@synthetic.local'
+
+    @staticmethod
+    def _campus_id(classroom):
+        return classroom.grade.level.campus_id
+
+    def _count(self, name, rows):
+        self.counts[name] = self.counts.get(name, 0) + rows
+
+    def _describe(self):
+        return ', '.join(f'{rows} {name}' for name, rows in self.counts.items())